@@ -1,7 +1,45 @@
 import type { HookHandler } from "clawdbot";
+import { existsSync } from "node:fs";
+import { createConnection } from "node:net";
+import { tmpdir } from "node:os";
 
 const TRANSCRIBE_SCRIPT = `${process.env.HOME}/clawd/skills/elevenlabs/scripts/transcribe.py`;
 const CLAWDBOT_BIN = process.env.CLAWDBOT_BIN || `${process.env.HOME}/.npm-global/bin/clawdbot`;
+// Same default as scripts/_daemon.py (audio-daemon.py serve)
+const DAEMON_SOCKET =
+  process.env.ELEVENLABS_DAEMON_SOCKET ||
+  `${process.env.XDG_RUNTIME_DIR || tmpdir()}/elevenlabs-skill-${process.getuid?.()}.sock`;
+
+type DaemonResult = { text: string } | { error: string } | null;
+
+// Transcribe through a running audio-daemon, skipping uv, Python startup and SDK import.
+// Returns null when no daemon is reachable so the caller can fall back to the script.
+const transcribeViaDaemon = (audioFile: string): Promise<DaemonResult> => {
+  if (process.env.ELEVENLABS_DAEMON === "0" || !existsSync(DAEMON_SOCKET)) {
+    return Promise.resolve(null);
+  }
+  return new Promise((resolve) => {
+    const chunks: Buffer[] = [];
+    const socket = createConnection(DAEMON_SOCKET);
+    socket.on("connect", () => {
+      const request = {
+        method: "speech_to_text.convert",
+        kwargs: { model_id: "scribe_v2", file: { $file: audioFile } },
+      };
+      socket.write(JSON.stringify(request) + "\n");
+    });
+    socket.on("data", (data) => chunks.push(data));
+    socket.on("error", () => resolve(null));
+    socket.on("end", () => {
+      try {
+        const header = JSON.parse(Buffer.concat(chunks).toString("utf8").split("\n")[0]);
+        resolve(header.ok ? { text: header.value?.text ?? "" } : { error: `${header.type}: ${header.error}` });
+      } catch {
+        resolve(null);
+      }
+    });
+  });
+};
 
 const handler: HookHandler = async (context) => {
   const { event } = context;
@@ -41,21 +79,30 @@ const handler: HookHandler = async (context) => {
       return;
     }
     
-    // Transcribe using ElevenLabs
-    const transcribeProc = Bun.spawn({
-      cmd: ["uv", "run", TRANSCRIBE_SCRIPT, audioFile, "--format", "text"],
-      stdout: "pipe",
-      stderr: "pipe",
-    });
-    await transcribeProc.exited;
-    
-    if (transcribeProc.exitCode !== 0) {
-      const stderr = await new Response(transcribeProc.stderr).text();
-      console.error(`[voice-transcribe] Transcription failed:`, stderr);
+    // Transcribe using ElevenLabs, preferring the warm daemon over a fresh process
+    let transcript: string;
+    const daemonResult = await transcribeViaDaemon(audioFile);
+    if (daemonResult && "error" in daemonResult) {
+      console.error(`[voice-transcribe] Transcription failed:`, daemonResult.error);
       return;
+    } else if (daemonResult) {
+      transcript = daemonResult.text;
+    } else {
+      const transcribeProc = Bun.spawn({
+        cmd: ["uv", "run", TRANSCRIBE_SCRIPT, audioFile, "--format", "text"],
+        stdout: "pipe",
+        stderr: "pipe",
+      });
+      await transcribeProc.exited;
+      
+      if (transcribeProc.exitCode !== 0) {
+        const stderr = await new Response(transcribeProc.stderr).text();
+        console.error(`[voice-transcribe] Transcription failed:`, stderr);
+        return;
+      }
+      
+      transcript = await new Response(transcribeProc.stdout).text();
     }
-    
-    const transcript = await new Response(transcribeProc.stdout).text();
     const trimmedTranscript = transcript.trim();
     
     if (!trimmedTranscript) {
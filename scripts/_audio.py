@@ -0,0 +1,180 @@
+"""Audio helpers built on the ffmpeg/ffprobe command-line tools.
+
+Used by scripts that need to look inside audio (silence detection,
+segment extraction) rather than just pass bytes to the API.
+"""
+
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+class FFmpegError(RuntimeError):
+    """Raised when ffmpeg/ffprobe is missing or fails."""
+
+
+def require_ffmpeg() -> None:
+    for tool in ("ffmpeg", "ffprobe"):
+        if shutil.which(tool) is None:
+            raise FFmpegError(f"{tool} not found on PATH; install ffmpeg to use this mode")
+
+
+def _run(cmd: list[str], input: bytes | None = None) -> subprocess.CompletedProcess:
+    proc = subprocess.run(cmd, input=input, capture_output=True)
+    if proc.returncode != 0:
+        raise FFmpegError(f"{cmd[0]} failed: {proc.stderr.decode(errors='replace').strip()[-500:]}")
+    return proc
+
+
+def probe_duration(path: str | Path) -> float:
+    """Return the duration of a media file in seconds."""
+    proc = _run([
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(path),
+    ])
+    return float(proc.stdout.decode().strip())
+
+
+def probe_audio(path: str | Path) -> tuple[int, int]:
+    """Return (sample_rate, channels) of the first audio stream."""
+    proc = _run([
+        "ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=sample_rate,channels",
+        "-of", "default=noprint_wrappers=1", str(path),
+    ])
+    fields = dict(line.split("=", 1) for line in proc.stdout.decode().split() if "=" in line)
+    return int(fields["sample_rate"]), int(fields["channels"])
+
+
+def detect_silences(
+    path: str | Path, noise_db: float = -35.0, min_silence: float = 0.4, offset: float = 0.0
+) -> list[tuple[float, float]]:
+    """Return (start, end) spans of silence found by ffmpeg's silencedetect filter.
+
+    With ``offset``, only audio from that point on is decoded; the spans are
+    still in seconds from the start of the file.
+    """
+    proc = _run([
+        "ffmpeg", "-hide_banner", "-nostats", "-ss", f"{offset:.3f}", "-i", str(path),
+        "-af", f"silencedetect=n={noise_db}dB:d={min_silence}", "-f", "null", "-",
+    ])
+    silences = []
+    start = None
+    for line in proc.stderr.decode(errors="replace").splitlines():
+        if m := _SILENCE_START.search(line):
+            start = max(0.0, float(m.group(1)))
+        elif (m := _SILENCE_END.search(line)) and start is not None:
+            silences.append((offset + start, offset + float(m.group(1))))
+            start = None
+    return silences
+
+
+def extract_segment(path: str | Path, start: float, end: float, sample_rate: int = 16000) -> bytes:
+    """Decode [start, end) of a media file to mono FLAC bytes."""
+    proc = _run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-ss", f"{start:.3f}", "-to", f"{end:.3f}", "-i", str(path),
+        "-vn", "-ac", "1", "-ar", str(sample_rate), "-f", "flac", "pipe:1",
+    ])
+    return proc.stdout
+
+
+def decode_to_file(path: str | Path, out_path: str | Path, sample_rate: int, channels: int) -> None:
+    """Decode a media file to raw interleaved float32 PCM on disk (for np.memmap)."""
+    _run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(path),
+        "-vn", "-ac", str(channels), "-ar", str(sample_rate), "-f", "f32le", str(out_path),
+    ])
+
+
+def decode_pcm(data: bytes, sample_rate: int, channels: int) -> bytes:
+    """Decode encoded audio bytes to raw interleaved float32 PCM."""
+    return _run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+        "-vn", "-ac", str(channels), "-ar", str(sample_rate), "-f", "f32le", "pipe:1",
+    ], input=data).stdout
+
+
+def encode_flac(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    """Encode raw float32 PCM to FLAC bytes (lossless, compact for upload)."""
+    return _run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "f32le", "-ar", str(sample_rate),
+        "-ac", str(channels), "-i", "pipe:0", "-f", "flac", "pipe:1",
+    ], input=pcm).stdout
+
+
+def encode_file(raw_path: str | Path, output: str | Path, sample_rate: int, channels: int) -> None:
+    """Encode raw float32 PCM from disk to ``output`` (format from its extension)."""
+    _run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-f", "f32le", "-ar", str(sample_rate),
+        "-ac", str(channels), "-i", str(raw_path), str(output),
+    ])
+
+
+class StreamEncoder:
+    """Encode float32 PCM to ``output`` as it is written, through one ffmpeg process.
+
+    Only the chunk being written is in memory, so arbitrarily long audio can
+    be produced piece by piece. Use as a context manager; leaving it with an
+    exception discards the partial output.
+    """
+
+    def __init__(self, output: str | Path, sample_rate: int, channels: int):
+        self.output = Path(output)
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen([
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-f", "f32le", "-ar", str(sample_rate),
+            "-ac", str(channels), "-i", "pipe:0", str(self.output),
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+    def write(self, pcm: bytes) -> None:
+        self._proc.stdin.write(pcm)
+
+    def close(self) -> None:
+        self._proc.stdin.close()
+        if self._proc.wait() != 0:
+            self._stderr.seek(0)
+            raise FFmpegError(f"ffmpeg failed: {self._stderr.read().decode(errors='replace').strip()[-500:]}")
+        self._stderr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        self._proc.kill()
+        self._proc.wait()
+        self._stderr.close()
+        self.output.unlink(missing_ok=True)
+
+
+def plan_segments(
+    duration: float,
+    silences: list[tuple[float, float]],
+    max_seconds: float,
+    min_seconds: float | None = None,
+) -> list[tuple[float, float]]:
+    """Split [0, duration) into spans of at most max_seconds, cutting inside silences.
+
+    Each cut is placed at the midpoint of the latest silence that keeps the
+    span between min_seconds (default: half of max_seconds) and max_seconds;
+    when no silence qualifies the span is cut hard at max_seconds.
+    """
+    if min_seconds is None:
+        min_seconds = max_seconds / 2
+    midpoints = sorted((a + b) / 2 for a, b in silences)
+    spans = []
+    pos = 0.0
+    while duration - pos > max_seconds:
+        candidates = [m for m in midpoints if pos + min_seconds <= m <= pos + max_seconds]
+        cut = candidates[-1] if candidates else pos + max_seconds
+        spans.append((pos, cut))
+        pos = cut
+    spans.append((pos, duration))
+    return spans
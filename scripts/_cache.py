@@ -0,0 +1,200 @@
+"""Content-addressed on-disk cache for generated audio.
+
+Shared by the generation scripts (narrate, sound-effect, compose-music,
+design-voice). Entries are keyed by a SHA-256 of the endpoint name and every
+request parameter that affects the output, so identical requests are served
+from disk instead of the API.
+
+Configuration (environment):
+    ELEVENLABS_CACHE_DIR        cache root (default: $XDG_CACHE_HOME/elevenlabs-skill)
+    ELEVENLABS_CACHE_MAX_BYTES  size bound before LRU eviction (default: 1 GiB)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from _metrics import emit
+
+DEFAULT_MAX_BYTES = 1 << 30
+READ_CHUNK = 64 * 1024
+_STATS_FILE = "stats.json"
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get("ELEVENLABS_CACHE_DIR"):
+        return Path(os.environ["ELEVENLABS_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "elevenlabs-skill"
+
+
+def cache_key(endpoint: str, **params) -> str:
+    """Return a stable hex digest for an endpoint call and its parameters."""
+    payload = json.dumps({"endpoint": endpoint, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Size-bounded LRU cache of API responses stored as files.
+
+    Recency is tracked with file atimes (refreshed on every hit) while the
+    mtime keeps the time an entry was stored, so callers can put a
+    ``max_age`` on results that go stale. Writes go through a temp file plus
+    ``os.replace`` so readers never see a partial entry, and hit/miss
+    counters are accumulated in ``stats.json``.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        max_bytes: int | None = None,
+        enabled: bool = True,
+        refresh: bool = False,
+    ):
+        self.root = Path(root) if root else default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("ELEVENLABS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def get(self, key: str, max_age: float | None = None) -> Path | None:
+        """Return the entry path on a hit (marking it recently used), else None.
+
+        An entry stored more than ``max_age`` seconds ago counts as a miss.
+        """
+        if not self.enabled or self.refresh:
+            return None
+        path = self.path(key)
+        now = time.time()
+        try:
+            st = path.stat()
+            if max_age is not None and now - st.st_mtime > max_age:
+                return None
+            os.utime(path, (now, st.st_mtime))
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_served += st.st_size
+        return path
+
+    def fetch(
+        self, endpoint: str, params: dict, produce: Callable[[], Iterable[bytes]], max_age: float | None = None
+    ) -> Iterator[bytes]:
+        """Yield cached audio for the request, or stream ``produce()`` while storing it."""
+        key = cache_key(endpoint, **params)
+        path = self.get(key, max_age)
+        if path is not None:
+            emit("cache", endpoint=endpoint, result="hit", key=key)
+            yield from _read_chunks(path)
+            return
+        if not self.enabled:
+            yield from produce()
+            return
+        emit("cache", endpoint=endpoint, result="refresh" if self.refresh else "miss", key=key)
+        with self._lock:
+            self.misses += 1
+        yield from self._store(key, produce())
+
+    def fetch_bytes(
+        self, endpoint: str, params: dict, produce: Callable[[], bytes], max_age: float | None = None
+    ) -> bytes:
+        """Like :meth:`fetch` for endpoints that return a single payload."""
+        return b"".join(self.fetch(endpoint, params, lambda: [produce()], max_age))
+
+    def _store(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    tmp.write(chunk)
+                    yield chunk
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def entries(self) -> list[os.stat_result]:
+        return [p.stat() for p in self.root.glob("??/*.bin")]
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        with self._lock:
+            files = []
+            for p in self.root.glob("??/*.bin"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_atime, st.st_size, p))
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, p in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            return removed
+
+    def clear(self) -> int:
+        removed = 0
+        for p in self.root.glob("??/*.bin"):
+            p.unlink(missing_ok=True)
+            removed += 1
+        (self.root / _STATS_FILE).unlink(missing_ok=True)
+        return removed
+
+    def stats(self) -> dict:
+        """Return persisted counters merged with this session's counters."""
+        totals = {"hits": 0, "misses": 0, "bytes_served": 0}
+        try:
+            totals.update(json.loads((self.root / _STATS_FILE).read_text()))
+        except (FileNotFoundError, ValueError):
+            pass
+        totals["hits"] += self.hits
+        totals["misses"] += self.misses
+        totals["bytes_served"] += self.bytes_served
+        entries = self.entries() if self.root.exists() else []
+        totals["entries"] = len(entries)
+        totals["size_bytes"] = sum(st.st_size for st in entries)
+        totals["max_bytes"] = self.max_bytes
+        return totals
+
+    def save_stats(self) -> None:
+        """Fold this session's counters into stats.json (atomically)."""
+        if not self.enabled or not (self.hits or self.misses):
+            return
+        totals = self.stats()
+        persisted = {k: totals[k] for k in ("hits", "misses", "bytes_served")}
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(persisted, tmp)
+        os.replace(tmp_name, self.root / _STATS_FILE)
+        self.hits = self.misses = self.bytes_served = 0
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK):
+            yield chunk
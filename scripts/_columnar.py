@@ -0,0 +1,150 @@
+"""Compact columnar transcript storage.
+
+A transcript is stored as a directory of NumPy ``.npy`` arrays that can be
+memory-mapped, instead of one JSON dict per word:
+
+    start.npy, end.npy   float32 seconds (NaN when missing)
+    logprob.npy          float32 (NaN when missing)
+    type.npy             int8 code into meta["types"]
+    speaker.npy          int16 code into meta["speakers"] (-1 = no speaker)
+    tokens.npy           uint8 UTF-8 bytes of all word texts concatenated
+    offsets.npy          uint64 byte offsets, token i is tokens[offsets[i]:offsets[i + 1]]
+    meta.json            format version, word count, type/speaker tables, full text
+
+Per-character timestamps (``characters``) are not stored.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_COLUMNS = ("start", "end", "logprob", "type", "speaker", "tokens", "offsets")
+
+
+def _field(word, name: str):
+    return word.get(name) if isinstance(word, dict) else getattr(word, name, None)
+
+
+def write_columnar(text: str, words: Iterable, path: str | Path) -> Path:
+    """Write a transcript (full text plus word list) as a columnar directory."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    words = list(words)
+    n = len(words)
+
+    types: dict[str, int] = {}
+    speakers: dict[str, int] = {}
+    start = np.full(n, np.nan, dtype=np.float32)
+    end = np.full(n, np.nan, dtype=np.float32)
+    logprob = np.full(n, np.nan, dtype=np.float32)
+    type_codes = np.zeros(n, dtype=np.int8)
+    speaker_codes = np.full(n, -1, dtype=np.int16)
+    offsets = np.zeros(n + 1, dtype=np.uint64)
+    encoded = []
+
+    position = 0
+    for i, word in enumerate(words):
+        for column, name in ((start, "start"), (end, "end"), (logprob, "logprob")):
+            value = _field(word, name)
+            if value is not None:
+                column[i] = value
+        type_codes[i] = types.setdefault(_field(word, "type") or "word", len(types))
+        speaker = _field(word, "speaker_id")
+        if speaker is not None:
+            speaker_codes[i] = speakers.setdefault(speaker, len(speakers))
+        token = (_field(word, "text") or "").encode("utf-8")
+        encoded.append(token)
+        position += len(token)
+        offsets[i + 1] = position
+
+    tokens = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    columns = dict(start=start, end=end, logprob=logprob, type=type_codes,
+                   speaker=speaker_codes, tokens=tokens, offsets=offsets)
+    for name, array in columns.items():
+        np.save(path / f"{name}.npy", array)
+    meta = {
+        "version": FORMAT_VERSION,
+        "count": n,
+        "types": list(types),
+        "speakers": list(speakers),
+        "text": text,
+    }
+    (path / "meta.json").write_text(json.dumps(meta))
+    return path
+
+
+class ColumnarTranscript:
+    """Read-only view over a columnar transcript directory.
+
+    Arrays are memory-mapped by default, so opening a transcript costs only
+    the metadata read; columns are exposed directly for vectorized analysis.
+    """
+
+    def __init__(self, path: str | Path, mmap: bool = True):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text())
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar transcript version: {meta.get('version')}")
+        self.text: str = meta["text"]
+        self.types: list[str] = meta["types"]
+        self.speakers: list[str] = meta["speakers"]
+        mode = "r" if mmap else None
+        arrays = {name: np.load(self.path / f"{name}.npy", mmap_mode=mode) for name in _COLUMNS}
+        self.start = arrays["start"]
+        self.end = arrays["end"]
+        self.logprob = arrays["logprob"]
+        self.type_codes = arrays["type"]
+        self.speaker_codes = arrays["speaker"]
+        self._tokens = arrays["tokens"]
+        self._offsets = arrays["offsets"]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def token(self, i: int) -> str:
+        a, b = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._tokens[a:b].tobytes().decode("utf-8")
+
+    def word(self, i: int) -> dict:
+        """Return word i in the same shape as the JSON transcript format."""
+
+        def value(column, digits):
+            v = float(column[i])
+            return None if np.isnan(v) else round(v, digits)
+
+        speaker = int(self.speaker_codes[i])
+        return {
+            "text": self.token(i),
+            "start": value(self.start, 3),
+            "end": value(self.end, 3),
+            "type": self.types[int(self.type_codes[i])],
+            "speaker_id": self.speakers[speaker] if speaker >= 0 else None,
+            "logprob": value(self.logprob, 6),
+            "characters": None,
+        }
+
+    def words(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self.word(i)
+
+    def mask(self, kind: str) -> np.ndarray:
+        """Boolean mask of tokens of the given type (e.g. "word")."""
+        if kind not in self.types:
+            return np.zeros(len(self), dtype=bool)
+        return self.type_codes == self.types.index(kind)
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "words": list(self.words())}
+
+
+def load_columnar(path: str | Path, mmap: bool = True) -> ColumnarTranscript:
+    return ColumnarTranscript(path, mmap=mmap)
+
+
+def convert_json(json_path: str | Path, out_path: str | Path) -> Path:
+    """Convert a transcribe.py JSON transcript to the columnar format."""
+    payload = json.loads(Path(json_path).read_text())
+    return write_columnar(payload.get("text", ""), payload.get("words") or [], out_path)
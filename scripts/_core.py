@@ -0,0 +1,87 @@
+"""Shared setup for the scripts: voice resolution and the client factory.
+
+The ElevenLabs SDK is imported only when a client is first used, so
+``--help``, usage errors and cache hits never pay its import cost. Scripts
+get their client from :func:`get_client`, which also routes calls through
+the worker daemon when it is running.
+
+ELEVENLABS_BASE_URL points the SDK at another API host (e.g. the local fake
+server used by ``tests/benchmark.py``).
+"""
+
+import os
+import re
+import threading
+
+import _metrics
+from _daemon import connect_client
+
+FEMALE_VOICES = {
+    "sarah": "EXAVITQu4vr4xnSDxMaL",
+    "rachel": "21m00Tcm4TlvDq8ikWAM",
+    "dorothy": "ThT5KcBeYPX3keUQqHPh",
+}
+
+
+_VOICE_ID = re.compile(r"(?=.*[A-Z0-9])[A-Za-z0-9]{16,32}")
+
+
+def resolve_voice(voice: str) -> str:
+    """Map a voice name to its ID.
+
+    Built-in names and strings shaped like voice IDs resolve without I/O;
+    any other name is matched against the account's cached voice list (see
+    :mod:`_voice_registry`), raising LookupError when nothing matches.
+    """
+    if voice.lower() in FEMALE_VOICES:
+        return FEMALE_VOICES[voice.lower()]
+    if _VOICE_ID.fullmatch(voice):
+        return voice
+    from _voice_registry import shared_registry
+
+    return shared_registry().resolve(voice)
+
+
+def _client_kwargs(kwargs: dict, asynchronous: bool = False) -> dict:
+    if os.environ.get("ELEVENLABS_BASE_URL"):
+        kwargs.setdefault("base_url", os.environ["ELEVENLABS_BASE_URL"])
+    if _metrics.enabled() and "httpx_client" not in kwargs:
+        kwargs["httpx_client"] = _metrics.http_client(asynchronous)
+    return kwargs
+
+
+def sdk_client(**kwargs):
+    """Create an in-process ``ElevenLabs`` client, importing the SDK on first use."""
+    from elevenlabs import ElevenLabs
+
+    return ElevenLabs(**_client_kwargs(kwargs))
+
+
+def async_sdk_client(**kwargs):
+    """Create an ``AsyncElevenLabs`` client, importing the SDK on first use."""
+    from elevenlabs import AsyncElevenLabs
+
+    return AsyncElevenLabs(**_client_kwargs(kwargs, asynchronous=True))
+
+
+class LazyClient:
+    """Client handle that connects (daemon or SDK) on first attribute access."""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        with self._lock:
+            if self._client is None:
+                # Looked up at call time so tests can patch sdk_client
+                self._client = connect_client(sdk_client)
+            return self._client
+
+    def __getattr__(self, name: str):
+        return getattr(self._client if self._client is not None else self._resolve(), name)
+
+
+def get_client() -> LazyClient:
+    """The client every script uses: the daemon when it is running, else ``sdk_client()``."""
+    return LazyClient()
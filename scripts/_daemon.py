@@ -0,0 +1,276 @@
+"""Persistent worker daemon protocol: a shared SDK client behind a Unix socket.
+
+The daemon (``audio-daemon.py serve``) creates one ElevenLabs client with a
+pooled, keep-alive HTTP connection and serves SDK calls to local clients.
+Scripts obtain their client through :func:`connect_client`, which returns a
+:class:`DaemonClient` proxy when the daemon is running and a regular SDK
+client otherwise, so the same code works either way.
+
+Wire format (one request per connection):
+    request   one JSON line: {"method": "speech_to_text.convert", "kwargs": {...}}
+              open files/paths are sent as {"$file": "/abs/path"}, bytes as {"$bytes": base64}
+    response  one JSON line header, then for audio streams length-prefixed frames:
+              {"ok": true, "kind": "stream"}  [u32 length][data] ... [u32 0]
+              {"ok": true, "kind": "object", "value": {...}}
+              {"ok": false, "error": "...", "type": "ApiError"}
+"""
+
+import base64
+import json
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+from itertools import chain
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+from _metrics import RequestTimer
+
+# SDK methods the daemon is willing to call
+METHODS = frozenset({
+    "text_to_speech.convert",
+    "text_to_speech.stream",
+    "speech_to_text.convert",
+    "speech_to_speech.convert",
+    "audio_isolation.convert",
+    "text_to_sound_effects.convert",
+    "music.compose",
+    "text_to_voice.create_previews",
+})
+
+_FRAME = struct.Struct("!I")
+
+
+class DaemonError(RuntimeError):
+    """An SDK call failed inside the daemon."""
+
+
+def default_socket_path() -> Path:
+    if os.environ.get("ELEVENLABS_DAEMON_SOCKET"):
+        return Path(os.environ["ELEVENLABS_DAEMON_SOCKET"])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return Path(runtime_dir) / f"elevenlabs-skill-{os.getuid()}.sock"
+
+
+def daemon_available(path: str | Path | None = None) -> bool:
+    path = Path(path) if path else default_socket_path()
+    if not path.exists():
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.2)
+            sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+
+
+def connect_client(factory):
+    """Return a daemon proxy when the daemon is reachable, else ``factory()``.
+
+    Set ELEVENLABS_DAEMON=0 to always use an in-process client.
+    """
+    if os.environ.get("ELEVENLABS_DAEMON") != "0" and daemon_available():
+        return DaemonClient()
+    return factory()
+
+
+def encode_value(value):
+    """Encode call arguments for the wire (files by path, bytes inline)."""
+    if hasattr(value, "read") and getattr(value, "name", None) and Path(value.name).is_file():
+        return {"$file": str(Path(value.name).resolve())}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$bytes": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    return value
+
+
+def decode_value(value, opened: list):
+    """Inverse of :func:`encode_value`; files are opened and recorded in ``opened``."""
+    if isinstance(value, dict):
+        if set(value) == {"$file"}:
+            handle = open(value["$file"], "rb")
+            opened.append(handle)
+            return handle
+        if set(value) == {"$bytes"}:
+            return base64.b64decode(value["$bytes"])
+        return {k: decode_value(v, opened) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v, opened) for v in value]
+    return value
+
+
+def to_plain(value):
+    """Convert SDK response models to JSON-compatible structures."""
+    if hasattr(value, "model_dump"):
+        return to_plain(value.model_dump())
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "__dict__"):
+        return to_plain(vars(value))
+    return str(value)
+
+
+def to_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def write_header(wfile, header: dict) -> None:
+    wfile.write(json.dumps(header).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+def write_frames(wfile, chunks) -> None:
+    for chunk in chunks:
+        if chunk:
+            wfile.write(_FRAME.pack(len(chunk)) + chunk)
+            wfile.flush()
+    wfile.write(_FRAME.pack(0))
+    wfile.flush()
+
+
+def _read_frames(sock: socket.socket, rfile, timer: RequestTimer) -> Iterator[bytes]:
+    error = None
+    try:
+        while True:
+            head = rfile.read(_FRAME.size)
+            if len(head) < _FRAME.size:
+                raise DaemonError("Daemon closed the stream before it finished")
+            (length,) = _FRAME.unpack(head)
+            if length == 0:
+                return
+            chunk = rfile.read(length)
+            timer.download_bytes += len(chunk)
+            yield chunk
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        rfile.close()
+        sock.close()
+        timer.finish(error)
+
+
+def call(method: str, kwargs: dict, socket_path: str | Path | None = None):
+    """Invoke an SDK method through the daemon.
+
+    Returns an iterator of audio chunks for streaming endpoints or a
+    SimpleNamespace tree for object responses.
+    """
+    # Phases are timed on the socket; see _metrics for the event fields
+    timer = RequestTimer("CALL", method, transport="daemon")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    timer.trace("daemon.connect_tcp.started", {})
+    sock.connect(str(socket_path or default_socket_path()))
+    timer.trace("daemon.connect_tcp.complete", {})
+    request = json.dumps({"method": method, "kwargs": encode_value(kwargs)}).encode("utf-8") + b"\n"
+    timer.trace("daemon.send_request_headers.started", {})
+    sock.sendall(request)
+    timer.trace("daemon.send_request_body.complete", {})
+    timer.upload_bytes = len(request)
+    timer.hash_body(request)
+    rfile = sock.makefile("rb")
+    header_line = rfile.readline()
+    timer.trace("daemon.receive_response_headers.complete", {})
+    header = json.loads(header_line or b"{}")
+    if not header.get("ok"):
+        rfile.close()
+        sock.close()
+        error = DaemonError(f"{header.get('type', 'Error')}: {header.get('error', 'no response from daemon')}")
+        timer.finish(error)
+        raise error
+    timer.status = 200
+    if header["kind"] == "stream":
+        return _read_frames(sock, rfile, timer)
+    rfile.close()
+    sock.close()
+    timer.download_bytes = len(header_line)
+    timer.finish()
+    return to_namespace(header["value"])
+
+
+class DaemonClient:
+    """Drop-in stand-in for ``ElevenLabs()`` that forwards calls to the daemon."""
+
+    def __init__(self, socket_path: str | Path | None = None, _prefix: str = ""):
+        self._socket_path = socket_path
+        self._prefix = _prefix
+
+    def __getattr__(self, name: str):
+        path = f"{self._prefix}.{name}" if self._prefix else name
+        if path not in METHODS and not any(m.startswith(path + ".") for m in METHODS):
+            raise AttributeError(name)
+        return DaemonClient(self._socket_path, path)
+
+    def __call__(self, **kwargs):
+        if self._prefix not in METHODS:
+            raise AttributeError(f"Method not served by the daemon: {self._prefix}")
+        return call(self._prefix, kwargs, self._socket_path)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        opened: list = []
+        header_sent = False
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+            method = request.get("method")
+            if method not in METHODS:
+                raise ValueError(f"Unsupported method: {method}")
+            target = self.server.client
+            for part in method.split("."):
+                target = getattr(target, part)
+            result = target(**decode_value(request.get("kwargs") or {}, opened))
+            if hasattr(result, "model_dump") or not hasattr(result, "__iter__") or isinstance(result, dict):
+                write_header(self.wfile, {"ok": True, "kind": "object", "value": to_plain(result)})
+                header_sent = True
+                return
+            chunks = iter([result] if isinstance(result, bytes) else result)
+            # Pull the first chunk before answering so request errors become error headers
+            first = next(chunks, b"")
+            write_header(self.wfile, {"ok": True, "kind": "stream"})
+            header_sent = True
+            write_frames(self.wfile, chain([first], chunks))
+        except Exception as exc:
+            if not header_sent:
+                write_header(self.wfile, {"ok": False, "error": str(exc), "type": type(exc).__name__})
+        finally:
+            for handle in opened:
+                handle.close()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix-socket server sharing one SDK client across requests."""
+
+    daemon_threads = True
+
+    def __init__(self, client, socket_path: str | Path | None = None):
+        self.client = client
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        if self.socket_path.exists():
+            if daemon_available(self.socket_path):
+                raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()
+        previous_umask = os.umask(0o077)
+        try:
+            super().__init__(str(self.socket_path), _Handler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self):
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
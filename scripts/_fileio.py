@@ -0,0 +1,193 @@
+"""Bounded-memory file helpers shared by the scripts.
+
+Uploads are passed to the SDK as open file handles so the HTTP client
+streams them from disk, and downloads are written through a fixed-size
+buffer so memory stays flat regardless of payload size.
+"""
+
+import base64
+import glob
+import hashlib
+import io
+import os
+import queue
+import re
+import resource
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+WRITE_BUFFER = 256 * 1024
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".opus", ".flac", ".mp4", ".mov", ".webm")
+
+
+def write_chunks(chunks: Iterable[bytes], path: str | Path, buffer_size: int = WRITE_BUFFER) -> int:
+    """Stream chunks to path through a bounded write buffer, returning bytes written."""
+    written = 0
+    with open(path, "wb", buffering=buffer_size) as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def write_atomic(chunks: Iterable[bytes], path: str | Path) -> int:
+    """Like :func:`write_chunks` via a .part file, so an interrupted download never looks finished."""
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    try:
+        written = write_chunks(chunks, partial)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, path)
+    return written
+
+
+def iter_base64(text: str, chunk_size: int = WRITE_BUFFER) -> Iterator[bytes]:
+    """Decode base64 text in fixed-size slices, so the decoded audio never exists in full."""
+    step = chunk_size // 3 * 4  # whole 4-character groups decode independently
+    for start in range(0, len(text), step):
+        yield base64.b64decode(text[start:start + step])
+
+
+def slugify(text: str, limit: int = 40) -> str:
+    """Filename-safe lowercase form of free text, e.g. a description."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:limit].rstrip("-") or "untitled"
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def expand_media(spec: str, exclude: str | Path | None = None) -> tuple[Path, list[Path]]:
+    """Resolve a directory or glob pattern to (root, sorted media files under it).
+
+    A directory yields every audio/video file below it; a pattern such as
+    ``course/**/*.wav`` yields its matches, with the root being the part of
+    the pattern before the first wildcard. Files under ``exclude`` (e.g. an
+    output directory inside the input tree) are left out.
+    """
+    if glob.has_magic(spec):
+        parts = Path(spec).parts
+        fixed = next(i for i, part in enumerate(parts) if glob.has_magic(part))
+        root = Path(*parts[:fixed]) if fixed else Path(".")
+        files = [Path(p) for p in glob.glob(spec, recursive=True)]
+    else:
+        root = Path(spec)
+        files = [p for p in root.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS]
+    skip = Path(exclude).resolve() if exclude else None
+    return root, sorted(p for p in files if p.is_file() and not (skip and p.resolve().is_relative_to(skip)))
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class ChunkPipe(io.RawIOBase):
+    """Binary file object fed from a chunk iterator on a background thread.
+
+    Lets one API response be uploaded as the next request's body while it is
+    still arriving: ``read`` blocks until data is available and returns b""
+    once the iterator is exhausted (re-raising any error it hit). At most
+    ``max_chunks`` chunks wait between producer and reader. Everything read
+    is also spooled (memory first, then disk) so ``seek(0)`` can replay it
+    for a client-side retry. There is deliberately no length or ``tell``, so
+    HTTP clients send the body with chunked transfer encoding.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], name: str = "stream.mp3", max_chunks: int = 64):
+        super().__init__()
+        self.name = name
+        self.bytes_read = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._pending = b""
+        self._done = False
+        self._replay = tempfile.SpooledTemporaryFile(max_size=16 << 20)
+        self._replay_pos: int | None = None  # read position while replaying after seek(0)
+        self._thread = threading.Thread(target=self._produce, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _produce(self, chunks: Iterable[bytes]) -> None:
+        try:
+            for chunk in chunks:
+                if chunk:
+                    self._queue.put(chunk)
+        except BaseException as exc:
+            self._queue.put(exc)
+        else:
+            self._queue.put(None)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("ChunkPipe can only rewind to the start")
+        self._replay_pos = 0
+        return 0
+
+    def tell(self) -> int:
+        raise io.UnsupportedOperation("ChunkPipe has no length")
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(WRITE_BUFFER), b""))
+        if self._replay_pos is not None:
+            self._replay.seek(self._replay_pos)
+            data = self._replay.read(size)
+            self._replay_pos += len(data)
+            if data:
+                return data
+            self._replay_pos = None
+            self._replay.seek(0, io.SEEK_END)
+        while not self._pending and not self._done:
+            item = self._queue.get()
+            if item is None:
+                self._done = True
+            elif isinstance(item, BaseException):
+                self._done = True
+                raise item
+            else:
+                self._pending = item
+        data, self._pending = self._pending[:size], self._pending[size:]
+        self._replay.write(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def __next__(self) -> bytes:
+        # Iterate in chunks: IOBase would split on newlines, one byte at a time
+        chunk = self.read(WRITE_BUFFER)
+        if not chunk:
+            raise StopIteration
+        return chunk
+
+    def close(self) -> None:
+        self._replay.close()
+        super().close()
+
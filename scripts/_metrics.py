@@ -0,0 +1,358 @@
+"""Opt-in per-request timing for API calls.
+
+Enabled per run with ``--metrics FILE`` (or ELEVENLABS_METRICS). Every API
+request then emits one JSON line with its phases:
+
+    connect_s    DNS + TCP (+ TLS) connect, null when a pooled connection was reused
+    upload_s     sending the request headers and body, with upload_bytes
+    wait_s       from the end of the upload to the response headers (server processing)
+    ttfb_s       from the start of the request to the response headers
+    transfer_s   reading the response body, with download_bytes
+
+A request repeated after its own 429/5xx or transport error (same method,
+URL and body) is flagged ``"retry": true``, and cache
+lookups and backoff sleeps are emitted as ``cache`` and ``retry`` events.
+``--metrics-prom FILE`` (ELEVENLABS_METRICS_PROM) additionally writes the
+run's totals in Prometheus textfile-collector format, and ``--profile FILE``
+dumps a cProfile of the run. SDK calls are timed by an instrumented httpx
+transport; calls forwarded to the worker daemon are timed on the socket.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+
+PHASES = ("connect_s", "upload_s", "wait_s", "ttfb_s", "transfer_s", "total_s")
+_ID_SEGMENT = re.compile(r"/(?=[\w-]*[A-Z0-9])[\w-]{16,}(?=/|$)")
+
+_recorder = None
+
+
+def endpoint_name(path: str) -> str:
+    """URL path with voice/model IDs collapsed, e.g. /v1/text-to-speech/:id/stream."""
+    return _ID_SEGMENT.sub("/:id", path.split("?")[0])
+
+
+class Recorder:
+    """Writes events as JSON lines and aggregates them for the Prometheus file."""
+
+    def __init__(self, script: str, jsonl_path: str | None = None, prom_path: str | None = None):
+        self.script = script
+        self.prom_path = Path(prom_path) if prom_path else None
+        self._lock = threading.Lock()
+        self._out = None
+        if jsonl_path == "-":
+            self._out = sys.stderr
+        elif jsonl_path:
+            self._out = open(jsonl_path, "a", buffering=1)
+        self._failed: set[str] = set()  # fingerprints of requests whose last attempt failed
+        self.requests = defaultdict(int)  # (endpoint, status) -> count
+        self.retries = defaultdict(int)  # endpoint -> count
+        self.phase_sum = defaultdict(float)  # (endpoint, phase) -> seconds
+        self.phase_count = defaultdict(int)
+        self.bytes = defaultdict(int)  # (endpoint, direction) -> bytes
+        self.cache = defaultdict(int)  # result -> count
+
+    def emit(self, event: str, **fields) -> dict:
+        record = {"ts": round(time.time(), 6), "script": self.script, "event": event, **fields}
+        with self._lock:
+            if event == "request":
+                # Identify the request itself, so concurrent calls to one endpoint don't mark each other
+                key = record.pop("fingerprint", None)
+                record["retry"] = key is not None and key in self._failed
+                status = record.get("status")
+                if key is None:
+                    pass
+                elif status == 429 or (status or 0) >= 500 or record.get("error"):
+                    self._failed.add(key)
+                else:
+                    self._failed.discard(key)
+                self._aggregate(record)
+            elif event == "cache":
+                self.cache[record["result"]] += 1
+            if self._out:
+                self._out.write(json.dumps(record) + "\n")
+        return record
+
+    def _aggregate(self, record: dict) -> None:
+        endpoint = record.get("endpoint", "")
+        self.requests[endpoint, str(record.get("status") or "error")] += 1
+        if record["retry"]:
+            self.retries[endpoint] += 1
+        for phase in PHASES:
+            if record.get(phase) is not None:
+                self.phase_sum[endpoint, phase] += record[phase]
+                self.phase_count[endpoint, phase] += 1
+        for direction in ("upload", "download"):
+            self.bytes[endpoint, direction] += record.get(f"{direction}_bytes") or 0
+
+    def prometheus(self) -> str:
+        script = self.script
+
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{k}="{v}"' for k, v in {"script": script, **values}.items()) + "}"
+
+        lines = [
+            "# HELP elevenlabs_api_requests_total API requests by endpoint and HTTP status.",
+            "# TYPE elevenlabs_api_requests_total counter",
+        ]
+        lines += [f"elevenlabs_api_requests_total{labels(endpoint=e, status=s)} {n}" for (e, s), n in sorted(self.requests.items())]
+        lines += [
+            "# HELP elevenlabs_api_retries_total Requests repeated after a 429/5xx or transport error.",
+            "# TYPE elevenlabs_api_retries_total counter",
+        ]
+        lines += [f"elevenlabs_api_retries_total{labels(endpoint=e)} {n}" for e, n in sorted(self.retries.items())]
+        lines += [
+            "# HELP elevenlabs_api_phase_seconds Time spent per request phase.",
+            "# TYPE elevenlabs_api_phase_seconds summary",
+        ]
+        for (e, phase), total in sorted(self.phase_sum.items()):
+            name = phase.removesuffix("_s")
+            lines.append(f"elevenlabs_api_phase_seconds_sum{labels(endpoint=e, phase=name)} {total:.6f}")
+            lines.append(f"elevenlabs_api_phase_seconds_count{labels(endpoint=e, phase=name)} {self.phase_count[e, phase]}")
+        lines += [
+            "# HELP elevenlabs_api_bytes_total Request and response body bytes.",
+            "# TYPE elevenlabs_api_bytes_total counter",
+        ]
+        lines += [f"elevenlabs_api_bytes_total{labels(endpoint=e, direction=d)} {n}" for (e, d), n in sorted(self.bytes.items())]
+        lines += [
+            "# HELP elevenlabs_cache_lookups_total Audio cache lookups by result.",
+            "# TYPE elevenlabs_cache_lookups_total counter",
+        ]
+        lines += [f"elevenlabs_cache_lookups_total{labels(result=r)} {n}" for r, n in sorted(self.cache.items())]
+        lines += [
+            "# HELP elevenlabs_last_run_timestamp_seconds When the script last finished.",
+            "# TYPE elevenlabs_last_run_timestamp_seconds gauge",
+            f"elevenlabs_last_run_timestamp_seconds{labels()} {time.time():.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self._out and self._out is not sys.stderr:
+            self._out.close()
+        if self.prom_path:
+            # Atomic replace so the node exporter never reads a partial file
+            self.prom_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.prom_path.parent, prefix=".prom-")
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.prom_path)
+
+
+def enabled() -> bool:
+    return _recorder is not None
+
+
+def emit(event: str, **fields) -> None:
+    """Record an event when instrumentation is on; a no-op otherwise."""
+    if _recorder is not None:
+        _recorder.emit(event, **fields)
+
+
+@contextmanager
+def recording(script: str, jsonl_path: str | None = None, prom_path: str | None = None):
+    global _recorder
+    _recorder = Recorder(script, jsonl_path, prom_path)
+    try:
+        yield _recorder
+    finally:
+        _recorder.close()
+        _recorder = None
+
+
+class RequestTimer:
+    """Collects httpcore trace events and byte counts for one HTTP request."""
+
+    def __init__(self, method: str, path: str, transport: str = "http", target: str | None = None, boundary: bytes | None = None):
+        self.fields = {"transport": transport, "method": method, "endpoint": endpoint_name(path)}
+        # Method, full target and body digest identify a retried request; a multipart
+        # boundary is random per attempt, so it is left out of the digest
+        self._digest = hashlib.sha256(f"{method} {target or path}".encode())
+        self._boundary = boundary
+        self.start = time.perf_counter()
+        self.marks: dict[str, float] = {}
+        self.upload_bytes = 0
+        self.download_bytes = 0
+        self.status = None
+        self._done = False
+
+    def hash_body(self, chunk: bytes) -> None:
+        self._digest.update(chunk.replace(self._boundary, b"") if self._boundary else chunk)
+
+    def trace(self, name: str, info: dict) -> None:
+        # e.g. "connection.connect_tcp.started", "http11.send_request_body.complete"
+        self.marks.setdefault(name.split(".", 1)[-1], time.perf_counter())
+
+    async def atrace(self, name: str, info: dict) -> None:
+        self.trace(name, info)
+
+    def _span(self, begin: str, end: str) -> float | None:
+        if begin in self.marks and end in self.marks:
+            return round(self.marks[end] - self.marks[begin], 6)
+        return None
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if self._done:
+            return
+        self._done = True
+        end = time.perf_counter()
+        marks = self.marks
+        connect = self._span("connect_tcp.started", "connect_tcp.complete")
+        if connect is not None and "start_tls.complete" in marks:
+            connect += self._span("start_tls.started", "start_tls.complete") or 0.0
+        headers = marks.get("receive_response_headers.complete")
+        sent = marks.get("send_request_body.complete")
+        emit(
+            "request",
+            **self.fields,
+            status=self.status,
+            reused=connect is None,
+            connect_s=round(connect, 6) if connect is not None else None,
+            upload_s=self._span("send_request_headers.started", "send_request_body.complete"),
+            upload_bytes=self.upload_bytes,
+            wait_s=round(headers - sent, 6) if headers and sent else None,
+            ttfb_s=round(headers - self.start, 6) if headers else None,
+            transfer_s=round(end - headers, 6) if headers else None,
+            download_bytes=self.download_bytes,
+            total_s=round(end - self.start, 6),
+            error=f"{type(error).__name__}: {error}" if error else None,
+            fingerprint=self._digest.hexdigest(),
+        )
+
+
+@functools.cache
+def _transport_classes():
+    import httpx
+
+    class CountingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+        def __init__(self, stream, timer: RequestTimer, direction: str):
+            self.stream, self.timer, self.direction = stream, timer, direction
+
+        def _count(self, chunk: bytes) -> None:
+            if self.direction == "upload":
+                self.timer.upload_bytes += len(chunk)
+                self.timer.hash_body(chunk)
+            else:
+                self.timer.download_bytes += len(chunk)
+
+        def __iter__(self):
+            for chunk in self.stream:
+                self._count(chunk)
+                yield chunk
+
+        async def __aiter__(self):
+            async for chunk in self.stream:
+                self._count(chunk)
+                yield chunk
+
+        def close(self):
+            try:
+                if hasattr(self.stream, "close"):
+                    self.stream.close()
+            finally:
+                if self.direction == "download":
+                    self.timer.finish()
+
+        async def aclose(self):
+            try:
+                if hasattr(self.stream, "aclose"):
+                    await self.stream.aclose()
+            finally:
+                if self.direction == "download":
+                    self.timer.finish()
+
+    def request_timer(request) -> RequestTimer:
+        content_type = request.headers.get("content-type", "")
+        boundary = content_type.partition("boundary=")[2].strip('"').encode() or None
+        return RequestTimer(request.method, request.url.path, target=str(request.url), boundary=boundary)
+
+    class InstrumentedTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            timer = request_timer(request)
+            request.extensions = {**request.extensions, "trace": timer.trace}
+            request.stream = CountingStream(request.stream, timer, "upload")
+            try:
+                response = super().handle_request(request)
+            except BaseException as exc:
+                timer.finish(exc)
+                raise
+            timer.status = response.status_code
+            response.stream = CountingStream(response.stream, timer, "download")
+            return response
+
+    class AsyncInstrumentedTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            timer = request_timer(request)
+            request.extensions = {**request.extensions, "trace": timer.atrace}
+            request.stream = CountingStream(request.stream, timer, "upload")
+            try:
+                response = await super().handle_async_request(request)
+            except BaseException as exc:
+                timer.finish(exc)
+                raise
+            timer.status = response.status_code
+            response.stream = CountingStream(response.stream, timer, "download")
+            return response
+
+    return InstrumentedTransport, AsyncInstrumentedTransport
+
+
+def http_transport(asynchronous: bool = False, **kwargs):
+    """An httpx transport that emits a ``request`` event per HTTP request."""
+    sync_cls, async_cls = _transport_classes()
+    return (async_cls if asynchronous else sync_cls)(**kwargs)
+
+
+def http_client(asynchronous: bool = False):
+    """An httpx client using :func:`http_transport`, for passing to the SDK."""
+    import httpx
+
+    cls = httpx.AsyncClient if asynchronous else httpx.Client
+    return cls(transport=http_transport(asynchronous), timeout=httpx.Timeout(240.0), follow_redirects=True)
+
+
+def _run_profiled(func, path: str, *args, **kwargs):
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+        click.echo(summary.getvalue(), err=True)
+        click.echo(f"Profile saved to {path} (inspect with: python -m pstats {path})", err=True)
+
+
+def instrumented(func):
+    """Add --metrics/--metrics-prom/--profile to a click command's callback."""
+
+    @functools.wraps(func)
+    def wrapper(*args, metrics: str | None, metrics_prom: str | None, profile: str | None, **kwargs):
+        if not (metrics or metrics_prom):
+            return _run_profiled(func, profile, *args, **kwargs) if profile else func(*args, **kwargs)
+        with recording(Path(sys.argv[0]).stem, metrics, metrics_prom):
+            return _run_profiled(func, profile, *args, **kwargs) if profile else func(*args, **kwargs)
+
+    wrapper.__click_params__ = list(getattr(func, "__click_params__", []))
+    wrapper = click.option("--profile", type=click.Path(dir_okay=False), help="Write a cProfile of the run to FILE and print the top entries")(wrapper)
+    wrapper = click.option("--metrics-prom", envvar="ELEVENLABS_METRICS_PROM", type=click.Path(dir_okay=False), help="Write run totals as a Prometheus textfile")(wrapper)
+    wrapper = click.option("--metrics", envvar="ELEVENLABS_METRICS", help="Append per-request timings as JSON lines to FILE ('-' for stderr)")(wrapper)
+    # List these after the command's own options in --help
+    wrapper.__click_params__[:] = wrapper.__click_params__[-3:] + wrapper.__click_params__[:-3]
+    return wrapper
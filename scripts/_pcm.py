@@ -0,0 +1,151 @@
+"""NumPy helpers for stitching processed audio windows back together.
+
+Audio is handled as float32 arrays shaped (samples, channels). Long inputs
+are cut into overlapping windows, each window is processed on its own, and
+the results are overlap-added with complementary fades so the seams vanish.
+The level and loop-seam measurements check generated clips the same way,
+and :func:`time_stretch` fits clips to a length without changing their pitch.
+"""
+
+import numpy as np
+
+
+def plan_windows(total: int, window: int, overlap: int) -> list[tuple[int, int]]:
+    """Cover [0, total) with windows of ``window`` samples sharing ``overlap`` samples.
+
+    The last window ends exactly at ``total`` and is always longer than the
+    overlap, so every sample belongs to at most two windows.
+    """
+    if overlap >= window:
+        raise ValueError("overlap must be shorter than the window")
+    hop = window - overlap
+    spans = [(0, min(window, total))]
+    while spans[-1][1] < total:
+        start = spans[-1][0] + hop
+        spans.append((start, min(start + window, total)))
+    return spans
+
+
+def crossfade_curves(length: int, equal_power: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """Fade-in and fade-out gains for an overlap of ``length`` samples.
+
+    Equal-power curves (sin/cos) keep loudness constant when the two sides
+    are unrelated, e.g. different music sections. Equal-gain curves
+    (sin²/cos²) sum to exactly one and suit overlaps where both sides carry
+    the same signal, e.g. two renders of the same stretch of a recording.
+    """
+    t = (np.arange(length, dtype=np.float64) + 0.5) / max(length, 1) * (np.pi / 2)
+    fade_in, fade_out = np.sin(t), np.cos(t)
+    if not equal_power:
+        fade_in, fade_out = fade_in ** 2, fade_out ** 2
+    return fade_in.astype(np.float32), fade_out.astype(np.float32)
+
+
+def window_gain(length: int, fade_in: int, fade_out: int, equal_power: bool = True) -> np.ndarray:
+    """Gain envelope for one window: a fade over its first/last samples, one elsewhere."""
+    gain = np.ones(length, dtype=np.float32)
+    if fade_in:
+        gain[:fade_in] *= crossfade_curves(fade_in, equal_power)[0]
+    if fade_out:
+        gain[length - fade_out:] *= crossfade_curves(fade_out, equal_power)[1]
+    return gain
+
+
+def fit_length(pcm: np.ndarray, length: int) -> np.ndarray:
+    """Trim or zero-pad (samples, channels) audio to exactly ``length`` samples."""
+    if len(pcm) >= length:
+        return pcm[:length]
+    return np.concatenate([pcm, np.zeros((length - len(pcm), pcm.shape[1]), dtype=pcm.dtype)])
+
+
+def overlap_add(out: np.ndarray, pcm: np.ndarray, spans: list[tuple[int, int]], index: int, equal_power: bool = True) -> None:
+    """Add window ``index`` of ``spans`` into ``out`` with crossfades against its neighbours.
+
+    Windows may be added in any order; the fades are complementary so the
+    overlaps sum to a seamless signal once both neighbours are in.
+    """
+    start, end = spans[index]
+    fade_in = spans[index - 1][1] - start if index > 0 else 0
+    fade_out = end - spans[index + 1][0] if index + 1 < len(spans) else 0
+    gain = window_gain(end - start, fade_in, fade_out, equal_power)
+    out[start:end] += fit_length(pcm, end - start) * gain[:, None]
+
+
+def time_stretch(pcm: np.ndarray, rate: float, frame: int = 1024) -> np.ndarray:
+    """Play (samples, channels) audio ``rate`` times faster without changing its pitch.
+
+    WSOLA: Hann frames are laid down every ``frame / 2`` samples and read
+    about every ``frame / 2 * rate``, each nudged by up to ``frame / 4``
+    to where it best continues the previous one, so waveforms stay in phase
+    across the overlaps. Only that offset search is per frame; the frames
+    are then gathered, windowed and overlap-added in one go. The output has
+    ``len(pcm) / rate`` samples. Mild rates (about 0.8-1.25) sound natural
+    for speech.
+    """
+    out_len = int(round(len(pcm) / rate))
+    if rate == 1:
+        return pcm
+    if len(pcm) < 2 * frame:
+        return fit_length(pcm, out_len)
+    hop, search = frame // 2, frame // 4
+    count = -(-out_len // hop) + 1
+    # Half a frame of leading silence centres frame k near source sample k * hop * rate
+    pad = hop + search
+    padded = np.concatenate([
+        np.zeros((pad, pcm.shape[1]), pcm.dtype), pcm, np.zeros((frame + 2 * search, pcm.shape[1]), pcm.dtype),
+    ])
+    mono = padded.mean(axis=1)
+    last = len(padded) - frame - search
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = search
+    for k in range(1, count):
+        nominal = min(search + int(round(k * hop * rate)), last)
+        follow = mono[starts[k - 1] + hop:starts[k - 1] + frame]  # what the previous frame continues into
+        region = mono[nominal - search:nominal + search + hop]
+        energy = np.convolve(region * region, np.ones(hop), mode="valid")
+        similarity = np.correlate(region, follow, mode="valid") / np.sqrt(energy + 1e-9)
+        starts[k] = nominal - search + int(np.argmax(similarity))
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)).astype(np.float32)  # sums to one at hop
+    frames = padded[starts[:, None] + np.arange(frame)] * window[None, :, None]
+    out = np.zeros(((count + 1) * hop, pcm.shape[1]), dtype=np.float32)
+    out[:count * hop] += frames[:, :hop].reshape(-1, pcm.shape[1])
+    out[hop:(count + 1) * hop] += frames[:, hop:].reshape(-1, pcm.shape[1])
+    return out[hop:hop + out_len]
+
+
+def loudness_dbfs(pcm: np.ndarray) -> float:
+    """RMS level of the whole clip in dBFS (0 dB is a full-scale square wave)."""
+    rms = float(np.sqrt(np.mean(np.square(pcm, dtype=np.float64)))) if pcm.size else 0.0
+    return 20 * np.log10(rms) if rms > 0 else float("-inf")
+
+
+def band_spectrum(signal: np.ndarray, bands: int = 24) -> np.ndarray:
+    """Hann-windowed power in log-spaced bands, normalised to sum to one."""
+    power = np.abs(np.fft.rfft(signal * np.hanning(len(signal)))) ** 2
+    edges = np.unique(np.geomspace(1, len(power), bands + 1).astype(int))
+    energy = np.add.reduceat(power, edges[:-1])
+    return energy / (energy.sum() + 1e-12)
+
+
+def seam_score(pcm: np.ndarray, sample_rate: int, window_seconds: float = 0.05) -> dict[str, float]:
+    """How audible the wrap point of a loop is, from 0 (seamless) to 1 (obvious click or cut).
+
+    Compares the last and first ``window_seconds`` of the clip on three
+    axes and reports each plus their maximum as ``score``:
+
+    jump      the sample step across the wrap against the clip's 99th-percentile step
+    level     RMS mismatch between the two windows (12 dB or more scores 1)
+    spectral  total-variation distance between their band spectra
+    """
+    mono = pcm.mean(axis=1, dtype=np.float64)
+    n = max(16, min(int(sample_rate * window_seconds), len(mono) // 4))
+    head, tail = mono[:n], mono[-n:]
+
+    typical = np.percentile(np.abs(np.diff(mono)), 99) + 1e-9
+    jump = np.clip((abs(mono[0] - mono[-1]) / typical - 1) / 3, 0, 1)
+    head_rms, tail_rms = (np.sqrt(np.mean((x - x.mean()) ** 2)) + 1e-9 for x in (head, tail))
+    level = np.clip(abs(20 * np.log10(tail_rms / head_rms)) / 12, 0, 1)
+    spectral = 0.5 * np.abs(band_spectrum(head) - band_spectrum(tail)).sum()
+
+    scores = {"jump": float(jump), "level": float(level), "spectral": float(spectral)}
+    return {**{k: round(v, 3) for k, v in scores.items()}, "score": round(max(scores.values()), 3)}
@@ -0,0 +1,113 @@
+"""Subtitle cue segmentation and SRT/VTT writers for word-level transcripts.
+
+The segmenter is a single pass over the word list with O(1) work per word,
+and the writers consume cues lazily, so subtitles for very long transcripts
+are produced in linear time without holding the output in memory.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, TextIO
+
+
+@dataclass
+class Cue:
+    start: float
+    end: float
+    text: str
+    speaker_id: str | None = None
+
+
+def _field(word, name: str):
+    return word.get(name) if isinstance(word, dict) else getattr(word, name, None)
+
+
+def iter_cues(
+    words: Iterable,
+    max_chars: int = 84,
+    max_duration: float = 6.0,
+    max_gap: float = 0.8,
+) -> Iterator[Cue]:
+    """Group timed words into subtitle cues.
+
+    A new cue starts when adding the next word would exceed ``max_chars`` or
+    ``max_duration``, when the pause before it is longer than ``max_gap``,
+    or when ``speaker_id`` changes. Spacing tokens only separate words.
+    """
+    parts: list[str] = []
+    length = 0
+    start = end = 0.0
+    speaker = None
+
+    for word in words:
+        kind = _field(word, "type")
+        if kind == "spacing":
+            continue
+        text = (_field(word, "text") or "").strip()
+        w_start = _field(word, "start")
+        w_end = _field(word, "end")
+        if not text or w_start is None or w_end is None:
+            continue
+        w_speaker = _field(word, "speaker_id")
+        if parts and (
+            w_speaker != speaker
+            or w_start - end > max_gap
+            or w_end - start > max_duration
+            or length + 1 + len(text) > max_chars
+        ):
+            yield Cue(start, end, " ".join(parts), speaker)
+            parts = []
+        if not parts:
+            start, length, speaker = w_start, -1, w_speaker
+        parts.append(text)
+        length += 1 + len(text)
+        end = max(end, w_end) if len(parts) > 1 else w_end
+
+    if parts:
+        yield Cue(start, end, " ".join(parts), speaker)
+
+
+def wrap_lines(text: str, line_chars: int = 42) -> str:
+    """Break text into two balanced lines when it is longer than line_chars."""
+    if len(text) <= line_chars:
+        return text
+    middle = len(text) // 2
+    left = text.rfind(" ", 0, middle + 1)
+    right = text.find(" ", middle)
+    candidates = [i for i in (left, right) if i > 0]
+    if not candidates:
+        return text
+    cut = min(candidates, key=lambda i: abs(i - middle))
+    return f"{text[:cut]}\n{text[cut + 1:]}"
+
+
+def format_timestamp(seconds: float, separator: str) -> str:
+    millis = max(0, round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def write_srt(cues: Iterable[Cue], out: TextIO, line_chars: int = 42) -> int:
+    """Write cues as SubRip, returning the number of cues written."""
+    count = 0
+    for count, cue in enumerate(cues, start=1):
+        text = wrap_lines(cue.text, line_chars)
+        if cue.speaker_id is not None:
+            text = f"[{cue.speaker_id}] {text}"
+        out.write(
+            f"{count}\n{format_timestamp(cue.start, ',')} --> {format_timestamp(cue.end, ',')}\n{text}\n\n"
+        )
+    return count
+
+
+def write_vtt(cues: Iterable[Cue], out: TextIO, line_chars: int = 42) -> int:
+    """Write cues as WebVTT (speakers as voice tags), returning the number of cues."""
+    out.write("WEBVTT\n\n")
+    count = 0
+    for count, cue in enumerate(cues, start=1):
+        text = wrap_lines(cue.text.replace("&", "&amp;").replace("<", "&lt;"), line_chars)
+        if cue.speaker_id is not None:
+            text = f"<v {cue.speaker_id}>{text}"
+        out.write(f"{format_timestamp(cue.start, '.')} --> {format_timestamp(cue.end, '.')}\n{text}\n\n")
+    return count
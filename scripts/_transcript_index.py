@@ -0,0 +1,220 @@
+"""Inverted index over transcript archives, backed by SQLite.
+
+Every spoken word of every indexed transcript becomes a posting
+(normalized term, file, word offset, start, end). Lookups go through a
+``(term, file_id, position)`` index and phrases are matched by joining on
+consecutive word offsets, so queries touch only the postings of the query
+terms instead of scanning the archive.
+"""
+
+import json
+import re
+import sqlite3
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from _fileio import AUDIO_EXTENSIONS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    audio TEXT,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    words INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    file_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    text TEXT NOT NULL,
+    start REAL,
+    end REAL,
+    PRIMARY KEY (file_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_term ON postings (term, file_id, position);
+"""
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+def normalize(token: str) -> str:
+    """Casefold and strip punctuation so "Hello," and "hello" share a term."""
+    token = unicodedata.normalize("NFKC", token).casefold().replace("’", "'")
+    return _NON_WORD.sub("", token).strip("'")
+
+
+@dataclass
+class Hit:
+    transcript: str
+    audio: str | None
+    position: int
+    start: float | None
+    end: float | None
+    snippet: str
+
+
+# JSON files the other scripts write next to their outputs; never transcripts
+_SIDECAR_NAMES = {"meta.json", "manifest.json", "index.json"}
+_SIDECAR_SUFFIX = ".transcript-state.json"
+
+
+def is_sidecar(path: Path) -> bool:
+    return path.name in _SIDECAR_NAMES or path.name.endswith(_SIDECAR_SUFFIX)
+
+
+def _load_words(path: Path) -> tuple[list[dict], str | None]:
+    """Words and source recording of a transcript; raises ValueError for any other JSON."""
+    if path.is_dir():
+        from _columnar import load_columnar
+
+        return list(load_columnar(path).words()), None
+    try:
+        payload = json.loads(path.read_text())
+    except ValueError as exc:
+        raise ValueError(f"{path} is not valid JSON") from exc
+    if not (
+        isinstance(payload, dict)
+        and isinstance(payload.get("text"), str)
+        and isinstance(payload.get("words"), list)
+        and all(isinstance(word, dict) for word in payload["words"])
+    ):
+        raise ValueError(f"{path} is not a transcript")
+    return payload["words"], payload.get("source")
+
+
+def find_audio(transcript: Path) -> str | None:
+    """Guess the recording a transcript belongs to from a sibling file with the same stem."""
+    for ext in AUDIO_EXTENSIONS:
+        candidate = transcript.with_suffix(ext)
+        if candidate.exists():
+            return str(candidate)
+    return None
+
+
+def iter_transcripts(paths) -> Iterator[Path]:
+    """Expand files/directories into JSON transcripts and columnar directories."""
+    for raw in paths:
+        path = Path(raw)
+        if (path / "meta.json").exists() or path.suffix == ".json":
+            yield path
+        elif path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.suffix == ".json" and not is_sidecar(child) or (child / "meta.json").exists():
+                    yield child
+
+
+class TranscriptIndex:
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, path: str | Path) -> bool:
+        """Index a transcript, returning False when it is unchanged since the last run.
+
+        Raises ValueError (and drops any earlier entry) when the file is not a transcript.
+        """
+        path = Path(path).resolve()
+        stat_path = path / "meta.json" if path.is_dir() else path
+        st = stat_path.stat()
+        row = self.conn.execute("SELECT id, mtime, size FROM files WHERE path = ?", (str(path),)).fetchone()
+        if row and row[1] == st.st_mtime and row[2] == st.st_size:
+            return False
+
+        try:
+            words, source = _load_words(path)
+        except ValueError:
+            if row:
+                with self.conn:
+                    self.conn.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+                    self.conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+            raise
+        postings = []
+        position = 0
+        for word in words:
+            if word.get("type", "word") != "word":
+                continue
+            term = normalize(word.get("text") or "")
+            if not term:
+                continue
+            postings.append((position, term, word["text"].strip(), word.get("start"), word.get("end")))
+            position += 1
+
+        with self.conn:
+            if row:
+                self.conn.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+                self.conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, audio, mtime, size, words) VALUES (?, ?, ?, ?, ?)",
+                (str(path), source or find_audio(path), st.st_mtime, st.st_size, len(postings)),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO postings (file_id, position, term, text, start, end) VALUES (?, ?, ?, ?, ?, ?)",
+                ((file_id, *p) for p in postings),
+            )
+        return True
+
+    def prune(self) -> int:
+        """Drop transcripts whose files no longer exist."""
+        missing = [(fid,) for fid, p in self.conn.execute("SELECT id, path FROM files") if not Path(p).exists()]
+        with self.conn:
+            self.conn.executemany("DELETE FROM postings WHERE file_id = ?", missing)
+            self.conn.executemany("DELETE FROM files WHERE id = ?", missing)
+        return len(missing)
+
+    def search(self, query: str, limit: int = 20, prefix: bool = False, context: int = 5) -> list[Hit]:
+        """Find a word or phrase; a trailing ``*`` on a term (or ``prefix``) matches by prefix."""
+        raw_terms = query.split()
+        if prefix and raw_terms and not raw_terms[-1].endswith("*"):
+            raw_terms[-1] += "*"
+        terms = [(normalize(t), t.endswith("*")) for t in raw_terms]
+        terms = [(t, is_prefix) for t, is_prefix in terms if t]
+        if not terms:
+            return []
+
+        joins, where, params = [], [], []
+        for k, (term, is_prefix) in enumerate(terms):
+            if k:
+                joins.append(
+                    f"JOIN postings p{k} ON p{k}.file_id = p0.file_id AND p{k}.position = p0.position + {k}"
+                )
+            if is_prefix:
+                where.append(f"p{k}.term >= ? AND p{k}.term < ?")
+                params += [term, term + "\U0010ffff"]
+            else:
+                where.append(f"p{k}.term = ?")
+                params.append(term)
+        last = len(terms) - 1
+        sql = (
+            f"SELECT f.path, f.audio, p0.file_id, p0.position, p0.start, p{last}.end "
+            f"FROM postings p0 {' '.join(joins)} JOIN files f ON f.id = p0.file_id "
+            f"WHERE {' AND '.join(where)} LIMIT ?"
+        )
+        hits = []
+        for path, audio, file_id, position, start, end in self.conn.execute(sql, (*params, limit)):
+            words = self.conn.execute(
+                "SELECT text FROM postings WHERE file_id = ? AND position BETWEEN ? AND ? ORDER BY position",
+                (file_id, position - context, position + last + context),
+            ).fetchall()
+            hits.append(Hit(path, audio, position, start, end, " ".join(w for (w,) in words)))
+        return hits
+
+    def stats(self) -> dict:
+        files, words = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(words), 0) FROM files").fetchone()
+        terms = self.conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {"transcripts": files, "words": words, "terms": terms}
@@ -0,0 +1,150 @@
+"""The account's voice list, cached on disk so names resolve without an API call.
+
+GET /v1/voices is stored next to the audio cache (see :mod:`_cache`), one
+file per API key, together with its ETag. Within the TTL the stored list is
+used as is; after that a conditional request revalidates it, which costs
+only a 304 when nothing changed. If the API cannot be reached, a stale list
+is still used.
+
+Names match case-insensitively, first in full, then by the part before
+" - " ("george" for "George - Warm, Captivating Storyteller"), then by a
+unique prefix, then fuzzily.
+
+Configuration (environment):
+    ELEVENLABS_VOICES_TTL   seconds a fetched list is trusted (default: 86400)
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _cache import default_cache_dir
+from _metrics import emit
+
+DEFAULT_TTL = 24 * 3600
+
+
+def default_registry_path() -> Path:
+    """Per-account file, so switching API keys (or hosts) never mixes voice lists."""
+    account = f"{os.environ.get('ELEVENLABS_API_KEY', '')}@{os.environ.get('ELEVENLABS_BASE_URL', '')}"
+    return default_cache_dir() / f"voices-{hashlib.sha256(account.encode()).hexdigest()[:12]}.json"
+
+
+def short_name(voice: dict) -> str:
+    return voice["name"].split(" - ")[0].strip().lower()
+
+
+def match_voice(name: str, voices: list[dict]) -> dict | None:
+    """Best voice for ``name``, or None; raises LookupError if a prefix is ambiguous."""
+    query = name.strip().lower()
+    for key in (lambda v: v["name"].lower(), short_name):
+        for voice in voices:
+            if key(voice) == query:
+                return voice
+    prefixed = [v for v in voices if v["name"].lower().startswith(query)]
+    if len(prefixed) > 1:
+        raise LookupError(f"voice {name!r} is ambiguous: {', '.join(v['name'] for v in prefixed[:5])}")
+    if prefixed:
+        return prefixed[0]
+    by_name = {}
+    for voice in voices:
+        by_name.setdefault(voice["name"].lower(), voice)
+        by_name.setdefault(short_name(voice), voice)
+    close = difflib.get_close_matches(query, by_name, n=1, cutoff=0.75)
+    return by_name[close[0]] if close else None
+
+
+class VoiceRegistry:
+    """Name-to-ID lookup over the account's voices, backed by a TTL + ETag cache file."""
+
+    def __init__(self, path: str | Path | None = None, ttl: float | None = None):
+        self.path = Path(path) if path else default_registry_path()
+        if ttl is None:
+            ttl = float(os.environ.get("ELEVENLABS_VOICES_TTL", DEFAULT_TTL))
+        self.ttl = ttl
+        self._data: dict | None = None
+        self._fetched = False  # whether this process has already asked the API
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict | None:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self, data: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=".voices-")
+        with os.fdopen(fd, "w") as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp_name, self.path)
+
+    def _fetch(self, etag: str | None) -> tuple[list[dict] | None, str | None]:
+        """Fetch the list, returning (None, etag) when the server says it is unchanged."""
+        import _core  # looked up at call time so tests can patch sdk_client
+
+        # Straight to the SDK: the daemon proxies results, not raw responses with headers
+        client = _core.sdk_client()
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            response = client.voices.with_raw_response.get_all(request_options={"additional_headers": headers})
+        except Exception as exc:
+            # The SDK treats the empty 304 body as an error
+            if etag and getattr(exc, "status_code", None) == 304:
+                return None, etag
+            raise
+        voices = [
+            {"voice_id": v.voice_id, "name": v.name or "", "category": v.category}
+            for v in response.data.voices
+        ]
+        return voices, response.headers.get("etag")
+
+    def voices(self, refresh: bool = False) -> list[dict]:
+        """The voice list: from disk while fresh, else revalidated or refetched."""
+        with self._lock:
+            data = self._data or self._load()
+            if data and not refresh and time.time() - data["fetched_at"] < self.ttl:
+                emit("cache", endpoint="voices.get_all", result="hit")
+            else:
+                try:
+                    voices, etag = self._fetch(data.get("etag") if data else None)
+                except Exception as exc:
+                    if data is None:
+                        raise LookupError(f"could not fetch the voice list: {exc}") from exc
+                    emit("cache", endpoint="voices.get_all", result="stale")
+                else:
+                    emit("cache", endpoint="voices.get_all", result="revalidated" if voices is None else "miss")
+                    data = {"fetched_at": time.time(), "etag": etag, "voices": data["voices"] if voices is None else voices}
+                    self._save(data)
+                self._fetched = True
+            self._data = data
+            return data["voices"]
+
+    def resolve(self, name: str) -> str:
+        """Voice ID for a name; an unknown name triggers one refetch before LookupError."""
+        voice = match_voice(name, self.voices())
+        if voice is None and not self._fetched:
+            voice = match_voice(name, self.voices(refresh=True))
+        if voice is None:
+            names = [v["name"] for v in self.voices()]
+            hint = difflib.get_close_matches(name, names, n=3, cutoff=0.4)
+            raise LookupError(f"no voice named {name!r}" + (f"; did you mean {', '.join(hint)}?" if hint else ""))
+        return voice["voice_id"]
+
+
+_shared: VoiceRegistry | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_registry() -> VoiceRegistry:
+    """One registry per process (and account), so repeated lookups read the file once."""
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.path != default_registry_path():
+            _shared = VoiceRegistry()
+        return _shared
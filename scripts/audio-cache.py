@@ -0,0 +1,53 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["click"]
+# ///
+"""Inspect and manage the shared on-disk audio cache."""
+
+import click
+
+from _cache import AudioCache
+
+
+@click.group()
+def main():
+    """Manage the audio cache used by the generation scripts.
+
+    Examples:
+        ./audio-cache.py stats
+        ./audio-cache.py evict --max-mb 200
+        ./audio-cache.py clear
+    """
+
+
+@main.command()
+def stats():
+    """Show hit/miss counters and cache size."""
+    cache = AudioCache()
+    totals = cache.stats()
+    lookups = totals["hits"] + totals["misses"]
+    ratio = totals["hits"] / lookups if lookups else 0.0
+    click.echo(f"Location: {cache.root}")
+    click.echo(f"Entries: {totals['entries']} ({totals['size_bytes'] / 1e6:.1f} MB of {totals['max_bytes'] / 1e6:.0f} MB)")
+    click.echo(f"Hits: {totals['hits']}  Misses: {totals['misses']}  Hit ratio: {ratio:.0%}")
+    click.echo(f"Served from cache: {totals['bytes_served'] / 1e6:.1f} MB")
+
+
+@main.command()
+@click.option("--max-mb", type=float, help="Size bound to evict down to (default: ELEVENLABS_CACHE_MAX_BYTES)")
+def evict(max_mb: float | None):
+    """Evict least recently used entries beyond the size bound."""
+    cache = AudioCache(max_bytes=int(max_mb * 1e6) if max_mb is not None else None)
+    removed = cache.evict()
+    click.echo(f"Evicted {removed} entries")
+
+
+@main.command()
+def clear():
+    """Delete every cached entry and reset stats."""
+    removed = AudioCache().clear()
+    click.echo(f"Removed {removed} entries")
+
+
+if __name__ == "__main__":
+    main()
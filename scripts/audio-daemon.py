@@ -0,0 +1,87 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["elevenlabs", "click", "httpx"]
+# ///
+"""Run a persistent worker that keeps the ElevenLabs client warm."""
+
+import click
+import signal
+
+import _metrics
+from _core import sdk_client
+from _daemon import DaemonServer, daemon_available, default_socket_path
+
+
+def build_client(max_connections: int):
+    """Create one SDK client with a pooled, long-lived keep-alive connection pool."""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=300.0,
+    )
+    # With --metrics every upstream request the daemon makes is timed
+    transport = _metrics.http_transport(limits=limits) if _metrics.enabled() else None
+    http = httpx.Client(timeout=httpx.Timeout(300.0, connect=10.0), limits=limits, transport=transport)
+    return sdk_client(httpx_client=http)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+@click.group()
+def main():
+    """Serve ElevenLabs calls from a long-running process over a Unix socket.
+
+    While the daemon runs, narrate/transcribe/isolate-audio/voice-convert/
+    sound-effect/compose-music/design-voice forward their API calls to it
+    instead of opening their own connection (ELEVENLABS_DAEMON=0 opts out).
+
+    Examples:
+        ./audio-daemon.py serve &
+        ./audio-daemon.py status
+    """
+
+
+@main.command()
+@_metrics.instrumented
+@click.option("--socket", "socket_path", type=click.Path(), help="Socket path (default: ELEVENLABS_DAEMON_SOCKET or a per-user path)")
+@click.option("--max-connections", default=16, type=click.IntRange(min=1), help="HTTP connection pool size")
+@click.option("--warm/--no-warm", default=True, help="Open the API connection at startup")
+def serve(socket_path: str | None, max_connections: int, warm: bool):
+    """Start the daemon in the foreground."""
+    client = build_client(max_connections)
+    if warm:
+        try:
+            client.models.list()
+        except Exception as exc:  # warm-up is best effort
+            click.echo(f"Warm-up request failed: {exc}", err=True)
+
+    server = DaemonServer(client, socket_path)
+    signal.signal(signal.SIGTERM, _interrupt)
+    click.echo(f"Listening on {server.socket_path}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        click.echo("Daemon stopped", err=True)
+
+
+@main.command()
+@click.option("--socket", "socket_path", type=click.Path(), help="Socket path")
+def status(socket_path: str | None):
+    """Exit 0 if a daemon is listening, 1 otherwise."""
+    path = socket_path or default_socket_path()
+    if daemon_available(path):
+        click.echo(f"Running on {path}")
+    else:
+        click.echo(f"Not running ({path})")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["elevenlabs", "click"]
+# ///
+"""Run many generation/transcription jobs from a JSONL manifest concurrently."""
+
+import asyncio
+import click
+import inspect
+import json
+import random
+import time
+from pathlib import Path
+
+from _core import async_sdk_client, resolve_voice
+from _metrics import emit, instrumented
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+async def _write_stream(chunks, output: Path) -> int:
+    """Write an SDK audio response to output via a .part file, returning bytes written."""
+    if inspect.isawaitable(chunks):
+        chunks = await chunks
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".part")
+    written = 0
+    try:
+        with open(partial, "wb") as f:
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+            else:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    partial.replace(output)
+    return written
+
+
+async def run_narrate(client, job: dict, output: Path):
+    text = job.get("text") or Path(job["file"]).read_text()
+    # Resolving a voice name may fetch /v1/voices, which would block the event loop
+    voice_id = await asyncio.to_thread(resolve_voice, job.get("voice", "sarah"))
+    return await _write_stream(client.text_to_speech.convert(
+        text=text,
+        voice_id=voice_id,
+        model_id=job.get("model", "eleven_flash_v2_5"),
+        output_format=job.get("format", "mp3_44100_128"),
+    ), output)
+
+
+async def run_sound_effect(client, job: dict, output: Path):
+    return await _write_stream(client.text_to_sound_effects.convert(
+        text=job["description"],
+        duration_seconds=job.get("duration", 2.0),
+        prompt_influence=job.get("prompt_influence", 0.5),
+        loop=job.get("loop", False),
+    ), output)
+
+
+async def run_compose_music(client, job: dict, output: Path):
+    return await _write_stream(client.music.compose(
+        prompt=job["prompt"],
+        music_length_ms=int(job.get("duration", 30) * 1000),
+        force_instrumental=job.get("instrumental", True),
+    ), output)
+
+
+async def run_voice_convert(client, job: dict, output: Path):
+    voice_id = await asyncio.to_thread(resolve_voice, job.get("voice", "sarah"))
+    with open(job["input"], "rb") as f:
+        return await _write_stream(client.speech_to_speech.convert(
+            voice_id=voice_id,
+            audio=f,
+            remove_background_noise=job.get("remove_noise", False),
+        ), output)
+
+
+async def run_isolate(client, job: dict, output: Path):
+    with open(job["input"], "rb") as f:
+        return await _write_stream(client.audio_isolation.convert(audio=f), output)
+
+
+async def run_transcribe(client, job: dict, output: Path):
+    with open(job["input"], "rb") as f:
+        result = await client.speech_to_text.convert(
+            model_id="scribe_v2",
+            file=f,
+            timestamps_granularity=job.get("timestamps", "word"),
+        )
+    if job.get("format", "json") == "text":
+        content = result.text
+    else:
+        content = json.dumps({"text": result.text, "words": [w.__dict__ for w in (result.words or [])]}, indent=2)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(content)
+    return len(content)
+
+
+OPERATIONS = {
+    "narrate": run_narrate,
+    "sound-effect": run_sound_effect,
+    "compose-music": run_compose_music,
+    "voice-convert": run_voice_convert,
+    "isolate": run_isolate,
+    "transcribe": run_transcribe,
+}
+
+
+def job_output(job: dict) -> Path:
+    if job.get("output"):
+        return Path(job["output"])
+    if job["op"] == "transcribe":
+        return Path(job["input"]).with_suffix(".txt" if job.get("format") == "text" else ".json")
+    raise ValueError("missing 'output'")
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429/5xx API errors and transport failures are worth retrying."""
+    if getattr(exc, "status_code", None) in RETRY_STATUS:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)) or type(exc).__module__.startswith("httpx")
+
+
+def retry_delay(exc: Exception, attempt: int, base_delay: float, max_delay: float) -> float:
+    """Honor Retry-After when the server sends it, else exponential backoff with full jitter."""
+    headers = getattr(exc, "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return min(max_delay, float(retry_after))
+    except (TypeError, ValueError):
+        return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def load_manifest(path: Path) -> list[dict]:
+    jobs = []
+    for line_no, line in enumerate(path.read_text().splitlines(), start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        job = json.loads(line)
+        if job.get("op") not in OPERATIONS:
+            raise click.ClickException(f"{path}:{line_no}: unknown op {job.get('op')!r}")
+        job.setdefault("id", job.get("output") or f"line-{line_no}")
+        jobs.append(job)
+    return jobs
+
+
+def load_state(path: Path) -> dict[str, dict]:
+    """Latest recorded status per job id (the state file is append-only)."""
+    state = {}
+    if path.exists():
+        for line in path.read_text().splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash
+            state[record["id"]] = record
+    return state
+
+
+async def run_jobs(client, jobs: list[dict], state_path: Path, concurrency: int, max_retries: int, base_delay: float, max_delay: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    state_file = open(state_path, "a")
+
+    def record(entry: dict):
+        state_file.write(json.dumps(entry) + "\n")
+        state_file.flush()
+
+    async def run(job: dict) -> bool:
+        started = time.perf_counter()
+        attempt = 0
+        async with semaphore:
+            while True:
+                try:
+                    output = job_output(job)
+                    size = await OPERATIONS[job["op"]](client, job, output)
+                    break
+                except Exception as exc:
+                    if attempt < max_retries and is_retryable(exc):
+                        delay = retry_delay(exc, attempt, base_delay, max_delay)
+                        attempt += 1
+                        click.echo(f"[retry] {job['id']} in {delay:.1f}s ({exc})", err=True)
+                        emit("retry", job=job["id"], attempt=attempt, delay_s=round(delay, 3), error=str(exc))
+                        await asyncio.sleep(delay)
+                        continue
+                    elapsed = time.perf_counter() - started
+                    record({"id": job["id"], "status": "failed", "attempts": attempt + 1, "seconds": round(elapsed, 3), "error": str(exc)})
+                    click.echo(f"[failed] {job['id']}: {exc}")
+                    return False
+        elapsed = time.perf_counter() - started
+        record({"id": job["id"], "status": "done", "output": str(output), "bytes": size, "attempts": attempt + 1, "seconds": round(elapsed, 3)})
+        click.echo(f"[done] {job['id']} -> {output} ({elapsed:.1f}s, {attempt + 1} attempt(s))")
+        return True
+
+    try:
+        return await asyncio.gather(*(run(job) for job in jobs))
+    finally:
+        state_file.close()
+
+
+@click.command()
+@instrumented
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("-c", "--concurrency", default=4, type=click.IntRange(min=1), help="Max requests in flight (match your plan's concurrency limit)")
+@click.option("--max-retries", default=5, type=click.IntRange(min=0), help="Retries per job for 429/5xx/network errors")
+@click.option("--base-delay", default=1.0, type=click.FloatRange(min=0), help="Initial backoff in seconds (doubles per retry)")
+@click.option("--max-delay", default=60.0, type=click.FloatRange(min=0), help="Backoff cap in seconds")
+@click.option("--state", "state_file", type=click.Path(dir_okay=False), help="Resume state file (default: MANIFEST.state.jsonl)")
+@click.option("--restart", is_flag=True, help="Ignore previous state and run every job again")
+def main(manifest: str, concurrency: int, max_retries: int, base_delay: float, max_delay: float, state_file: str | None, restart: bool):
+    """Run a JSONL manifest of jobs concurrently with retries and resume.
+
+    Each line is a job: {"op": ..., "output": ..., ...op options}. Ops:
+    narrate (text|file, voice, model, format), sound-effect (description,
+    duration, prompt_influence, loop), compose-music (prompt, duration,
+    instrumental), voice-convert (input, voice, remove_noise), isolate
+    (input), transcribe (input, format, timestamps). An optional "id"
+    names the job (default: its output path).
+
+    Jobs recorded as done in the state file are skipped on the next run,
+    so a crashed or interrupted batch picks up where it left off.
+
+    Examples:
+        ./batch.py jobs.jsonl -c 5
+        ./batch.py jobs.jsonl --restart
+    """
+    manifest_path = Path(manifest)
+    state_path = Path(state_file) if state_file else manifest_path.with_name(manifest_path.name + ".state.jsonl")
+    if restart:
+        state_path.unlink(missing_ok=True)
+
+    jobs = load_manifest(manifest_path)
+    state = load_state(state_path)
+    pending = []
+    for job in jobs:
+        previous = state.get(job["id"])
+        if previous and previous["status"] == "done" and Path(previous["output"]).exists():
+            click.echo(f"[skip] {job['id']} (already done)")
+        else:
+            pending.append(job)
+
+    click.echo(f"Running {len(pending)} of {len(jobs)} jobs, concurrency {concurrency}...", err=True)
+    client = async_sdk_client()
+    results = asyncio.run(run_jobs(client, pending, state_path, concurrency, max_retries, base_delay, max_delay))
+    failed = results.count(False)
+    click.echo(f"{len(results) - failed} done, {failed} failed, {len(jobs) - len(pending)} skipped", err=True)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,150 @@
 #!/usr/bin/env -S uv run --script
 # /// script
-# dependencies = ["elevenlabs", "click"]
+# dependencies = ["elevenlabs", "click", "numpy"]
 # ///
 """Generate original music from text prompts."""
 
 import click
-from elevenlabs import ElevenLabs
+from concurrent.futures import ThreadPoolExecutor
+
+import _audio
+from _cache import AudioCache
+from _core import get_client
+from _fileio import write_chunks
+from _metrics import instrumented
+
+MAX_SECTION_SECONDS = 600
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+
+def fit_to_bars(seconds: float, bpm: float | None, maximum: float = MAX_SECTION_SECONDS) -> float:
+    """Round a length to whole 4/4 bars at ``bpm`` (at least one), so seams land on downbeats."""
+    if not bpm:
+        return seconds
+    bar = 4 * 60.0 / bpm
+    return max(1, min(round(seconds / bar), int(maximum / bar))) * bar
+
+
+def section_prompts(prompt: str, count: int, bpm: float | None = None) -> list[str]:
+    """One prompt per section, with cues that keep the sections one continuous piece."""
+    tempo = f" Keep a steady {bpm:g} BPM." if bpm else ""
+    prompts = []
+    for i in range(count):
+        if count == 1:
+            cue = "A complete piece."
+        elif i == 0:
+            cue = "Opening section: establish the theme, key, tempo and instrumentation; do not end or fade out."
+        elif i == count - 1:
+            cue = "Closing section: continue the established theme, key and instrumentation, then resolve and fade out gently."
+        else:
+            cue = "Middle section: continue seamlessly in the same key, tempo and instrumentation, evolving gradually; no intro and no ending."
+        prompts.append(f"{prompt.rstrip('. ')}. Part {i + 1} of {count} of one continuous piece. {cue}{tempo}")
+    return prompts
+
+
+def compose_long(client, cache: AudioCache, prompt: str, output: str, duration: float, section_seconds: float,
+                 crossfade: float, bpm: float | None, workers: int, instrumental: bool) -> int:
+    """Compose overlapping sections concurrently and crossfade them into one file.
+
+    Sections are decoded and joined in order while later ones are still being
+    composed; each finished stretch goes straight to a streaming encoder, so
+    only a few sections are ever in memory. Returns the number of sections.
+    """
+    import numpy as np
+
+    from _pcm import fit_length, plan_windows, window_gain
+
+    _audio.require_ffmpeg()
+    spans = plan_windows(int(duration * SAMPLE_RATE), int(section_seconds * SAMPLE_RATE), int(crossfade * SAMPLE_RATE))
+    prompts = section_prompts(prompt, len(spans), bpm)
+    click.echo(f"Planned {len(spans)} sections of up to {section_seconds:.0f}s, {crossfade:.1f}s crossfades...", err=True)
+
+    def compose(i: int):
+        start, end = spans[i]
+        params = dict(
+            prompt=prompts[i],
+            music_length_ms=max(3000, round((end - start) / SAMPLE_RATE * 1000)),
+            force_instrumental=instrumental,
+        )
+        audio = b"".join(cache.fetch("music.compose", params, lambda: client.music.compose(**params)))
+        pcm = np.frombuffer(_audio.decode_pcm(audio, SAMPLE_RATE, CHANNELS), dtype=np.float32)
+        return fit_length(pcm.reshape(-1, CHANNELS), end - start)
+
+    lookahead = 2 * max(1, workers)  # bounds how many finished sections wait for a slow one
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, \
+            _audio.StreamEncoder(output, SAMPLE_RATE, CHANNELS) as encoder:
+        futures = {i: pool.submit(compose, i) for i in range(min(lookahead, len(spans)))}
+        tail = None
+        try:
+            for i, (start, end) in enumerate(spans):
+                pcm = futures.pop(i).result()
+                if i + lookahead < len(spans):
+                    futures[i + lookahead] = pool.submit(compose, i + lookahead)
+                fade_in = len(tail) if tail is not None else 0
+                fade_out = end - spans[i + 1][0] if i + 1 < len(spans) else 0
+                # Unrelated renders meet at each seam, so equal-power fades keep the loudness even
+                pcm = pcm * window_gain(end - start, fade_in, fade_out, equal_power=True)[:, None]
+                if tail is not None:
+                    pcm[:fade_in] += tail
+                encoder.write(pcm[:len(pcm) - fade_out].tobytes())
+                tail = pcm[len(pcm) - fade_out:] if fade_out else None
+                click.echo(f"Section {i + 1}/{len(spans)} joined", err=True)
+        except BaseException:
+            # The piece can't be finished; don't compose (and pay for) the sections still queued
+            pool.shutdown(cancel_futures=True)
+            raise
+    return len(spans)
 
 
 @click.command()
+@instrumented
 @click.argument("prompt")
 @click.option("-o", "--output", default="music.mp3", help="Output file path")
-@click.option("-d", "--duration", default=30, type=int, help="Duration in seconds (3-600)")
+@click.option("-d", "--duration", default=30, type=int, help="Duration in seconds (3-600; longer implies --long)")
 @click.option("--instrumental", is_flag=True, default=True, help="Force instrumental (no vocals)")
-def main(prompt: str, output: str, duration: int, instrumental: bool):
+@click.option("--long", "long_form", is_flag=True, help="Long-form mode: compose crossfaded sections in parallel (needs ffmpeg)")
+@click.option("--section-seconds", default=180.0, type=click.FloatRange(min=10, max=MAX_SECTION_SECONDS), help="Section length in --long mode")
+@click.option("--crossfade", default=4.0, type=click.FloatRange(min=0.1), help="Seconds of crossfade between sections")
+@click.option("--bpm", type=click.FloatRange(min=20, max=300), help="Tempo; sections and crossfades snap to whole bars")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent section requests in --long mode")
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk audio cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached audio and store a fresh result")
+def main(prompt: str, output: str, duration: int, instrumental: bool, long_form: bool, section_seconds: float,
+         crossfade: float, bpm: float | None, workers: int, no_cache: bool, refresh: bool):
     """Compose original music from a text prompt.
     
     Examples:
         ./compose-music.py "upbeat electronic background music" -o bg.mp3
         ./compose-music.py "calm piano melody" -d 60 -o piano.mp3
         ./compose-music.py "epic orchestral trailer music" -d 120 -o epic.mp3
+        ./compose-music.py "slow ambient drone bed" -d 3600 --bpm 70 -w 6 -o stream-bed.mp3
     """
-    client = ElevenLabs()
+    client = get_client()
+    cache = AudioCache(enabled=not no_cache, refresh=refresh)
     
     click.echo(f"Composing: {prompt}...")
     click.echo(f"Duration: {duration}s")
     
-    audio = client.music.compose(
-        prompt=prompt,
-        music_length_ms=duration * 1000,
-        force_instrumental=instrumental,
-    )
-    
-    with open(output, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
+    if long_form or duration > MAX_SECTION_SECONDS:
+        section_seconds = fit_to_bars(section_seconds, bpm)
+        crossfade = fit_to_bars(crossfade, bpm)
+        if crossfade * 2 >= section_seconds:
+            raise click.UsageError("--crossfade must be less than half of --section-seconds")
+        compose_long(client, cache, prompt, output, duration, section_seconds, crossfade, bpm, workers, instrumental)
+    else:
+        params = dict(
+            prompt=prompt,
+            music_length_ms=duration * 1000,
+            force_instrumental=instrumental,
+        )
+        audio = cache.fetch("music.compose", params, lambda: client.music.compose(**params))
+        
+        write_chunks(audio, output)
     
+    if cache.enabled:
+        click.echo(cache.summary())
+        cache.save_stats()
     click.echo(f"Saved to {output}")
 
 
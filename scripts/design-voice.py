@@ -5,11 +5,112 @@
 """Generate new synthetic voices from text descriptions."""
 
 import click
-from elevenlabs import ElevenLabs
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from types import SimpleNamespace
+
+from _cache import AudioCache
+from _core import get_client
+from _fileio import iter_base64, slugify, write_atomic
+from _metrics import instrumented
+
+INDEX_NAME = "index.json"
+# Preview IDs only live for a while on the server side; past this, design again
+PREVIEW_TTL = 60 * 60
+
+
+def read_descriptions(path: str) -> list[str]:
+    """One description per line; blank lines and # comments are ignored."""
+    lines = Path(path).read_text().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def design(client, cache: AudioCache, description: str, text: str, loudness: float, quality: float) -> tuple[list, float]:
+    """Fetch (or replay from cache) every preview for a description, returning (previews, seconds).
+
+    Cached previews are reused for at most PREVIEW_TTL seconds. Each preview
+    carries ``created_at``, the time its generated_voice_id was issued.
+    """
+    params = dict(
+        voice_description=description,
+        text=text,
+        loudness=loudness,
+        quality=quality,
+    )
+
+    def create_previews() -> bytes:
+        previews = client.text_to_voice.create_previews(**params)
+        created_at = time.time()
+        return json.dumps([
+            {"generated_voice_id": p.generated_voice_id, "audio_base_64": p.audio_base_64, "created_at": created_at}
+            for p in previews.previews or []
+        ]).encode("utf-8")
+
+    start = time.perf_counter()
+    payload = cache.fetch_bytes("text_to_voice.create_previews", params, create_previews, max_age=PREVIEW_TTL)
+    return [SimpleNamespace(**p) for p in json.loads(payload)], time.perf_counter() - start
+
+
+def from_cache(preview, started: float) -> bool:
+    """True if the preview (and its ID) was replayed from the cache rather than generated since ``started``."""
+    return getattr(preview, "created_at", 0) < started
+
+
+def design_many(client, cache: AudioCache, descriptions: list[str], out_dir: Path, workers: int, **options) -> list[dict]:
+    """Design every description concurrently and save all of their previews under out_dir.
+
+    Returns the index rows (description, generated_voice_id, cached, file,
+    latency_s, plus error for failed descriptions) in description order, and
+    writes them to out_dir/index.json. ``cached`` marks IDs replayed from the
+    cache, which may have expired.
+    """
+    started = time.time()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results: dict[int, tuple[list, float]] = {}
+    errors: dict[int, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(design, client, cache, description, **options): i for i, description in enumerate(descriptions)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as exc:
+                errors[i] = str(exc)
+                click.echo(f"[failed] {descriptions[i]}: {exc}", err=True)
+                continue
+            previews, seconds = results[i]
+            for n, preview in enumerate(previews, start=1):
+                preview.file = None
+                if preview.audio_base_64:
+                    preview.file = f"{i + 1:02d}-{slugify(descriptions[i])}-{n}.mp3"
+                    write_atomic(iter_base64(preview.audio_base_64), out_dir / preview.file)
+                    preview.audio_base_64 = None  # release the encoded audio as soon as it is on disk
+            click.echo(f"[done] {descriptions[i]} ({len(previews)} previews, {seconds:.1f}s)")
+
+    index = []
+    for i, description in enumerate(descriptions):
+        if i in errors:
+            index.append({"description": description, "generated_voice_id": None, "cached": False, "file": None,
+                          "latency_s": None, "error": errors[i]})
+            continue
+        previews, seconds = results[i]
+        for preview in previews:
+            index.append({
+                "description": description,
+                "generated_voice_id": preview.generated_voice_id,
+                "cached": from_cache(preview, started),
+                "file": preview.file,
+                "latency_s": round(seconds, 3),
+            })
+    (out_dir / INDEX_NAME).write_text(json.dumps(index, indent=2) + "\n")
+    return index
 
 
 @click.command()
-@click.argument("description")
+@instrumented
+@click.argument("descriptions", nargs=-1)
 @click.option(
     "-t",
     "--text",
@@ -21,40 +122,79 @@ from elevenlabs import ElevenLabs
     help="Preview text",
 )
 @click.option("-o", "--output", default="voice_preview.mp3", help="Output file for preview")
+@click.option("-f", "--file", "descriptions_file", type=click.Path(exists=True, dir_okay=False), help="File with one description per line (casting mode)")
+@click.option("-d", "--out-dir", help="Directory for every preview of every description, plus index.json [default: voice_previews]")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent design requests in casting mode")
 @click.option("--loudness", default=0.0, type=float, help="Volume control (-1 to 1)")
 @click.option("--quality", default=0.5, type=float, help="Quality vs variety (0-1)")
-def main(description: str, text: str, output: str, loudness: float, quality: float):
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk audio cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached previews and store a fresh result")
+def main(descriptions: tuple[str, ...], text: str, output: str, descriptions_file: str | None, out_dir: str | None,
+         workers: int, loudness: float, quality: float, no_cache: bool, refresh: bool):
     """Generate a new voice from a text description.
     
+    With several descriptions, a --file of them, or --out-dir, runs a
+    casting session: every description is designed concurrently and all
+    returned previews are saved, with an index.json listing description,
+    generated voice ID, file and latency.
+    
     Examples:
         ./design-voice.py "A warm, friendly female voice with a slight British accent"
         ./design-voice.py "Deep male narrator voice" -t "Welcome to the show"
         ./design-voice.py "Energetic young female podcaster" -o podcaster.mp3
+        ./design-voice.py "Gravelly old sailor" "Bright young scientist" -d casting/
+        ./design-voice.py -f casting.txt -w 8 -d casting/
     """
-    client = ElevenLabs()
+    descriptions = list(descriptions) + (read_descriptions(descriptions_file) if descriptions_file else [])
+    if not descriptions:
+        raise click.UsageError("Give a DESCRIPTION or --file")
+
+    client = get_client()
+    cache = AudioCache(enabled=not no_cache, refresh=refresh)
+    options = dict(text=text, loudness=loudness, quality=quality)
     
+    if len(descriptions) > 1 or descriptions_file or out_dir:
+        out_path = Path(out_dir or "voice_previews")
+        click.echo(f"Designing {len(descriptions)} voices, {workers} workers...")
+        start = time.perf_counter()
+        index = design_many(client, cache, descriptions, out_path, workers, **options)
+        latencies = [row["latency_s"] for row in index if row["latency_s"] is not None]
+        if cache.enabled:
+            click.echo(cache.summary())
+            cache.save_stats()
+        click.echo(
+            f"Saved {sum(1 for row in index if row['file'])} previews to {out_path} in {time.perf_counter() - start:.1f}s "
+            f"(slowest call {max(latencies, default=0):.1f}s); index: {out_path / INDEX_NAME}"
+        )
+        if any("error" in row for row in index):
+            raise SystemExit(1)
+        return
+
+    description = descriptions[0]
     click.echo(f"Designing voice: {description}...")
     
-    previews = client.text_to_voice.create_previews(
-        voice_description=description,
-        text=text,
-        loudness=loudness,
-        quality=quality,
-    )
+    started = time.time()
+    previews, _ = design(client, cache, description, **options)
+    if cache.enabled:
+        click.echo(cache.summary())
+        cache.save_stats()
     
-    if previews.previews:
-        preview = previews.previews[0]
+    if previews:
+        preview = previews[0]
         
         # Save the audio preview
         if preview.audio_base_64:
-            import base64
-            audio_data = base64.b64decode(preview.audio_base_64)
-            with open(output, "wb") as f:
-                f.write(audio_data)
+            write_atomic(iter_base64(preview.audio_base_64), output)
             click.echo(f"Preview saved to {output}")
         
         click.echo(f"Generated Voice ID: {preview.generated_voice_id}")
-        click.echo("Use this ID to create the voice permanently")
+        if from_cache(preview, started):
+            click.echo(
+                "This ID comes from the cache and may have expired; "
+                "rerun with --refresh for a new one if creating the voice fails"
+            )
+        else:
+            click.echo("Use this ID to create the voice permanently")
     else:
         click.echo("No previews generated")
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["elevenlabs", "click", "numpy"]
+# ///
+"""Re-voice a recording phrase by phrase, in sync with the original timing."""
+
+import click
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import _audio
+from _cache import AudioCache
+from _core import get_client, resolve_voice
+from _metrics import instrumented
+from _subtitles import iter_cues
+
+# Raw 16-bit mono PCM needs no decoding and is available on every plan
+SAMPLE_RATE = 24000
+TTS_FORMAT = f"pcm_{SAMPLE_RATE}"
+CONTEXT_CHARS = 300
+# Room past the end of the original for a last phrase that runs long
+TAIL_SECONDS = 60.0
+
+
+def load_words(client, input_file: str, transcript: str | None, diarize: bool) -> list:
+    """Word timings from a transcribe.py JSON file, or from transcribing the input."""
+    if transcript:
+        return json.loads(Path(transcript).read_text())["words"]
+    with open(input_file, "rb") as f:
+        result = client.speech_to_text.convert(
+            model_id="scribe_v2",
+            file=f,
+            timestamps_granularity="word",
+            **({"diarize": True} if diarize else {}),
+        )
+    return result.words or []
+
+
+def fit_to_slot(pcm, slot: int, max_stretch: float):
+    """Speed a clip up to fit ``slot`` samples, by at most ``max_stretch``; returns (pcm, rate)."""
+    from _pcm import time_stretch
+
+    if len(pcm) <= slot:
+        return pcm, 1.0
+    rate = min(len(pcm) / slot, max_stretch)
+    return time_stretch(pcm, rate), rate
+
+
+def dub(client, cache: AudioCache, phrases: list, voices: dict, default_voice: str, output: str, length: int,
+        model: str, max_stretch: float, workers: int) -> dict:
+    """Synthesize every phrase concurrently and mix each at its original start time.
+
+    The timeline is a memory-mapped float32 file, so the track costs no RAM.
+    Each clip is added as soon as its request finishes. A clip longer than
+    the gap to the next phrase is sped up by at most ``max_stretch``; past
+    that it runs over into the next phrase and is counted as an overrun.
+    Returns timing and placement stats.
+    """
+    import numpy as np
+
+    starts = [round(phrase.start * SAMPLE_RATE) for phrase in phrases]
+    slots = [end - start for start, end in zip(starts, starts[1:] + [length])]
+
+    def synthesize(i: int):
+        params = dict(
+            text=phrases[i].text,
+            previous_text=phrases[i - 1].text[-CONTEXT_CHARS:] if i > 0 else None,
+            next_text=phrases[i + 1].text[:CONTEXT_CHARS] if i + 1 < len(phrases) else None,
+            voice_id=voices.get(phrases[i].speaker_id, default_voice),
+            model_id=model,
+            output_format=TTS_FORMAT,
+        )
+        start = time.perf_counter()
+        audio = b"".join(cache.fetch("text_to_speech", params, lambda: client.text_to_speech.convert(**params)))
+        seconds = time.perf_counter() - start
+        pcm = np.frombuffer(audio[:len(audio) // 2 * 2], dtype="<i2").astype(np.float32) / 32768
+        return fit_to_slot(pcm[:, None], max(slots[i], 1), max_stretch), seconds
+
+    stats = {"phrases": len(phrases), "stretched": 0, "overruns": 0, "slowest_s": 0.0}
+    with tempfile.TemporaryDirectory(prefix="dub-") as tmp:
+        raw_path = Path(tmp) / "track.f32"
+        capacity = length + int(TAIL_SECONDS * SAMPLE_RATE)
+        track = np.memmap(raw_path, dtype=np.float32, mode="w+", shape=(capacity, 1))
+        used = length
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(synthesize, i): i for i in range(len(phrases))}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    (pcm, rate), seconds = future.result()
+                except BaseException:
+                    # The track can't be finished; don't spend credits on the queued phrases
+                    pool.shutdown(cancel_futures=True)
+                    raise
+                end = min(starts[i] + len(pcm), capacity)
+                track[starts[i]:end] += pcm[:end - starts[i]]
+                used = max(used, end)
+                stats["stretched"] += int(rate > 1)
+                stats["overruns"] += int(len(pcm) > slots[i])
+                stats["slowest_s"] = max(stats["slowest_s"], seconds)
+                click.echo(f"Phrase {done}/{len(phrases)} placed at {phrases[i].start:.2f}s"
+                           + (f" (x{rate:.2f})" if rate > 1 else ""), err=True)
+        track.flush()
+        del track
+        os.truncate(raw_path, used * 4)  # drop the unused tail room
+        _audio.encode_file(raw_path, output, SAMPLE_RATE, 1)
+    stats["seconds"] = used / SAMPLE_RATE
+    return stats
+
+
+def parse_speaker_voices(values: tuple[str, ...]) -> dict[str, str]:
+    voices = {}
+    for value in values:
+        speaker, sep, voice = value.partition("=")
+        if not sep or not speaker or not voice:
+            raise click.BadParameter(f"expected SPEAKER=VOICE, got {value!r}", param_hint="'--speaker-voice'")
+        try:
+            voices[speaker] = resolve_voice(voice)
+        except LookupError as exc:
+            raise click.BadParameter(str(exc), param_hint="'--speaker-voice'")
+    return voices
+
+
+@click.command()
+@instrumented
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("-o", "--output", default="dubbed.mp3", help="Output file path")
+@click.option("-t", "--transcript", type=click.Path(exists=True, dir_okay=False), help="Word timings from transcribe.py (JSON) instead of transcribing INPUT_FILE")
+@click.option("-v", "--voice", default="sarah", help="Voice name (built-in or from your account, fuzzy matched) or ID")
+@click.option("--speaker-voice", multiple=True, metavar="SPEAKER=VOICE", help="Voice for one speaker, e.g. speaker_1=george (repeatable; transcribes with diarization)")
+@click.option("-m", "--model", default="eleven_flash_v2_5", help="Model ID")
+@click.option("--max-stretch", default=1.25, type=click.FloatRange(min=1.0, max=2.0), help="Most a phrase is sped up to fit before its slot")
+@click.option("--max-chars", default=200, type=click.IntRange(min=20), help="Longest phrase, in characters")
+@click.option("--max-gap", default=0.6, type=click.FloatRange(min=0), help="A pause longer than this (seconds) ends a phrase")
+@click.option("-w", "--workers", default=8, type=click.IntRange(min=1), help="Concurrent text-to-speech requests")
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk audio cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached audio and store a fresh result")
+def main(input_file: str, output: str, transcript: str | None, voice: str, speaker_voice: tuple[str, ...], model: str,
+         max_stretch: float, max_chars: int, max_gap: float, workers: int, no_cache: bool, refresh: bool):
+    """Dub INPUT_FILE with another voice, keeping every phrase at its original time.
+
+    The transcript's word timings are grouped into phrases, all phrases are
+    synthesized concurrently, and each is placed on a timeline at the time
+    it was originally spoken, sped up (pitch kept) when it would run into
+    the next one. The result is a voice track at least as long as the input,
+    ready to lay under the original video. Needs ffmpeg.
+
+    Examples:
+        ./dub.py interview.mp4 -v rachel -o interview-rachel.mp3
+        ./dub.py lecture.wav -t lecture.json -v george -w 16 -o lecture-george.mp3
+        ./dub.py panel.mp3 --speaker-voice speaker_0=sarah --speaker-voice speaker_1=george -o panel-dub.mp3
+    """
+    try:
+        _audio.require_ffmpeg()
+    except _audio.FFmpegError as exc:
+        raise click.ClickException(str(exc))
+    try:
+        default_voice = resolve_voice(voice)
+    except LookupError as exc:
+        raise click.BadParameter(str(exc), param_hint="'-v' / '--voice'")
+    voices = parse_speaker_voices(speaker_voice)
+
+    client = get_client()
+    cache = AudioCache(enabled=not no_cache, refresh=refresh)
+    start = time.perf_counter()
+
+    if not transcript:
+        click.echo(f"Transcribing {input_file}...", err=True)
+    words = load_words(client, input_file, transcript, diarize=bool(voices))
+    # Phrases split on speaker changes and pauses, so each can move on its own
+    phrases = list(iter_cues(words, max_chars=max_chars, max_duration=30.0, max_gap=max_gap))
+    if not phrases:
+        raise click.ClickException("The transcript has no timed words to dub")
+    length = round(max(_audio.probe_duration(input_file), phrases[-1].end) * SAMPLE_RATE)
+
+    click.echo(f"Dubbing {len(phrases)} phrases with {workers} workers...", err=True)
+    stats = dub(client, cache, phrases, voices, default_voice, output, length, model, max_stretch, workers)
+
+    click.echo(
+        f"{stats['phrases']} phrases, {stats['stretched']} sped up, {stats['overruns']} overran their slot; "
+        f"{stats['seconds']:.1f}s of audio in {time.perf_counter() - start:.1f}s "
+        f"(slowest phrase {stats['slowest_s']:.1f}s)"
+    )
+    if cache.enabled:
+        click.echo(cache.summary())
+        cache.save_stats()
+    click.echo(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,118 @@
 #!/usr/bin/env -S uv run --script
 # /// script
-# dependencies = ["elevenlabs", "click"]
+# dependencies = ["elevenlabs", "click", "numpy"]
 # ///
 """Remove background noise from audio recordings."""
 
 import click
-from elevenlabs import ElevenLabs
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import _audio
+from _core import get_client
+from _fileio import format_bytes, peak_rss_bytes, write_chunks
+from _metrics import instrumented
+
+
+def isolate_window(client, pcm, sample_rate: int, channels: int, retries: int):
+    """Isolate one window of float32 PCM, retrying it on its own when it fails."""
+    import numpy as np
+
+    flac = _audio.encode_flac(np.ascontiguousarray(pcm).tobytes(), sample_rate, channels)
+    for attempt in range(retries + 1):
+        try:
+            audio = b"".join(client.audio_isolation.convert(audio=flac))
+            raw = _audio.decode_pcm(audio, sample_rate, channels)
+            return np.frombuffer(raw, dtype=np.float32).reshape(-1, channels)
+        except Exception as exc:
+            if attempt == retries:
+                raise
+            delay = random.uniform(0, min(30.0, 2.0 ** attempt))
+            click.echo(f"Window failed ({exc}); retrying in {delay:.1f}s", err=True)
+            time.sleep(delay)
+
+
+def isolate_long(client, input_file: str, output: str, segment_seconds: float, overlap: float, workers: int, retries: int) -> int:
+    """Isolate overlapping windows concurrently and crossfade them back together.
+
+    The input is decoded once to a raw PCM file that is memory-mapped, so
+    windows are exact sample slices and the output has exactly as many
+    samples as the input. Returns the number of windows.
+    """
+    import numpy as np
+
+    from _pcm import overlap_add, plan_windows
+
+    _audio.require_ffmpeg()
+    sample_rate, channels = _audio.probe_audio(input_file)
+    with tempfile.TemporaryDirectory(prefix="isolate-") as tmp:
+        source_path, mix_path = Path(tmp) / "source.f32", Path(tmp) / "mix.f32"
+        _audio.decode_to_file(input_file, source_path, sample_rate, channels)
+        source = np.memmap(source_path, dtype=np.float32, mode="r").reshape(-1, channels)
+        total = len(source)
+        spans = plan_windows(total, int(segment_seconds * sample_rate), int(overlap * sample_rate))
+        mix = np.memmap(mix_path, dtype=np.float32, mode="w+", shape=(total, channels))
+        click.echo(f"Split {total / sample_rate:.0f}s into {len(spans)} windows, {workers} workers...", err=True)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(isolate_window, client, source[start:end], sample_rate, channels, retries): i
+                for i, (start, end) in enumerate(spans)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    pcm = future.result()
+                except BaseException:
+                    # The output is lost anyway; don't spend credits on the queued windows
+                    pool.shutdown(cancel_futures=True)
+                    raise
+                # Both sides of an overlap are the same speech, so equal-gain fades keep the level flat
+                overlap_add(mix, pcm, spans, futures.pop(future), equal_power=False)
+                click.echo(f"Window {done}/{len(spans)} done", err=True)
+
+        mix.flush()
+        del mix, source
+        _audio.encode_file(mix_path, output, sample_rate, channels)
+    return len(spans)
 
 
 @click.command()
+@instrumented
 @click.argument("input_file", type=click.Path(exists=True))
 @click.option("-o", "--output", default="isolated.mp3", help="Output file path")
-def main(input_file: str, output: str):
+@click.option("--long", "long_form", is_flag=True, help="Long-audio mode: isolate overlapping windows in parallel and crossfade them (needs ffmpeg)")
+@click.option("--segment-seconds", default=300.0, type=click.FloatRange(min=10), help="Window length in --long mode")
+@click.option("--overlap", default=2.0, type=click.FloatRange(min=0.05), help="Seconds shared by neighbouring windows (crossfaded)")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent requests in --long mode")
+@click.option("--retries", default=3, type=click.IntRange(min=0), help="Retries per failed window in --long mode")
+@click.option("--report-memory", is_flag=True, help="Print peak memory (RSS) for the run")
+def main(input_file: str, output: str, long_form: bool, segment_seconds: float, overlap: float, workers: int, retries: int, report_memory: bool):
     """Remove background noise from an audio file.
     
     Examples:
         ./isolate-audio.py noisy_recording.mp3 -o clean.mp3
         ./isolate-audio.py interview.wav -o interview_clean.mp3
+        ./isolate-audio.py podcast-3h.mp3 --long -w 8 -o podcast_clean.mp3
     """
-    client = ElevenLabs()
+    client = get_client()
     
     click.echo(f"Isolating audio from {input_file}...")
     
-    with open(input_file, "rb") as f:
-        audio_bytes = f.read()
-
-    audio = client.audio_isolation.convert(audio=audio_bytes)
-    
-    with open(output, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
+    if long_form:
+        if overlap * 2 >= segment_seconds:
+            raise click.UsageError("--overlap must be less than half of --segment-seconds")
+        isolate_long(client, input_file, output, segment_seconds, overlap, workers, retries)
+    else:
+        # Pass the handle so the upload streams from disk instead of a full in-memory copy
+        with open(input_file, "rb") as f:
+            audio = client.audio_isolation.convert(audio=f)
+            write_chunks(audio, output)
     
+    if report_memory:
+        click.echo(f"Peak memory: {format_bytes(peak_rss_bytes())}")
     click.echo(f"Saved to {output}")
 
 
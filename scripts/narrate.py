@@ -5,55 +5,339 @@
 """Narrate text or markdown with a female voice."""
 
 import click
+import codecs
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from elevenlabs import ElevenLabs
 
+import _core
+from _cache import AudioCache
+from _core import get_client, resolve_voice
+from _fileio import WRITE_BUFFER
+from _metrics import instrumented
 
-FEMALE_VOICES = {
-    "sarah": "EXAVITQu4vr4xnSDxMaL",
-    "rachel": "21m00Tcm4TlvDq8ikWAM",
-    "dorothy": "ThT5KcBeYPX3keUQqHPh",
-}
+# Characters of neighbouring text sent as previous_text/next_text per chunk
+CONTEXT_CHARS = 300
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+# A sentence is complete once its terminator is followed by whitespace, or at a blank line
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])[\"')\]]*\s+|\n\s*\n")
+
+
+def strip_markdown(text: str) -> str:
+    """Reduce markdown to plain prose suitable for speech."""
+    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"!\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"`([^`]*)`", r"\1", text)
+    text = re.sub(r"^\s{0,3}#{1,6}\s*", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s{0,3}>\s?", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*(?:[-*+]|\d+[.)])\s+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*(?:[-*_]\s*){3,}$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"(?<!\w)(\*\*|__|\*|_|~~)(\S.*?\S|\S)\1(?!\w)", r"\2", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split text into chunks of at most max_chars at paragraph/sentence boundaries.
+
+    Paragraphs are packed together while they fit; an oversized paragraph is
+    split by sentence, and an oversized sentence is hard-split on whitespace.
+    """
+    pieces: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def cached_convert(client, cache: AudioCache, stream: bool = False):
+    """Return a text-to-speech call that goes through the audio cache.
+
+    With ``stream`` the streaming endpoint is used so chunks are yielded as
+    the server produces them; both endpoints share cache entries.
+    """
+    endpoint = client.text_to_speech.stream if stream else client.text_to_speech.convert
+
+    def convert(**kwargs):
+        return cache.fetch("text_to_speech", kwargs, lambda: endpoint(**kwargs))
+
+    return convert
+
+
+def synthesize_chunks(convert, chunks: list[str], workers: int, **tts_kwargs):
+    """Synthesize chunks concurrently, yielding each chunk's audio in input order."""
+
+    def synthesize(index: int) -> bytes:
+        previous_text = chunks[index - 1][-CONTEXT_CHARS:] if index > 0 else None
+        next_text = chunks[index + 1][:CONTEXT_CHARS] if index + 1 < len(chunks) else None
+        audio = convert(
+            text=chunks[index],
+            previous_text=previous_text,
+            next_text=next_text,
+            **tts_kwargs,
+        )
+        return b"".join(audio)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        yield from pool.map(synthesize, range(len(chunks)))
+
+
+def iter_text(stream, read_size: int = 4096):
+    """Yield text from a binary stream as soon as bytes are available."""
+    read = getattr(stream, "read1", stream.read)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while data := read(read_size):
+        if text := decoder.decode(data):
+            yield text
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def iter_sentences(pieces):
+    """Re-chunk incoming text pieces into complete sentences as soon as they end."""
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        start = 0
+        for match in _SENTENCE_BOUNDARY.finditer(buffer):
+            sentence = " ".join(buffer[start:match.end()].split())
+            start = match.end()
+            if sentence:
+                yield sentence
+        buffer = buffer[start:]
+    if sentence := " ".join(buffer.split()):
+        yield sentence
+
+
+def synthesize_incremental(convert, sentences, workers: int, **tts_kwargs):
+    """Synthesize sentences while they are still being produced, yielding audio in order.
+
+    A feeder thread submits each sentence as soon as it is complete, so
+    synthesis overlaps with upstream text generation; this generator yields
+    finished audio strictly in submission order.
+    """
+    futures: queue.Queue = queue.Queue()
+    done = object()
+
+    def feed(pool: ThreadPoolExecutor):
+        previous_text = None
+        try:
+            for sentence in sentences:
+                futures.put(pool.submit(
+                    lambda text, prev: b"".join(convert(text=text, previous_text=prev, **tts_kwargs)),
+                    sentence,
+                    previous_text,
+                ))
+                previous_text = sentence[-CONTEXT_CHARS:]
+        except BaseException as exc:  # surface input errors in the consumer
+            futures.put(exc)
+        futures.put(done)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        threading.Thread(target=feed, args=(pool,), daemon=True).start()
+        try:
+            while (item := futures.get()) is not done:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item.result()
+        except BaseException:
+            # A failed sentence or a closed consumer ends the narration; don't pay for the queued rest
+            pool.shutdown(cancel_futures=True)
+            raise
+
+
+def realtime_available(client) -> bool:
+    """Whether the SDK's websocket input-streaming TTS can be used."""
+    if not callable(getattr(client.text_to_speech, "convert_realtime", None)):
+        return False
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_audio(audio, output: str, flush: bool = False) -> tuple[float | None, int]:
+    """Write audio chunks to a file or stdout ("-"), returning (first-byte time, bytes).
+
+    The first-byte time is measured from the call, which is when lazy SDK
+    responses actually issue their request.
+    """
+    start = time.perf_counter()
+    first_byte = None
+    written = 0
+    sink = sys.stdout.buffer if output == "-" else open(output, "wb", buffering=WRITE_BUFFER)
+    try:
+        for chunk in audio:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            sink.write(chunk)
+            written += len(chunk)
+            if flush:
+                sink.flush()
+    finally:
+        if output == "-":
+            sink.flush()
+        else:
+            sink.close()
+    return first_byte, written
 
 
 @click.command()
+@instrumented
 @click.argument("text", required=False)
-@click.option("-f", "--file", "input_file", type=click.Path(exists=True), help="Read text from file (markdown or plain text)")
-@click.option("-o", "--output", default="narration.mp3", help="Output file path")
-@click.option("-v", "--voice", default="sarah", type=click.Choice(list(FEMALE_VOICES.keys())), help="Female voice to use")
+@click.option("-f", "--file", "input_file", type=click.Path(exists=True, allow_dash=True), help="Read text from file (markdown or plain text); '-' narrates stdin incrementally")
+@click.option("-o", "--output", default="narration.mp3", help="Output file path ('-' for stdout)")
+@click.option("-v", "--voice", default="sarah", help="Voice name (built-in or from your account, fuzzy matched) or ID")
 @click.option("-m", "--model", default="eleven_flash_v2_5", help="Model ID")
 @click.option("--format", "output_format", default="mp3_44100_128", help="Audio format")
-def main(text: str | None, input_file: str | None, output: str, voice: str, model: str, output_format: str):
+@click.option("--long", "long_form", is_flag=True, help="Long-document mode: strip markdown, chunk and synthesize in parallel")
+@click.option("--chunk-chars", default=2500, type=click.IntRange(min=100), help="Max characters per chunk in --long mode")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent requests in --long and stdin modes")
+@click.option("--stream", is_flag=True, help="Use the streaming endpoint and write audio as it arrives")
+@click.option("--transport", default="auto", type=click.Choice(["auto", "websocket", "sentences"]), help="Stdin mode: websocket input streaming or per-sentence requests")
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk audio cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached audio and store a fresh result")
+def main(
+    text: str | None,
+    input_file: str | None,
+    output: str,
+    voice: str,
+    model: str,
+    output_format: str,
+    long_form: bool,
+    chunk_chars: int,
+    workers: int,
+    stream: bool,
+    transport: str,
+    no_cache: bool,
+    refresh: bool,
+):
     """Convert text or markdown to speech.
-    
+
     Examples:
         ./narrate.py "Hello world" -o hello.mp3
         ./narrate.py -f article.md -o article.mp3
         ./narrate.py "Welcome!" -v rachel -o welcome.mp3
+        ./narrate.py -f report.md --long -w 8 -o report.mp3
+        ./narrate.py "Quick reply" --stream -o - | mpv -
+        llm "Summarize today's news" | ./narrate.py -f - -o news.mp3
     """
-    if input_file:
+    incremental = input_file == "-" and not long_form
+    if input_file == "-":
+        text = None if incremental else sys.stdin.read()
+    elif input_file:
         text = Path(input_file).read_text()
-    
-    if not text:
+
+    if not text and not incremental:
         raise click.UsageError("Provide TEXT argument or --file option")
-    
-    client = ElevenLabs()
-    voice_id = FEMALE_VOICES[voice]
-    
-    click.echo(f"Narrating with {voice} voice...")
-    
-    audio = client.text_to_speech.convert(
-        text=text,
-        voice_id=voice_id,
-        model_id=model,
-        output_format=output_format,
-    )
-    
-    with open(output, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
-    
-    click.echo(f"Saved to {output}")
+    if stream and long_form:
+        raise click.UsageError("--stream cannot be combined with --long")
+
+    # Keep stdout clean for audio when writing to "-"
+    to_stdout = output == "-"
+
+    client = get_client()
+    cache = AudioCache(enabled=not no_cache, refresh=refresh)
+    convert = cached_convert(client, cache, stream=stream)
+    try:
+        voice_id = resolve_voice(voice)
+    except LookupError as exc:
+        raise click.BadParameter(str(exc), param_hint="'-v' / '--voice'")
+
+    if incremental:
+        sentences = iter_sentences(iter_text(sys.stdin.buffer))
+        # The websocket can't go through the daemon, so it always uses an in-process SDK client
+        realtime = _core.sdk_client() if transport != "sentences" else None
+        if realtime is not None and not realtime_available(realtime):
+            if transport == "websocket":
+                raise click.UsageError(
+                    "--transport websocket needs an elevenlabs SDK with convert_realtime and the websockets "
+                    "package; use --transport sentences"
+                )
+            realtime = None
+        if realtime is not None:
+            click.echo(f"Narrating stdin with {voice} voice over websocket...", err=to_stdout)
+            audio = realtime.text_to_speech.convert_realtime(
+                text=(f"{sentence} " for sentence in sentences),
+                voice_id=voice_id,
+                model_id=model,
+                output_format=output_format,
+            )
+        else:
+            click.echo(f"Narrating stdin with {voice} voice, sentence by sentence...", err=to_stdout)
+            audio = synthesize_incremental(
+                convert,
+                sentences,
+                workers,
+                voice_id=voice_id,
+                model_id=model,
+                output_format=output_format,
+            )
+    elif long_form:
+        chunks = split_text(strip_markdown(text), chunk_chars)
+        if not chunks:
+            raise click.UsageError("No narratable text after stripping markdown")
+        click.echo(f"Narrating with {voice} voice: {len(chunks)} chunks, {workers} workers...", err=to_stdout)
+        audio = synthesize_chunks(
+            convert,
+            chunks,
+            workers,
+            voice_id=voice_id,
+            model_id=model,
+            output_format=output_format,
+        )
+    else:
+        click.echo(f"Narrating with {voice} voice...", err=to_stdout)
+        audio = convert(
+            text=text,
+            voice_id=voice_id,
+            model_id=model,
+            output_format=output_format,
+        )
+
+    start = time.perf_counter()
+    first_byte, written = write_audio(audio, output, flush=stream or incremental)
+    total = time.perf_counter() - start
+
+    if stream:
+        ttfb = f"{first_byte:.3f}s" if first_byte is not None else "n/a"
+        click.echo(f"Time to first byte: {ttfb}, total: {total:.3f}s ({written} bytes)", err=to_stdout)
+    if cache.enabled:
+        click.echo(cache.summary(), err=to_stdout)
+        cache.save_stats()
+    click.echo(f"Saved to {'stdout' if to_stdout else output}", err=to_stdout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["elevenlabs", "click"]
+# ///
+"""Chain audio operations in one process, streaming each stage into the next."""
+
+import click
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import _core
+import _subtitles
+from _core import resolve_voice
+from _fileio import ChunkPipe, format_bytes, peak_rss_bytes, write_chunks
+from _metrics import emit, instrumented
+
+AUDIO_STAGES = ("isolate", "voice-convert")
+STAGES = (*AUDIO_STAGES, "transcribe")
+
+
+@dataclass
+class Stage:
+    """Timings of one stage, in seconds from the start of the run."""
+
+    name: str
+    started: float | None = None
+    first_byte: float | None = None
+    finished: float | None = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+def parse_stages(tokens: Iterable[str]) -> list[str]:
+    """Split "isolate | transcribe" (one string or separate words) into stage names."""
+    names = " ".join(tokens).replace("|", " ").split()
+    if not names:
+        raise click.UsageError("Give at least one stage: " + ", ".join(STAGES))
+    for i, name in enumerate(names):
+        if name not in STAGES:
+            raise click.UsageError(f"Unknown stage {name!r} (choose from {', '.join(STAGES)})")
+        if name == "transcribe" and i != len(names) - 1:
+            raise click.UsageError("transcribe produces text, so it must be the last stage")
+    return names
+
+
+def timed(stage: Stage, clock: Callable[[], float], produce: Callable[[], Iterable[bytes]]) -> Iterator[bytes]:
+    """Run an audio-producing call lazily, recording when it starts, first yields and ends."""
+    stage.started = clock()
+    for chunk in produce():
+        if stage.first_byte is None:
+            stage.first_byte = clock()
+        stage.bytes_out += len(chunk)
+        yield chunk
+    stage.finished = clock()
+
+
+def build_pipeline(client, names: list[str], source, options: dict, clock: Callable[[], float]):
+    """Wire the stages together; returns (stages, final output).
+
+    Each audio stage runs on a :class:`ChunkPipe` thread as soon as it is
+    wired, and the next stage uploads that pipe, so it starts sending as
+    soon as the previous response begins arriving.
+    """
+    stages = []
+    audio = source
+    for name in names:
+        stage = Stage(name)
+        stages.append(stage)
+        if name == "isolate":
+            produce = lambda audio=audio: client.audio_isolation.convert(audio=audio)
+        elif name == "voice-convert":
+            produce = lambda audio=audio: client.speech_to_speech.convert(
+                voice_id=options["voice_id"],
+                audio=audio,
+                remove_background_noise=options["remove_noise"],
+            )
+        else:
+            return stages, (stage, audio)
+        audio = ChunkPipe(timed(stage, clock, produce), name=f"{name}.mp3")
+    return stages, audio
+
+
+def write_transcript(result, output_format: str, output: str | None) -> None:
+    words = result.words or []
+    if output_format in ("srt", "vtt"):
+        writer = _subtitles.write_srt if output_format == "srt" else _subtitles.write_vtt
+        cues = _subtitles.iter_cues(words)
+        if output:
+            with open(output, "w") as f:
+                writer(cues, f)
+        else:
+            writer(cues, sys.stdout)
+        return
+    if output_format == "json":
+        content = json.dumps({"text": result.text, "words": [w if isinstance(w, dict) else w.__dict__ for w in words]}, indent=2)
+    else:
+        content = result.text
+    if output:
+        Path(output).write_text(content)
+    else:
+        click.echo(content)
+
+
+def report(stages: list[Stage], total: float) -> None:
+    click.echo(f"{'stage':<14} {'start':>7} {'ttfb':>7} {'end':>7} {'in':>10} {'out':>10}", err=True)
+    for stage in stages:
+        fields = [f"{t:7.2f}" if t is not None else "      -" for t in (stage.started, stage.first_byte, stage.finished)]
+        click.echo(
+            f"{stage.name:<14} {' '.join(fields)} {format_bytes(stage.bytes_in):>10} {format_bytes(stage.bytes_out):>10}",
+            err=True,
+        )
+        emit(
+            "stage",
+            stage=stage.name,
+            start_s=stage.started,
+            ttfb_s=None if stage.first_byte is None else round(stage.first_byte - stage.started, 6),
+            total_s=None if stage.finished is None else round(stage.finished - stage.started, 6),
+            bytes_in=stage.bytes_in,
+            bytes_out=stage.bytes_out,
+        )
+    click.echo(f"Pipeline finished in {total:.2f}s", err=True)
+
+
+@click.command()
+@instrumented
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("stages", nargs=-1, required=True)
+@click.option("-o", "--output", help="Output file [default: pipeline.mp3 for audio, stdout for a transcript]")
+@click.option("-v", "--voice", default="sarah", help="Voice for the voice-convert stage (name or ID)")
+@click.option("--remove-noise", is_flag=True, help="Remove background noise in the voice-convert stage")
+@click.option("--format", "output_format", default="json", type=click.Choice(["json", "srt", "vtt", "text"]), help="Transcript format when the last stage is transcribe")
+@click.option("--timestamps", default="word", type=click.Choice(["word", "segment"]), help="Timestamp granularity for transcribe")
+@click.option("--report-memory", is_flag=True, help="Print peak memory (RSS) for the run")
+def main(input_file: str, stages: tuple[str, ...], output: str | None, voice: str, remove_noise: bool,
+         output_format: str, timestamps: str, report_memory: bool):
+    """Run INPUT_FILE through a chain of operations without intermediate files.
+
+    STAGES are isolate, voice-convert and transcribe (last only), as
+    separate words or one quoted "a | b" string. Each stage uploads the
+    previous stage's response while it is still arriving, all in this
+    process, and per-stage timings are printed at the end.
+
+    Examples:
+        ./pipeline.py interview.wav "isolate | transcribe" -o interview.json
+        ./pipeline.py noisy-take.wav isolate voice-convert -v rachel -o clean-rachel.mp3
+        ./pipeline.py meeting.m4a isolate transcribe --format srt -o meeting.srt
+    """
+    names = parse_stages(stages)
+    try:
+        voice_id = resolve_voice(voice) if "voice-convert" in names else None
+    except LookupError as exc:
+        raise click.BadParameter(str(exc), param_hint="'-v' / '--voice'")
+
+    # In-process SDK client: the daemon protocol only forwards real files
+    client = _core.sdk_client()
+    start = time.perf_counter()
+    clock = lambda: time.perf_counter() - start
+    click.echo(f"Running {' | '.join(names)} on {input_file}...", err=True)
+
+    with open(input_file, "rb") as source:
+        pipeline, final = build_pipeline(
+            client, names, source, {"voice_id": voice_id, "remove_noise": remove_noise}, clock
+        )
+        pipeline[0].bytes_in = Path(input_file).stat().st_size
+        if names[-1] == "transcribe":
+            stage, audio = final
+            stage.started = clock()
+            result = client.speech_to_text.convert(
+                model_id="scribe_v2",
+                file=audio,
+                timestamps_granularity=timestamps,
+            )
+            stage.first_byte = stage.finished = clock()
+            write_transcript(result, output_format, output)
+        else:
+            output = output or "pipeline.mp3"
+            write_chunks(final, output)
+
+    for upstream, stage in zip(pipeline, pipeline[1:]):
+        stage.bytes_in = upstream.bytes_out
+    report(pipeline, clock())
+    if report_memory:
+        click.echo(f"Peak memory: {format_bytes(peak_rss_bytes())}", err=True)
+    if output:
+        click.echo(f"Saved to {output}", err=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,193 @@
 #!/usr/bin/env -S uv run --script
 # /// script
-# dependencies = ["elevenlabs", "click"]
+# dependencies = ["elevenlabs", "click", "numpy"]
 # ///
 """Generate one-shot sound effects from text descriptions."""
 
 import click
-from elevenlabs import ElevenLabs
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import _audio
+from _cache import AudioCache
+from _core import get_client
+from _fileio import slugify, write_atomic, write_chunks
+from _metrics import instrumented
+
+INDEX_NAME = "index.json"
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+
+def load_pack(path: Path) -> list[dict]:
+    """Read a JSONL pack: {"description": ..., "name", "duration", "loop", "prompt_influence"} per line."""
+    effects = []
+    names = set()
+    for line_no, line in enumerate(path.read_text().splitlines(), start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        effect = json.loads(line)
+        if not effect.get("description"):
+            raise click.ClickException(f"{path}:{line_no}: missing description")
+        effect.setdefault("name", slugify(effect["description"]))
+        if effect["name"] in names:
+            raise click.ClickException(f"{path}:{line_no}: duplicate name {effect['name']!r}")
+        names.add(effect["name"])
+        effects.append(effect)
+    return effects
+
+
+def generate(client, cache: AudioCache, params: dict, attempt: int = 0):
+    """Generate (or replay from cache) one effect; each retry attempt is cached separately."""
+    key = {**params, "attempt": attempt} if attempt else params
+    return cache.fetch(
+        "text_to_sound_effects.convert",
+        key,
+        lambda: client.text_to_sound_effects.convert(**params),
+    )
+
+
+def make_effect(client, cache: AudioCache, effect: dict, out_dir: Path, max_seam: float, retries: int, defaults: dict) -> dict:
+    """Generate one pack effect, regenerating loops whose seam scores above max_seam.
+
+    The best-scoring attempt is kept. Returns its index row.
+    """
+    import numpy as np
+
+    from _pcm import loudness_dbfs, seam_score
+
+    params = dict(
+        text=effect["description"],
+        duration_seconds=effect.get("duration", defaults["duration"]),
+        prompt_influence=effect.get("prompt_influence", defaults["prompt_influence"]),
+        loop=effect.get("loop", False),
+    )
+    best = None
+    for attempt in range(retries + 1 if params["loop"] else 1):
+        audio = b"".join(generate(client, cache, params, attempt))
+        pcm = np.frombuffer(_audio.decode_pcm(audio, SAMPLE_RATE, CHANNELS), dtype=np.float32).reshape(-1, CHANNELS)
+        if not len(pcm):
+            raise ValueError("response decoded to no audio")
+        seam = seam_score(pcm, SAMPLE_RATE) if params["loop"] else None
+        if best is None or (seam and seam["score"] < best[1]["score"]):
+            best = (audio, seam, pcm)
+        if not seam or seam["score"] <= max_seam:
+            break
+        click.echo(f"[retry] {effect['name']}: seam score {seam['score']:.2f} > {max_seam:.2f}", err=True)
+
+    audio, seam, pcm = best
+    file = f"{effect['name']}.mp3"
+    write_atomic([audio], out_dir / file)
+    return {
+        "name": effect["name"],
+        "description": effect["description"],
+        "file": file,
+        "loop": params["loop"],
+        "duration_s": round(len(pcm) / SAMPLE_RATE, 3),
+        "loudness_dbfs": round(loudness_dbfs(pcm), 2),
+        "seam": seam,
+        "seam_ok": None if seam is None else seam["score"] <= max_seam,
+        "attempts": attempt + 1,
+    }
+
+
+def build_pack(client, cache: AudioCache, effects: list[dict], out_dir: Path, workers: int, max_seam: float,
+               retries: int, defaults: dict) -> list[dict]:
+    """Generate every effect concurrently into out_dir and write index.json; returns its rows."""
+    _audio.require_ffmpeg()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(make_effect, client, cache, effect, out_dir, max_seam, retries, defaults): effect
+            for effect in effects
+        }
+        for future in as_completed(futures):
+            effect = futures[future]
+            try:
+                row = rows[effect["name"]] = future.result()
+            except Exception as exc:
+                rows[effect["name"]] = {"name": effect["name"], "description": effect["description"], "file": None, "error": str(exc)}
+                click.echo(f"[failed] {effect['name']}: {exc}")
+                continue
+            seam = f", seam {row['seam']['score']:.2f}" if row["seam"] else ""
+            click.echo(f"[done] {row['file']} ({row['duration_s']:.1f}s, {row['loudness_dbfs']:.1f} dBFS{seam})")
+
+    index = [rows[effect["name"]] for effect in effects]
+    (out_dir / INDEX_NAME).write_text(json.dumps(index, indent=2) + "\n")
+    return index
 
 
 @click.command()
-@click.argument("description")
-@click.option("-o", "--output", default="effect.mp3", help="Output file path")
+@instrumented
+@click.argument("description", required=False)
+@click.option("-o", "--output", help="Output file, or output directory with --pack [default: effect.mp3 / sfx-pack/]")
 @click.option("-d", "--duration", default=2.0, type=float, help="Duration in seconds (0.5-30)")
 @click.option("-p", "--prompt-influence", default=0.5, type=float, help="How literal to interpret (0-1)")
 @click.option("--loop", is_flag=True, help="Create seamless looping sound")
-def main(description: str, output: str, duration: float, prompt_influence: float, loop: bool):
+@click.option("--pack", "pack_file", type=click.Path(exists=True, dir_okay=False), help="JSONL list of effects to generate as a pack")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent requests with --pack")
+@click.option("--max-seam", default=0.5, type=click.FloatRange(0, 1), help="Highest acceptable loop seam score with --pack (0 = seamless)")
+@click.option("--retries", default=2, type=click.IntRange(min=0), help="Regenerations of a loop whose seam fails with --pack")
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk audio cache")
+@click.option("--refresh", is_flag=True, help="Ignore cached audio and store a fresh result")
+def main(description: str | None, output: str | None, duration: float, prompt_influence: float, loop: bool,
+         pack_file: str | None, workers: int, max_seam: float, retries: int, no_cache: bool, refresh: bool):
     """Generate a sound effect from a text description.
     
+    With --pack, generates every effect listed in a JSONL file (one
+    {"description", "name", "duration", "loop", "prompt_influence"} object
+    per line; -d/-p are the defaults) concurrently into the -o directory.
+    Loops are decoded and their wrap point checked for clicks, level jumps
+    and spectral changes; bad seams are regenerated up to --retries times.
+    index.json lists each effect's duration, loudness and seam score.
+    
     Examples:
         ./sound-effect.py "short notification ding" -o ding.mp3 -d 1.5
         ./sound-effect.py "whoosh swoosh sound" -o whoosh.mp3
         ./sound-effect.py "rain on window" -o rain.mp3 -d 10 --loop
         ./sound-effect.py "door slam" -o slam.mp3 -d 1
+        ./sound-effect.py --pack ui-sounds.jsonl -o ui-sounds/ -w 8
     """
-    client = ElevenLabs()
-    
-    click.echo(f"Generating: {description}...")
-    
-    audio = client.text_to_sound_effects.convert(
-        text=description,
-        duration_seconds=duration,
-        prompt_influence=prompt_influence,
-    )
+    if bool(description) == bool(pack_file):
+        raise click.UsageError("Give either a DESCRIPTION or --pack")
+
+    client = get_client()
+    cache = AudioCache(enabled=not no_cache, refresh=refresh)
     
-    with open(output, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
+    if pack_file:
+        effects = load_pack(Path(pack_file))
+        output = output or "sfx-pack"
+        click.echo(f"Generating {len(effects)} effects, {workers} workers...")
+        index = build_pack(
+            client, cache, effects, Path(output), workers, max_seam, retries,
+            defaults={"duration": duration, "prompt_influence": prompt_influence},
+        )
+    else:
+        output = output or "effect.mp3"
+        click.echo(f"Generating: {description}...")
+        
+        params = dict(
+            text=description,
+            duration_seconds=duration,
+            prompt_influence=prompt_influence,
+            loop=loop,
+        )
+        audio = generate(client, cache, params)
+        
+        write_chunks(audio, output)
     
+    if cache.enabled:
+        click.echo(cache.summary())
+        cache.save_stats()
     click.echo(f"Saved to {output}")
+    if pack_file:
+        rough = [row["name"] for row in index if row.get("seam_ok") is False]
+        if rough:
+            click.echo(f"Seams still above --max-seam after retries: {', '.join(rough)}", err=True)
+        if any("error" in row for row in index):
+            raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,305 @@
 #!/usr/bin/env -S uv run --script
 # /// script
-# dependencies = ["elevenlabs", "click"]
+# dependencies = ["elevenlabs", "click", "numpy"]
 # ///
 """Transcribe audio to text with timestamps."""
 
 import click
+import hashlib
 import json
-from elevenlabs import ElevenLabs
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import _audio
+from _core import get_client
+from _fileio import format_bytes, peak_rss_bytes
+from _metrics import instrumented
+import _subtitles
+
+STATE_VERSION = 1
+HEADER_BYTES = 4096
+READ_BLOCK = 1 << 20
+
+
+def _word_dict(word) -> dict:
+    return dict(word) if isinstance(word, dict) else dict(word.__dict__)
+
+
+def merge_segments(results: list, spans: list[tuple[float, float]], offsets: list[float]):
+    """Merge per-segment transcripts into one with global word timestamps.
+
+    ``spans`` are the non-overlapping owned ranges and ``offsets`` the start
+    of each segment's (overlapping) audio. Word times are shifted by the
+    offset, and a word is kept only by the segment whose span contains its
+    midpoint, which drops duplicates transcribed in the overlaps.
+    """
+    words = []
+    for result, (own_start, own_end), offset in zip(results, spans, offsets):
+        kept = []
+        for word in result.words or []:
+            w = _word_dict(word)
+            if w.get("start") is not None:
+                w["start"] = round(w["start"] + offset, 3)
+            if w.get("end") is not None:
+                w["end"] = round(w["end"] + offset, 3)
+            if w.get("start") is not None and w.get("end") is not None:
+                midpoint = (w["start"] + w["end"]) / 2
+                if not own_start <= midpoint < own_end:
+                    continue
+            kept.append(w)
+        while kept and kept[0].get("type") == "spacing":
+            kept.pop(0)
+        if words and kept and words[-1].get("type") != "spacing":
+            gap_start = words[-1].get("end")
+            words.append({
+                "text": " ", "start": gap_start, "end": kept[0].get("start", gap_start),
+                "type": "spacing", "speaker_id": None, "logprob": 0.0, "characters": None,
+            })
+        words.extend(kept)
+    while words and words[-1].get("type") == "spacing":
+        words.pop()
+    text = "".join(w.get("text") or "" for w in words)
+    return SimpleNamespace(text=text, words=[SimpleNamespace(**w) for w in words])
+
+
+def transcribe_long(
+    client, input_file: str, timestamps: str, segment_seconds: float, overlap: float, workers: int,
+    start: float = 0.0, duration: float | None = None,
+):
+    """Cut the input at silences and transcribe the segments concurrently.
+
+    With ``start``, only [start, duration) is transcribed (the first segment
+    still reaches ``overlap`` seconds back for context) and words keep their
+    timestamps relative to the start of the file.
+    """
+    _audio.require_ffmpeg()
+    if duration is None:
+        duration = _audio.probe_duration(input_file)
+    silences = _audio.detect_silences(input_file, offset=start)
+    spans = [
+        (start + a, start + b)
+        for a, b in _audio.plan_segments(duration - start, [(a - start, b - start) for a, b in silences], segment_seconds)
+    ]
+    offsets = [max(0.0, span_start - overlap) for span_start, _ in spans]
+    click.echo(f"Split {duration - start:.0f}s into {len(spans)} segments, {workers} workers...", err=True)
+
+    def transcribe_segment(index: int):
+        start, end = spans[index]
+        audio = _audio.extract_segment(input_file, offsets[index], min(duration, end + overlap))
+        return client.speech_to_text.convert(
+            model_id="scribe_v2",
+            file=audio,
+            timestamps_granularity=timestamps,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(transcribe_segment, range(len(spans))))
+    return merge_segments(results, spans, offsets)
+
+
+def prefix_digest(path: str, size: int) -> str:
+    """SHA-256 of the first ``size`` bytes, minus the container header.
+
+    Recorders rewrite the header (WAV sizes, MP3 Xing/ID3 tags) as a file
+    grows, so the first HEADER_BYTES are left out of the comparison.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(min(HEADER_BYTES, size))
+        remaining = size - f.tell()
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def load_state(path: Path) -> dict | None:
+    try:
+        state = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def save_state(state: dict, path: Path) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".transcript-state-")
+    with os.fdopen(fd, "w") as tmp:
+        json.dump(state, tmp)
+    os.replace(tmp_name, path)
+
+
+def transcribe_incremental(
+    client, input_file: str, state_path: Path, timestamps: str, segment_seconds: float, overlap: float, workers: int
+):
+    """Transcribe only the audio added since the last run, merging it into the saved transcript.
+
+    The sidecar state holds the transcript, the point up to which its words
+    are final (``committed_until``) and a hash of the file prefix it came
+    from. Words near the end of a still-growing recording may be cut off, so
+    those after ``duration - overlap`` stay provisional and are transcribed
+    again, from ``overlap`` seconds earlier, on the next run. If the prefix
+    no longer matches, the file is transcribed from the start.
+    """
+    size = os.path.getsize(input_file)
+    state = load_state(state_path)
+    if state and (
+        state["timestamps"] != timestamps
+        or size < state["prefix_bytes"]
+        or prefix_digest(input_file, state["prefix_bytes"]) != state["prefix_sha256"]
+    ):
+        click.echo(f"{input_file} changed before the transcribed point; starting over", err=True)
+        state = None
+    if state and size == state["prefix_bytes"]:
+        click.echo("No new audio since the last run", err=True)
+        words = state["words"]
+    else:
+        _audio.require_ffmpeg()
+        duration = _audio.probe_duration(input_file)
+        committed = state["committed_until"] if state else 0.0
+        tail = transcribe_long(client, input_file, timestamps, segment_seconds, overlap, workers, start=committed, duration=duration)
+        previous = [w for w in (state["words"] if state else []) if _midpoint(w) < committed]
+        merged = merge_segments(
+            [SimpleNamespace(words=previous), tail],
+            [(0.0, committed), (committed, float("inf"))],
+            [0.0, 0.0],
+        )
+        words = [w.__dict__ for w in merged.words]
+        final = [w["end"] for w in words if w.get("type") == "word" and w.get("end") is not None and w["end"] <= duration - overlap]
+        spans = (state["spans"] if state else []) + [[max(0.0, committed - overlap), duration]]
+        state = {
+            "version": STATE_VERSION,
+            "input": str(input_file),
+            "timestamps": timestamps,
+            "prefix_bytes": size,
+            "prefix_sha256": prefix_digest(input_file, size),
+            "duration": duration,
+            "committed_until": max([committed, *final]),
+            "spans": spans,
+            "words": words,
+        }
+        save_state(state, state_path)
+        click.echo(f"Transcribed {duration - committed:.0f}s of new audio (total {duration:.0f}s)", err=True)
+    text = "".join(w.get("text") or "" for w in words)
+    return SimpleNamespace(text=text, words=[SimpleNamespace(**w) for w in words])
+
+
+def _midpoint(word: dict) -> float:
+    if word.get("start") is None or word.get("end") is None:
+        return 0.0
+    return (word["start"] + word["end"]) / 2
 
 
 @click.command()
+@instrumented
 @click.argument("input_file", type=click.Path(exists=True))
 @click.option("-o", "--output", help="Output file (omit for stdout)")
-@click.option("--format", "output_format", default="json", type=click.Choice(["json", "srt", "vtt", "text"]), help="Output format")
+@click.option("--format", "output_format", default="json", type=click.Choice(["json", "srt", "vtt", "text", "columnar"]), help="Output format (columnar writes a directory of NumPy arrays)")
 @click.option("--timestamps", default="word", type=click.Choice(["word", "segment"]), help="Timestamp granularity")
-def main(input_file: str, output: str | None, output_format: str, timestamps: str):
+@click.option("--long", "long_form", is_flag=True, help="Long-audio mode: split at silences and transcribe segments in parallel (needs ffmpeg)")
+@click.option("--segment-seconds", default=600.0, type=click.FloatRange(min=10), help="Max segment length in --long mode")
+@click.option("--overlap", default=1.0, type=click.FloatRange(min=0), help="Seconds of audio shared by neighbouring segments")
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent requests in --long mode")
+@click.option("--incremental", is_flag=True, help="Only transcribe audio added since the last run, using a sidecar state file (needs ffmpeg)")
+@click.option("--state", "state_file", type=click.Path(dir_okay=False), help="State file for --incremental (default: INPUT_FILE.transcript-state.json)")
+@click.option("--line-chars", default=42, type=click.IntRange(min=10), help="Subtitle line length (cues hold up to two lines)")
+@click.option("--max-duration", default=6.0, type=click.FloatRange(min=0.5), help="Longest subtitle cue in seconds")
+@click.option("--max-gap", default=0.8, type=click.FloatRange(min=0), help="Pause in seconds that starts a new subtitle cue")
+@click.option("--report-memory", is_flag=True, help="Print peak memory (RSS) for the run")
+def main(
+    input_file: str,
+    output: str | None,
+    output_format: str,
+    timestamps: str,
+    long_form: bool,
+    segment_seconds: float,
+    overlap: float,
+    workers: int,
+    incremental: bool,
+    state_file: str | None,
+    line_chars: int,
+    max_duration: float,
+    max_gap: float,
+    report_memory: bool,
+):
     """Transcribe audio to text.
-    
+
     Examples:
         ./transcribe.py recording.mp3
         ./transcribe.py podcast.mp3 -o transcript.json
         ./transcribe.py video.mp4 --format srt -o subtitles.srt
         ./transcribe.py interview.wav --format text
+        ./transcribe.py meeting.mp3 --long -w 8 -o meeting.json
+        ./transcribe.py live-capture.wav --incremental --format srt -o live.srt
+        ./transcribe.py meeting.mp3 --format columnar -o meeting.cols
     """
-    client = ElevenLabs()
-    
+    if output_format == "columnar" and not output:
+        raise click.UsageError("--format columnar needs -o/--output (a directory)")
+
+    client = get_client()
+
     click.echo(f"Transcribing {input_file}...", err=True)
-    
-    with open(input_file, "rb") as f:
-        audio_bytes = f.read()
-
-    result = client.speech_to_text.convert(
-        model_id="scribe_v2",
-        file=audio_bytes,
-        timestamps_granularity=timestamps,
-    )
-    
-    if output_format == "json":
-        content = json.dumps({"text": result.text, "words": [w.__dict__ for w in (result.words or [])]}, indent=2)
-    elif output_format == "text":
-        content = result.text
+
+    if incremental:
+        state_path = Path(state_file) if state_file else Path(f"{input_file}.transcript-state.json")
+        try:
+            result = transcribe_incremental(client, input_file, state_path, timestamps, segment_seconds, overlap, workers)
+        except _audio.FFmpegError as exc:
+            raise click.ClickException(str(exc))
+    elif long_form:
+        try:
+            result = transcribe_long(client, input_file, timestamps, segment_seconds, overlap, workers)
+        except _audio.FFmpegError as exc:
+            raise click.ClickException(str(exc))
     else:
-        content = str(result)
-    
-    if output:
-        with open(output, "w") as f:
-            f.write(content)
+        # Pass the handle so the upload streams from disk instead of a full in-memory copy
+        with open(input_file, "rb") as f:
+            result = client.speech_to_text.convert(
+                model_id="scribe_v2",
+                file=f,
+                timestamps_granularity=timestamps,
+            )
+
+    if output_format == "columnar":
+        from _columnar import write_columnar
+
+        write_columnar(result.text, result.words or [], output)
         click.echo(f"Saved to {output}", err=True)
+    elif output_format in ("srt", "vtt"):
+        cues = _subtitles.iter_cues(
+            result.words or [],
+            max_chars=2 * line_chars,
+            max_duration=max_duration,
+            max_gap=max_gap,
+        )
+        writer = _subtitles.write_srt if output_format == "srt" else _subtitles.write_vtt
+        if output:
+            with open(output, "w") as f:
+                count = writer(cues, f, line_chars)
+            click.echo(f"Saved {count} cues to {output}", err=True)
+        else:
+            writer(cues, sys.stdout, line_chars)
     else:
-        click.echo(content)
+        if output_format == "json":
+            content = json.dumps({"text": result.text, "words": [w.__dict__ for w in (result.words or [])]}, indent=2)
+        else:
+            content = result.text
+
+        if output:
+            with open(output, "w") as f:
+                f.write(content)
+            click.echo(f"Saved to {output}", err=True)
+        else:
+            click.echo(content)
+
+    if report_memory:
+        click.echo(f"Peak memory: {format_bytes(peak_rss_bytes())}", err=True)
 
 
 if __name__ == "__main__":
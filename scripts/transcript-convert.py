@@ -0,0 +1,41 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["click", "numpy"]
+# ///
+"""Convert transcripts between JSON and the compact columnar format."""
+
+import click
+import json
+from pathlib import Path
+
+from _columnar import convert_json, load_columnar
+
+
+@click.command()
+@click.argument("inputs", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("-o", "--output", help="Output path (single input only; default: input with .cols/.json suffix)")
+@click.option("--to", "target", default="columnar", type=click.Choice(["columnar", "json"]), help="Target format")
+def main(inputs: tuple[str, ...], output: str | None, target: str):
+    """Convert transcribe.py JSON transcripts to columnar directories, or back.
+
+    Examples:
+        ./transcript-convert.py transcript.json
+        ./transcript-convert.py archive/*.json
+        ./transcript-convert.py meeting.cols --to json -o meeting.json
+    """
+    if output and len(inputs) > 1:
+        raise click.UsageError("-o/--output can only be used with a single input")
+
+    for input_path in inputs:
+        source = Path(input_path)
+        if target == "columnar":
+            dest = Path(output) if output else source.with_suffix(".cols")
+            convert_json(source, dest)
+        else:
+            dest = Path(output) if output else source.with_suffix(".json")
+            dest.write_text(json.dumps(load_columnar(source).to_dict(), indent=2))
+        click.echo(f"Saved to {dest}")
+
+
+if __name__ == "__main__":
+    main()
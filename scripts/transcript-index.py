@@ -0,0 +1,83 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# dependencies = ["click", "numpy"]
+# ///
+"""Build and query a timestamped full-text index over transcripts."""
+
+import click
+
+from _transcript_index import TranscriptIndex, iter_transcripts
+
+DEFAULT_INDEX = "transcripts.index.db"
+
+
+def _timestamp(seconds: float | None) -> str:
+    if seconds is None:
+        return "--:--:--"
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+
+
+@click.group()
+@click.option("-i", "--index", "index_path", default=DEFAULT_INDEX, help="Index database path")
+@click.pass_context
+def main(ctx: click.Context, index_path: str):
+    """Find where something was said across transcribe.py outputs.
+
+    Examples:
+        ./transcript-index.py add archive/
+        ./transcript-index.py search "quarterly revenue"
+        ./transcript-index.py search "deploy*" --limit 50
+    """
+    ctx.obj = TranscriptIndex(index_path)
+    ctx.call_on_close(ctx.obj.close)
+
+
+@main.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--prune", is_flag=True, help="Also drop transcripts that no longer exist")
+@click.pass_obj
+def add(index: TranscriptIndex, paths: tuple[str, ...], prune: bool):
+    """Index transcripts (JSON files, columnar dirs, or folders of them); unchanged files are skipped."""
+    added = skipped = ignored = 0
+    for path in iter_transcripts(paths):
+        try:
+            changed = index.add(path)
+        except ValueError as exc:
+            click.echo(f"Skipping {exc}", err=True)
+            ignored += 1
+            continue
+        if changed:
+            added += 1
+        else:
+            skipped += 1
+    click.echo(f"Indexed {added} transcript(s), {skipped} unchanged" + (f", {ignored} not transcripts" if ignored else ""))
+    if prune:
+        click.echo(f"Pruned {index.prune()} missing transcript(s)")
+
+
+@main.command()
+@click.argument("query")
+@click.option("-n", "--limit", default=20, type=click.IntRange(min=1), help="Maximum hits")
+@click.option("--prefix", is_flag=True, help="Treat the last query term as a prefix")
+@click.pass_obj
+def search(index: TranscriptIndex, query: str, limit: int, prefix: bool):
+    """Search for a word or phrase; end a term with * for prefix matching."""
+    hits = index.search(query, limit=limit, prefix=prefix)
+    for hit in hits:
+        click.echo(f"{hit.audio or hit.transcript}  {_timestamp(hit.start)}-{_timestamp(hit.end)}  {hit.snippet}")
+    if not hits:
+        click.echo("No matches", err=True)
+
+
+@main.command()
+@click.pass_obj
+def stats(index: TranscriptIndex):
+    """Show index size."""
+    totals = index.stats()
+    click.echo(f"Transcripts: {totals['transcripts']}  Words: {totals['words']}  Distinct terms: {totals['terms']}")
+
+
+if __name__ == "__main__":
+    main()
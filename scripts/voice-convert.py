@@ -5,49 +5,190 @@
 """Convert audio to use a different voice (speech-to-speech)."""
 
 import click
-from elevenlabs import ElevenLabs
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
+from _core import get_client, resolve_voice
+from _fileio import expand_media, file_sha256, format_bytes, peak_rss_bytes, write_atomic, write_chunks
+from _metrics import instrumented
 
-FEMALE_VOICES = {
-    "sarah": "EXAVITQu4vr4xnSDxMaL",
-    "rachel": "21m00Tcm4TlvDq8ikWAM",
-    "dorothy": "ThT5KcBeYPX3keUQqHPh",
-}
+MANIFEST_NAME = "manifest.json"
+
+
+def convert_file(client, input_path: Path, output_path: Path, voice_id: str, remove_noise: bool) -> int:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(input_path, "rb") as f:
+        audio = client.speech_to_speech.convert(
+            voice_id=voice_id,
+            audio=f,
+            remove_background_noise=remove_noise,
+        )
+        return write_atomic(audio, output_path)
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {"entries": {}}
+
+
+def save_manifest(manifest: dict, path: Path) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".manifest-")
+    with os.fdopen(fd, "w") as tmp:
+        json.dump(manifest, tmp, indent=2, sort_keys=True)
+    os.replace(tmp_name, path)
+
+
+def convert_tree(client, spec: str, out_dir: Path, voice_id: str, remove_noise: bool, workers: int) -> dict[str, int]:
+    """Convert every clip under a directory/glob into a mirrored tree under out_dir.
+
+    Inputs are identified by content hash: a clip whose (sha256, voice_id,
+    remove_noise) already has an output on disk is skipped or copied, and
+    identical clips within a run are converted once. Returns status counts.
+    """
+    # The default output directory often sits inside the input tree; never feed outputs back in
+    root, files = expand_media(spec, exclude=out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    entries = manifest.setdefault("entries", {})
+
+    def finished(entry: dict) -> bool:
+        return entry.get("status") in ("converted", "copied") and (out_dir / entry["output"]).exists()
+
+    # Outputs already on disk, by what produced them
+    existing: dict[tuple, str] = {}
+    for entry in entries.values():
+        if finished(entry):
+            existing.setdefault((entry["sha256"], entry["voice_id"], entry["remove_noise"]), entry["output"])
+
+    counts = {"converted": 0, "copied": 0, "skipped": 0, "failed": 0}
+    pending: dict[tuple, tuple[str, Path, str]] = {}  # first clip per content key, converted via the API
+    copies: list[tuple[tuple, str, Path, str]] = []  # duplicates, filled from another output
+    claimed: set[str] = set()
+    for path in files:
+        rel = path.relative_to(root).as_posix()
+        key = (file_sha256(path), voice_id, remove_noise)
+        out_rel = Path(rel).with_suffix(".mp3").as_posix()
+        if out_rel in claimed:  # e.g. intro.wav next to intro.m4a
+            out_rel = f"{rel}.mp3"
+        claimed.add(out_rel)
+        previous = entries.get(rel, {})
+        if finished(previous) and previous["output"] == out_rel and \
+                (previous["sha256"], previous["voice_id"], previous["remove_noise"]) == key:
+            counts["skipped"] += 1
+            click.echo(f"[skipped] {rel}")
+        elif key in existing or key in pending:
+            copies.append((key, rel, path, out_rel))
+        else:
+            pending[key] = (rel, path, out_rel)
+
+    def record(key: tuple, rel: str, path: Path, out_rel: str, status: str, **fields):
+        entries[rel] = {
+            "input": str(path), "sha256": key[0], "voice_id": key[1], "remove_noise": key[2],
+            "output": out_rel, "status": status, **fields,
+        }
+        counts[status] += 1
+        save_manifest(manifest, manifest_path)
+
+    def run(path: Path, out_rel: str):
+        start = time.perf_counter()
+        size = convert_file(client, path, out_dir / out_rel, voice_id, remove_noise)
+        return size, time.perf_counter() - start
+
+    click.echo(f"{len(files)} clips: {len(pending)} to convert, {len(copies)} duplicates, {counts['skipped']} up to date", err=True)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, path, out_rel): key for key, (rel, path, out_rel) in pending.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            rel, path, out_rel = pending[key]
+            try:
+                size, seconds = future.result()
+            except Exception as exc:
+                record(key, rel, path, out_rel, "failed", error=str(exc))
+                click.echo(f"[failed] {rel}: {exc}")
+                continue
+            record(key, rel, path, out_rel, "converted", bytes=size, seconds=round(seconds, 3))
+            existing[key] = out_rel
+            click.echo(f"[converted] {rel} ({seconds:.1f}s)")
+
+    for key, rel, path, out_rel in copies:
+        if key not in existing:
+            record(key, rel, path, out_rel, "failed", error="conversion of the identical clip failed")
+            continue
+        if existing[key] != out_rel:
+            (out_dir / out_rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(out_dir / existing[key], out_dir / out_rel)
+        record(key, rel, path, out_rel, "copied", copied_from=existing[key], bytes=(out_dir / out_rel).stat().st_size, seconds=0.0)
+        click.echo(f"[copied] {rel} (same audio as {existing[key]})")
+    return counts
 
 
 @click.command()
-@click.argument("input_file", type=click.Path(exists=True))
-@click.option("-o", "--output", default="converted.mp3", help="Output file path")
-@click.option("-v", "--voice", default="sarah", help="Voice name or ID")
+@instrumented
+@click.argument("input_path")
+@click.option("-o", "--output", help="Output file, or output directory for a directory/glob input [default: converted.mp3 / converted/]")
+@click.option("-v", "--voice", default="sarah", help="Voice name (built-in or from your account, fuzzy matched) or ID")
 @click.option("--remove-noise", is_flag=True, help="Remove background noise")
-def main(input_file: str, output: str, voice: str, remove_noise: bool):
+@click.option("-w", "--workers", default=4, type=click.IntRange(min=1), help="Concurrent conversions for a directory/glob input")
+@click.option("--report-memory", is_flag=True, help="Print peak memory (RSS) for the run")
+def main(input_path: str, output: str | None, voice: str, remove_noise: bool, workers: int, report_memory: bool):
     """Transform audio to use a different voice.
     
+    INPUT_PATH is a file, a directory, or a glob pattern. Directories and
+    patterns are converted into a mirrored tree in the output directory,
+    with a manifest.json recording each clip's hash, output and timing;
+    re-runs only convert clips that are new or changed, and identical
+    clips are converted once.
+    
     Examples:
         ./voice-convert.py recording.mp3 -o sarah_version.mp3
         ./voice-convert.py speech.wav -v rachel -o rachel_version.mp3
         ./voice-convert.py noisy.mp3 -o clean.mp3 --remove-noise
+        ./voice-convert.py course/ -v rachel -o course-rachel/ -w 8
+        ./voice-convert.py "course/**/*.wav" -o course-rachel/
     """
-    client = ElevenLabs()
+    is_tree = Path(input_path).is_dir() or (glob.has_magic(input_path) and not Path(input_path).exists())
+    if not is_tree and not Path(input_path).is_file():
+        raise click.BadParameter(f"{input_path} does not exist", param_hint="INPUT_PATH")
+
+    client = get_client()
     
-    voice_id = FEMALE_VOICES.get(voice.lower(), voice)
+    try:
+        voice_id = resolve_voice(voice)
+    except LookupError as exc:
+        raise click.BadParameter(str(exc), param_hint="'-v' / '--voice'")
     
     click.echo(f"Converting to voice: {voice}...")
     
-    with open(input_file, "rb") as f:
-        audio_bytes = f.read()
-
-    audio = client.speech_to_speech.convert(
-        voice_id=voice_id,
-        audio=audio_bytes,
-        remove_background_noise=remove_noise,
-    )
-    
-    with open(output, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
+    if is_tree:
+        out_dir = Path(output or "converted")
+        counts = convert_tree(client, input_path, out_dir, voice_id, remove_noise, workers)
+        click.echo(", ".join(f"{n} {status}" for status, n in counts.items()))
+        output = str(out_dir)
+    else:
+        output = output or "converted.mp3"
+        # Pass the handle so the upload streams from disk instead of a full in-memory copy
+        with open(input_path, "rb") as f:
+            audio = client.speech_to_speech.convert(
+                voice_id=voice_id,
+                audio=f,
+                remove_background_noise=remove_noise,
+            )
+            write_chunks(audio, output)
     
+    if report_memory:
+        click.echo(f"Peak memory: {format_bytes(peak_rss_bytes())}")
     click.echo(f"Saved to {output}")
+    if is_tree and counts["failed"]:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+"""Offline benchmarks: drive every script against the local fake API server.
+
+Each scenario runs a script as a fresh subprocess (so cold startup counts)
+with ELEVENLABS_BASE_URL pointing at :mod:`fake_elevenlabs`, and records:
+
+    wall_s        process start to exit
+    ttfb_s        process start to the first response byte sent by the server
+    peak_rss_mb   peak resident memory of the script process
+    requests      API requests made (including retries)
+    throughput    jobs/s and MB/s for the batch concurrency scenarios
+
+Medians over ``--repeat`` runs are written as JSON to
+test-logs/benchmarks/<commit>.json; ``--compare`` prints the change against
+an earlier result file.
+
+Examples:
+    python tests/benchmark.py
+    python tests/benchmark.py --latency-ms 200 --repeat 5 -k narrate
+    python tests/benchmark.py --compare test-logs/benchmarks/abc1234.json
+    python tests/benchmark.py --uv   # run scripts through their uv shebang
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import click
+
+from fake_elevenlabs import FakeConfig, FakeElevenLabsServer
+
+_ROOT = Path(__file__).resolve().parent.parent
+_SCRIPTS_DIR = _ROOT / "scripts"
+_RESULTS_DIR = _ROOT / "test-logs" / "benchmarks"
+
+LONG_TEXT = "\n\n".join(
+    f"Paragraph {i}. " + "This sentence pads the paragraph out to a realistic length. " * 12
+    for i in range(8)
+)
+
+
+def scenarios(workdir: Path) -> dict[str, list[str]]:
+    """Script invocations to benchmark, by name; paths are relative to workdir."""
+    return {
+        "narrate": ["narrate.py", "Hello from the benchmark.", "-o", "narrate.mp3", "--no-cache"],
+        "narrate-stream": ["narrate.py", "Hello from the benchmark.", "--stream", "-o", "-", "--no-cache"],
+        "narrate-long": ["narrate.py", "-f", "long.md", "--long", "--chunk-chars", "800", "-w", "4",
+                         "-o", "long.mp3", "--no-cache"],
+        "sound-effect": ["sound-effect.py", "door slam", "-o", "sfx.mp3", "--no-cache"],
+        "compose-music": ["compose-music.py", "calm piano", "-o", "music.mp3", "--no-cache"],
+        "design-voice": ["design-voice.py", "warm narrator", "-o", "preview.mp3", "--no-cache"],
+        "voice-convert": ["voice-convert.py", "input.mp3", "-o", "converted.mp3"],
+        "isolate-audio": ["isolate-audio.py", "input.mp3", "-o", "isolated.mp3"],
+        "transcribe": ["transcribe.py", "input.mp3", "-o", "transcript.json"],
+        "transcribe-srt": ["transcribe.py", "input.mp3", "--format", "srt", "-o", "transcript.srt"],
+        "pipeline": ["pipeline.py", "input.mp3", "isolate | transcribe", "-o", "pipeline.json"],
+    }
+
+
+def write_manifest(path: Path, jobs: int) -> None:
+    path.write_text("".join(
+        json.dumps({"op": "narrate", "text": f"Batch job {i}.", "output": f"batch/{i}.mp3"}) + "\n"
+        for i in range(jobs)
+    ))
+
+
+def run_script(args: list[str], workdir: Path, env: dict, use_uv: bool) -> dict:
+    """Run one script invocation, returning wall time, peak RSS and exit status."""
+    script = str(_SCRIPTS_DIR / args[0])
+    command = ["uv", "run", "--script", script, *args[1:]] if use_uv else [sys.executable, script, *args[1:]]
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        stderr.seek(0)
+        error = stderr.read().decode(errors="replace")[-2000:]
+    return {
+        "start": start,
+        "wall_s": wall,
+        # ru_maxrss is KiB on Linux (bytes on macOS); with --uv it covers uv, not the script
+        "peak_rss_mb": usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+        "returncode": proc.returncode,
+        "stderr": error,
+    }
+
+
+def measure(server: FakeElevenLabsServer, args: list[str], workdir: Path, env: dict, use_uv: bool) -> dict:
+    server.reset()
+    run = run_script(args, workdir, env, use_uv)
+    records = server.reset()
+    if run["returncode"] != 0:
+        raise click.ClickException(f"{' '.join(args)} exited {run['returncode']}:\n{run['stderr']}")
+    first_bytes = [r.first_byte for r in records if r.first_byte is not None]
+    return {
+        "wall_s": run["wall_s"],
+        "ttfb_s": min(first_bytes) - run["start"] if first_bytes else None,
+        "peak_rss_mb": run["peak_rss_mb"],
+        "requests": len(records),
+        "bytes_out": sum(r.bytes_out for r in records),
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    summary = {}
+    for key in runs[0]:
+        values = [r[key] for r in runs if r[key] is not None]
+        summary[key] = round(statistics.median(values), 4) if values else None
+    return summary
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current: dict, baseline: dict) -> None:
+    click.echo(f"\nChange vs {baseline.get('commit', '?')} (negative is faster/smaller):")
+    for name, metrics in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in ("wall_s", "ttfb_s", "peak_rss_mb", "jobs_per_s"):
+            old, new = before.get(key), metrics.get(key)
+            if old and new is not None:
+                deltas.append(f"{key} {(new - old) / old:+.1%}")
+        click.echo(f"  {name:<22} {', '.join(deltas)}")
+
+
+@click.command()
+@click.option("-k", "--only", "selected", multiple=True, help="Run only scenarios whose name contains this")
+@click.option("--repeat", default=3, type=click.IntRange(min=1), help="Runs per scenario (medians are reported)")
+@click.option("--latency-ms", default=FakeConfig.latency_ms, type=float, help="Fake server time to first byte")
+@click.option("--chunk-size", default=FakeConfig.chunk_size, type=int, help="Bytes per streamed audio chunk")
+@click.option("--chunk-delay-ms", default=FakeConfig.chunk_delay_ms, type=float, help="Delay between audio chunks")
+@click.option("--audio-kb", default=FakeConfig.audio_bytes // 1024, type=int, help="Audio payload size per response")
+@click.option("--rate-limit-every", default=0, type=int, help="Inject a 429 on every Nth request")
+@click.option("--error-rate", default=0.0, type=float, help="Fraction of requests answered with 500")
+@click.option("--batch-jobs", default=24, type=int, help="Jobs in the batch concurrency scenarios")
+@click.option("--concurrency", "levels", default="1,4,8", help="Comma-separated batch concurrency levels")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Results file (default: test-logs/benchmarks/<commit>.json)")
+@click.option("--compare", type=click.Path(exists=True, dir_okay=False), help="Earlier results file to compare against")
+@click.option("--uv", "use_uv", is_flag=True, help="Run scripts with `uv run --script` instead of this interpreter")
+def main(selected, repeat, latency_ms, chunk_size, chunk_delay_ms, audio_kb, rate_limit_every, error_rate,
+         batch_jobs, levels, output, compare, use_uv):
+    """Benchmark every script against a local fake ElevenLabs server."""
+    config = FakeConfig(
+        latency_ms=latency_ms,
+        chunk_size=chunk_size,
+        chunk_delay_ms=chunk_delay_ms,
+        audio_bytes=audio_kb * 1024,
+        rate_limit_every=rate_limit_every,
+        error_rate=error_rate,
+    )
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, FakeElevenLabsServer(config) as server:
+        workdir = Path(tmp)
+        (workdir / "input.mp3").write_bytes(os.urandom(256 * 1024))
+        (workdir / "long.md").write_text(LONG_TEXT)
+        env = {
+            **os.environ,
+            "ELEVENLABS_BASE_URL": server.base_url,
+            "ELEVENLABS_API_KEY": "benchmark",
+            "ELEVENLABS_DAEMON": "0",
+            "ELEVENLABS_CACHE_DIR": str(workdir / "cache"),
+        }
+
+        plan = dict(scenarios(workdir))
+        for level in (int(c) for c in levels.split(",") if c):
+            plan[f"batch-c{level}"] = ["batch.py", "jobs.jsonl", "-c", str(level), "--restart", "--base-delay", "0.05"]
+        plan = {name: args for name, args in plan.items() if not selected or any(s in name for s in selected)}
+        write_manifest(workdir / "jobs.jsonl", batch_jobs)
+
+        for name, args in plan.items():
+            runs = [measure(server, args, workdir, env, use_uv) for _ in range(repeat)]
+            result = summarize(runs)
+            if name.startswith("batch-"):
+                result["jobs_per_s"] = round(batch_jobs / result["wall_s"], 2)
+                result["mb_per_s"] = round(result["bytes_out"] / result["wall_s"] / (1 << 20), 2)
+            results[name] = result
+            ttfb = f"{result['ttfb_s']:.3f}s" if result["ttfb_s"] is not None else "n/a"
+            extra = f", {result['jobs_per_s']} jobs/s" if "jobs_per_s" in result else ""
+            click.echo(
+                f"{name:<22} wall {result['wall_s']:.3f}s  ttfb {ttfb}  "
+                f"rss {result['peak_rss_mb']:.1f}MB  requests {result['requests']:g}{extra}"
+            )
+
+    commit = current_commit()
+    payload = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "runner": "uv" if use_uv else "python",
+        "repeat": repeat,
+        "server": asdict(config),
+        "results": results,
+    }
+    out_path = Path(output) if output else _RESULTS_DIR / f"{commit}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(payload, indent=2) + "\n")
+    click.echo(f"Results saved to {out_path}")
+
+    if compare:
+        print_comparison(payload, json.loads(Path(compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
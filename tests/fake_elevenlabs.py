@@ -0,0 +1,258 @@
+"""Local stand-in for the ElevenLabs HTTP API, for offline benchmarks and tests.
+
+Serves the endpoints the scripts use with synthetic payloads:
+
+    POST /v1/text-to-speech/{voice}[/stream]     audio
+    POST /v1/speech-to-speech/{voice}[/stream]   audio
+    POST /v1/sound-generation                    audio
+    POST /v1/music[/stream]                      audio
+    POST /v1/audio-isolation[/stream]            audio
+    POST /v1/speech-to-text                      JSON transcript
+    POST /v1/text-to-voice/create-previews       JSON previews
+    GET  /v1/models                              JSON
+    GET  /v1/voices                              JSON voice list (ETag / 304 revalidation)
+
+Audio responses are streamed with chunked transfer encoding. Latency,
+chunking, payload size and error/429 injection come from :class:`FakeConfig`.
+Point the scripts at it with ``ELEVENLABS_BASE_URL=http://127.0.0.1:PORT``.
+
+Run standalone:
+    python tests/fake_elevenlabs.py --port 8765 --latency-ms 150 --rate-limit-every 5
+"""
+
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 50.0  # before the response headers (time to first byte)
+    chunk_size: int = 4096
+    chunk_delay_ms: float = 2.0  # between audio chunks
+    audio_bytes: int = 64 * 1024
+    transcript_words: int = 200
+    error_rate: float = 0.0  # fraction of requests answered with 500
+    rate_limit_every: int = 0  # every Nth request gets a 429 (0 = never)
+    retry_after: float = 0.1
+    seed: int = 0
+
+
+@dataclass
+class RequestRecord:
+    method: str
+    path: str
+    status: int
+    received: float  # time.perf_counter() when the request line was read
+    first_byte: float | None = None
+    finished: float | None = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+
+_AUDIO_ROUTES = re.compile(
+    r"^/v1/(text-to-speech/[^/]+|speech-to-speech/[^/]+|sound-generation|music|audio-isolation)(/stream)?$"
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeElevenLabsServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(parts)
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send(self, record: RequestRecord, status: int, body: bytes, content_type: str, headers=()):
+        record.status = status
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        record.first_byte = time.perf_counter()
+        record.bytes_out = len(body)
+        self.wfile.write(body)
+
+    def _stream(self, record: RequestRecord):
+        config = self.server.config
+        record.status = 200
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        record.first_byte = time.perf_counter()
+        remaining = config.audio_bytes
+        while remaining > 0:
+            chunk = self.server.audio_chunk[: min(config.chunk_size, remaining)]
+            remaining -= len(chunk)
+            record.bytes_out += len(chunk)
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+            if remaining and config.chunk_delay_ms:
+                time.sleep(config.chunk_delay_ms / 1000)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _handle(self):
+        record = RequestRecord(self.command, self.path.split("?")[0], 0, time.perf_counter())
+        # Logged up front (and filled in as it goes) so a client that has read the whole
+        # response always finds its request in the log
+        self.server.record(record)
+        config = self.server.config
+        try:
+            body = self._read_body() if self.command == "POST" else b""
+            record.bytes_in = len(body)
+            fault = self.server.next_fault()
+            time.sleep(config.latency_ms / 1000)
+            path = record.path
+            if fault == 429:
+                self._send(record, 429, b'{"detail": {"status": "too_many_concurrent_requests"}}',
+                           "application/json", [("Retry-After", str(config.retry_after))])
+            elif fault == 500:
+                self._send(record, 500, b'{"detail": "injected failure"}', "application/json")
+            elif self.command == "POST" and _AUDIO_ROUTES.match(path):
+                self._stream(record)
+            elif self.command == "POST" and path == "/v1/speech-to-text":
+                self._send(record, 200, json.dumps(self.server.transcript()).encode(), "application/json")
+            elif self.command == "POST" and path == "/v1/text-to-voice/create-previews":
+                self._send(record, 200, json.dumps(self.server.previews()).encode(), "application/json")
+            elif self.command == "GET" and path == "/v1/models":
+                self._send(record, 200, b"[]", "application/json")
+            elif self.command == "GET" and path == "/v1/voices":
+                body = json.dumps({"voices": self.server.voices}).encode()
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(record, 304, b"", "application/json", [("ETag", etag)])
+                else:
+                    self._send(record, 200, body, "application/json", [("ETag", etag)])
+            else:
+                self._send(record, 404, b'{"detail": "Not found"}', "application/json")
+        finally:
+            record.finished = time.perf_counter()
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class FakeElevenLabsServer(ThreadingHTTPServer):
+    """Threaded fake API server; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, config: FakeConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeConfig()
+        self.requests: list[RequestRecord] = []
+        self._lock = threading.Lock()
+        self._count = 0
+        self._random = random.Random(self.config.seed)
+        # Deterministic, incompressible "audio"
+        self.audio_chunk = random.Random(self.config.seed).randbytes(max(self.config.chunk_size, 1))
+        # Served by GET /v1/voices; tests may edit it to simulate account changes
+        self.voices = [
+            {"voice_id": "EXAVITQu4vr4xnSDxMaL", "name": "Sarah - Mature, Reassuring", "category": "premade"},
+            {"voice_id": "JBFqnCBsd6RMkjVDRZzb", "name": "George - Warm, Captivating Storyteller", "category": "premade"},
+            {"voice_id": "onwK4e9ZLuTAKqWW03F9", "name": "Daniel - Steady Broadcaster", "category": "premade"},
+            {"voice_id": "Cl0nedNarrat0r000001", "name": "Podcast Narrator", "category": "cloned"},
+        ]
+        self._thread: threading.Thread | None = None
+        super().__init__((host, port), _Handler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_fault(self) -> int | None:
+        with self._lock:
+            self._count += 1
+            if self.config.rate_limit_every and self._count % self.config.rate_limit_every == 0:
+                return 429
+            if self.config.error_rate and self._random.random() < self.config.error_rate:
+                return 500
+        return None
+
+    def record(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.requests.append(record)
+
+    def reset(self) -> list[RequestRecord]:
+        """Return the recorded requests and start a fresh log."""
+        with self._lock:
+            records, self.requests = self.requests, []
+            return records
+
+    def transcript(self) -> dict:
+        words = []
+        for i in range(self.config.transcript_words):
+            if i:
+                words.append({"text": " ", "start": i * 0.4 - 0.1, "end": i * 0.4, "type": "spacing"})
+            words.append({"text": f"word{i}", "start": i * 0.4, "end": i * 0.4 + 0.3,
+                          "type": "word", "logprob": -0.1, "speaker_id": "speaker_0"})
+        text = " ".join(w["text"] for w in words if w["type"] == "word")
+        return {"language_code": "en", "language_probability": 1.0, "text": text, "words": words}
+
+    def previews(self) -> dict:
+        audio = base64.b64encode(self.audio_chunk * max(1, self.config.audio_bytes // len(self.audio_chunk))).decode()
+        return {
+            "previews": [
+                {"audio_base_64": audio, "generated_voice_id": f"fake-voice-{i}", "media_type": "audio/mpeg",
+                 "duration_secs": 3.0, "language": "en"}
+                for i in range(3)
+            ],
+            "text": "preview",
+        }
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def _config_options(func):
+    for f in reversed(fields(FakeConfig)):
+        func = click.option(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default, show_default=True)(func)
+    return func
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8765, type=int)
+@_config_options
+def main(host: str, port: int, **config):
+    """Run a local fake ElevenLabs API server in the foreground."""
+    server = FakeElevenLabsServer(FakeConfig(**config), host, port)
+    click.echo(f"Fake ElevenLabs API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,97 @@
+import asyncio
+import atexit
 import base64
 import importlib.util
 import json
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
 from types import SimpleNamespace
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from unittest.mock import MagicMock, patch
 
+import click
 from click.testing import CliRunner
 
+_SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+if str(_SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(_SCRIPTS_DIR))
+
+import _core  # noqa: E402
+import _fileio  # noqa: E402
+
 
 class _FakeAudio:
     def __iter__(self):
         yield b"audio-data"
 
 
+class _LargeAudio:
+    """A response streaming ``size`` bytes in fresh chunks, like the SDK does."""
+
+    def __init__(self, size: int, chunk_size: int = 64 * 1024):
+        self.size, self.chunk_size = size, chunk_size
+
+    def __iter__(self):
+        sent = 0
+        while sent < self.size:
+            chunk = bytes(min(self.chunk_size, self.size - sent))
+            sent += len(chunk)
+            yield chunk
+
+
+def _drain(upload, chunk_size: int = 64 * 1024) -> int:
+    """Read an upload the way httpx does, returning the byte count."""
+    if isinstance(upload, (bytes, bytearray)):
+        return len(upload)
+    total = 0
+    while chunk := upload.read(chunk_size):
+        total += len(chunk)
+    return total
+
+
+class _MemoryProbe:
+    """Peak traced Python allocations and peak RSS growth over a block."""
+
+    def __enter__(self):
+        import threading
+        import tracemalloc
+
+        self.rss_growth = 0
+        self._done = threading.Event()
+        self._baseline = self._rss()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        tracemalloc.start()
+        self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        import tracemalloc
+
+        self.seconds = time.perf_counter() - self._start
+        self.traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self._done.set()
+        self._sampler.join()
+
+    @staticmethod
+    def _rss() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:  # no procfs: only the tracemalloc bound applies
+            return 0
+
+    def _sample(self):
+        while not self._done.wait(0.005):
+            self.rss_growth = max(self.rss_growth, self._rss() - self._baseline)
+
+
 class _FakeTranscript:
     def __init__(self, text: str, words=None):
         self.text = text
@@ -25,23 +101,13 @@ class _FakeTranscript:
         return "SRT_OUTPUT"
 
 
-class _FakeElevenLabsModule:
-    class ElevenLabs:  # pragma: no cover - placeholder for import
-        pass
-
-
 def _load_script(name: str):
-    script_path = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    script_path = _SCRIPTS_DIR / f"{name}.py"
     module_name = f"elevenlabs_script_{name}"
     spec = importlib.util.spec_from_file_location(module_name, script_path)
     module = importlib.util.module_from_spec(spec)
-    if LIVE_TESTS:
-        assert spec.loader is not None
-        spec.loader.exec_module(module)
-    else:
-        with patch.dict(sys.modules, {"elevenlabs": _FakeElevenLabsModule()}):
-            assert spec.loader is not None
-            spec.loader.exec_module(module)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
     return module
 
 
@@ -51,7 +117,14 @@ SKIP_VOICE_DESIGN = os.environ.get("ELEVENLABS_SKIP_VOICE_DESIGN") == "1"
 SKIP_ISOLATION = os.environ.get("ELEVENLABS_SKIP_ISOLATION") == "1"
 SKIP_TRANSCRIPTION = os.environ.get("ELEVENLABS_SKIP_TRANSCRIPTION") == "1"
 SKIP_VOICE_CONVERT = os.environ.get("ELEVENLABS_SKIP_VOICE_CONVERT") == "1"
-_OUTPUT_DIR = Path(os.environ.get("ELEVENLABS_TEST_OUTPUT_DIR", "output/elevenlabs"))
+PERF_MB = int(os.environ.get("ELEVENLABS_PERF_MB", "128"))
+PERF_MIN_MBPS = float(os.environ.get("ELEVENLABS_PERF_MIN_MBPS", "20"))
+if os.environ.get("ELEVENLABS_TEST_OUTPUT_DIR"):
+    _OUTPUT_DIR = Path(os.environ["ELEVENLABS_TEST_OUTPUT_DIR"])
+else:
+    # A fresh directory per run, so test runs never leave files in the tree
+    _OUTPUT_DIR = Path(tempfile.mkdtemp(prefix="elevenlabs-test-output-"))
+    atexit.register(shutil.rmtree, _OUTPUT_DIR, ignore_errors=True)
 
 
 def _output_path(filename: str) -> Path:
@@ -63,10 +136,9 @@ class ElevenLabsScriptTests(TestCase):
     @classmethod
     def setUpClass(cls):
         if LIVE_TESTS:
-            narrate_module = _load_script("narrate")
             cls.sample_input = _output_path("sample_input.mp3")
             if not cls.sample_input.exists():
-                client = narrate_module.ElevenLabs()
+                client = _core.sdk_client()
                 audio = client.text_to_speech.convert(
                     text=(
                         "Hello, this is a test sample. "
@@ -87,6 +159,11 @@ class ElevenLabsScriptTests(TestCase):
 
     def setUp(self):
         self.runner = CliRunner()
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._cache_dir.cleanup)
+        env = patch.dict(os.environ, {"ELEVENLABS_CACHE_DIR": self._cache_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
 
     def test_narrate_writes_audio(self):
         module = _load_script("narrate")
@@ -99,7 +176,7 @@ class ElevenLabsScriptTests(TestCase):
         else:
             client = MagicMock()
             client.text_to_speech.convert.return_value = _FakeAudio()
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, ["Hello", "-o", str(out_path)])
             self.assertEqual(result.exit_code, 0)
             self.assertTrue(out_path.exists())
@@ -117,7 +194,7 @@ class ElevenLabsScriptTests(TestCase):
         else:
             client = MagicMock()
             client.text_to_sound_effects.convert.return_value = _FakeAudio()
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, ["door slam", "-o", str(out_path), "-d", "1.2"])
             self.assertEqual(result.exit_code, 0)
             self.assertTrue(out_path.exists())
@@ -145,7 +222,7 @@ class ElevenLabsScriptTests(TestCase):
         else:
             client = MagicMock()
             client.speech_to_speech.convert.return_value = _FakeAudio()
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(
                     module.main,
                     [str(input_path), "-v", "rachel", "-o", str(out_path), "--remove-noise"],
@@ -173,7 +250,7 @@ class ElevenLabsScriptTests(TestCase):
         else:
             client = MagicMock()
             client.audio_isolation.convert.return_value = _FakeAudio()
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, [str(input_path), "-o", str(out_path)])
             self.assertEqual(result.exit_code, 0)
             self.assertTrue(out_path.exists())
@@ -200,7 +277,7 @@ class ElevenLabsScriptTests(TestCase):
             client = MagicMock()
             fake_word = SimpleNamespace(word="hello", start=0.0, end=0.1)
             client.speech_to_text.convert.return_value = _FakeTranscript("hello", [fake_word])
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, [str(input_path), "-o", str(out_path)])
             self.assertEqual(result.exit_code, 0)
             payload = json.loads(out_path.read_text())
@@ -221,7 +298,7 @@ class ElevenLabsScriptTests(TestCase):
         else:
             client = MagicMock()
             client.music.compose.return_value = _FakeAudio()
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, ["lofi beat", "-o", str(out_path), "-d", "15"])
             self.assertEqual(result.exit_code, 0)
             self.assertTrue(out_path.exists())
@@ -251,9 +328,1284 @@ class ElevenLabsScriptTests(TestCase):
             )
             client = MagicMock()
             client.text_to_voice.create_previews.return_value = SimpleNamespace(previews=[preview])
-            with patch.object(module, "ElevenLabs", return_value=client):
+            with patch("_core.sdk_client", return_value=client):
                 result = self.runner.invoke(module.main, ["Warm narrator", "-o", str(out_path)])
             self.assertEqual(result.exit_code, 0)
             self.assertTrue(out_path.exists())
             self.assertEqual(out_path.read_bytes(), b"preview-audio")
             client.text_to_voice.create_previews.assert_called_once()
+
+    def test_narrate_long_mode_chunks_in_order(self):
+        module = _load_script("narrate")
+        doc_path = _output_path("article.md")
+        paragraphs = [f"## Section {i}\n\nParagraph {i} has **bold** text. " + "Filler sentence. " * 20 for i in range(6)]
+        doc_path.write_text("\n\n".join(paragraphs))
+        out_path = _output_path("narrate-long.mp3")
+
+        def fake_convert(text, **kwargs):
+            return iter([f"<{text.split()[1]}>".encode()])
+
+        client = MagicMock()
+        client.text_to_speech.convert.side_effect = fake_convert
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(
+                module.main,
+                ["-f", str(doc_path), "--long", "--chunk-chars", "400", "-w", "3", "-o", str(out_path)],
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        calls = client.text_to_speech.convert.call_args_list
+        self.assertGreater(len(calls), 1)
+        texts = [c.kwargs["text"] for c in calls]
+        self.assertTrue(all(len(t) <= 400 for t in texts))
+        self.assertFalse(any("**" in t or "#" in t for t in texts))
+        by_text = {c.kwargs["text"]: c.kwargs for c in calls}
+        ordered = module.split_text(module.strip_markdown(doc_path.read_text()), 400)
+        self.assertEqual(sorted(texts), sorted(ordered))
+        self.assertIsNone(by_text[ordered[0]]["previous_text"])
+        self.assertEqual(by_text[ordered[1]]["previous_text"], ordered[0][-module.CONTEXT_CHARS:])
+        self.assertIsNone(by_text[ordered[-1]]["next_text"])
+        expected = b"".join(f"<{t.split()[1]}>".encode() for t in ordered)
+        self.assertEqual(out_path.read_bytes(), expected)
+        doc_path.unlink()
+
+    def test_narrate_split_text_respects_boundaries(self):
+        module = _load_script("narrate")
+        text = "First paragraph. Still first.\n\nSecond one here.\n\n" + "word " * 100
+        chunks = module.split_text(text, 60)
+        self.assertEqual(chunks[0], "First paragraph. Still first. Second one here.")
+        self.assertTrue(all(len(c) <= 60 for c in chunks))
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_generation_scripts_serve_repeats_from_cache(self):
+        cases = [
+            ("narrate", "text_to_speech", ["Hello"]),
+            ("sound-effect", "text_to_sound_effects", ["door slam", "-d", "1.2"]),
+            ("compose-music", "music", ["lofi beat", "-d", "15"]),
+        ]
+        for name, attr, args in cases:
+            with self.subTest(script=name):
+                module = _load_script(name)
+                out_path = _output_path(f"cached-{name}.mp3")
+                client = MagicMock()
+                endpoint = getattr(client, attr)
+                endpoint.convert.side_effect = lambda **kw: _FakeAudio()
+                endpoint.compose.side_effect = lambda **kw: _FakeAudio()
+                with patch("_core.sdk_client", return_value=client):
+                    first = self.runner.invoke(module.main, [*args, "-o", str(out_path)])
+                    out_path.unlink()
+                    second = self.runner.invoke(module.main, [*args, "-o", str(out_path)])
+                    self.assertIn("1 hit(s)", second.output)
+                    self.assertEqual(out_path.read_bytes(), b"audio-data")
+                    self.runner.invoke(module.main, [*args, "--refresh", "-o", str(out_path)])
+                    self.runner.invoke(module.main, [*args, "--no-cache", "-o", str(out_path)])
+                self.assertEqual(first.exit_code, 0, first.output)
+                self.assertEqual(second.exit_code, 0, second.output)
+                api_calls = endpoint.convert.call_count + endpoint.compose.call_count
+                self.assertEqual(api_calls, 3)
+
+    def test_design_voice_preview_cached(self):
+        module = _load_script("design-voice")
+        out_path = _output_path("cached-preview.mp3")
+        preview = SimpleNamespace(
+            audio_base_64=base64.b64encode(b"preview-audio").decode("ascii"),
+            generated_voice_id="voice123",
+        )
+        client = MagicMock()
+        client.text_to_voice.create_previews.return_value = SimpleNamespace(previews=[preview])
+        with patch("_core.sdk_client", return_value=client):
+            first = self.runner.invoke(module.main, ["Warm narrator", "-o", str(out_path)])
+            result = self.runner.invoke(module.main, ["Warm narrator", "-o", str(out_path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Use this ID to create the voice permanently", first.output)
+        self.assertIn("voice123", result.output)
+        self.assertIn("comes from the cache and may have expired", result.output)
+        self.assertEqual(out_path.read_bytes(), b"preview-audio")
+        client.text_to_voice.create_previews.assert_called_once()
+
+        # Past the TTL the preview ID is assumed gone, so the design is requested again
+        for entry in Path(self._cache_dir.name).glob("??/*.bin"):
+            old = time.time() - module.PREVIEW_TTL - 60
+            os.utime(entry, (old, old))
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, ["Warm narrator", "-o", str(out_path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Use this ID to create the voice permanently", result.output)
+        self.assertEqual(client.text_to_voice.create_previews.call_count, 2)
+
+    def test_audio_cache_lru_eviction(self):
+        from _cache import AudioCache, cache_key
+
+        cache = AudioCache(root=self._cache_dir.name, max_bytes=350)
+        for i in range(3):
+            b"".join(cache.fetch("ep", {"i": i}, lambda: [b"x" * 100]))
+            os.utime(cache.path(cache_key("ep", i=i)), (i, i))
+        # Touch entry 0 so entry 1 becomes least recently used
+        self.assertIsNotNone(cache.get(cache_key("ep", i=0)))
+        b"".join(cache.fetch("ep", {"i": 3}, lambda: [b"x" * 100]))
+        self.assertTrue(cache.path(cache_key("ep", i=0)).exists())
+        self.assertFalse(cache.path(cache_key("ep", i=1)).exists())
+        self.assertTrue(cache.path(cache_key("ep", i=2)).exists())
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        cache.save_stats()
+        self.assertEqual(AudioCache(root=self._cache_dir.name).stats()["misses"], 4)
+
+    def test_narrate_stream_to_stdout_reports_ttfb(self):
+        module = _load_script("narrate")
+
+        def fake_stream(**kwargs):
+            yield b"chunk-1|"
+            yield b"chunk-2"
+
+        client = MagicMock()
+        client.text_to_speech.stream.side_effect = fake_stream
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, ["Hello", "--stream", "--no-cache", "-o", "-"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.stdout_bytes, b"chunk-1|chunk-2")
+        self.assertIn("Time to first byte:", result.stderr)
+        client.text_to_speech.stream.assert_called_once()
+        client.text_to_speech.convert.assert_not_called()
+
+    def test_narrate_stdin_sentence_fallback(self):
+        module = _load_script("narrate")
+        out_path = _output_path("narrate-stdin.mp3")
+        client = MagicMock()
+        client.text_to_speech.convert.side_effect = lambda text, **kw: iter([f"[{text}]".encode()])
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(
+                module.main,
+                ["-f", "-", "--transport", "sentences", "-o", str(out_path)],
+                input="First sentence. Second one!\n\nA heading\n\nTrailing text",
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(out_path.read_bytes(), b"[First sentence.][Second one!][A heading][Trailing text]")
+        prev = {c.kwargs["text"]: c.kwargs["previous_text"] for c in client.text_to_speech.convert.call_args_list}
+        self.assertIsNone(prev["First sentence."])
+        self.assertEqual(prev["Second one!"], "First sentence.")
+
+    def test_narrate_incremental_cancels_queued_sentences_on_failure(self):
+        module = _load_script("narrate")
+        sentences = [f"Sentence {i}." for i in range(20)]
+        called = []
+
+        def convert(text, **kwargs):
+            called.append(text)
+            if text == "Sentence 1.":
+                raise RuntimeError("quota exceeded")
+            time.sleep(0.01)
+            return iter([text.encode()])
+
+        audio = module.synthesize_incremental(convert, iter(sentences), workers=1)
+        with self.assertRaises(RuntimeError):
+            list(audio)
+        time.sleep(0.05)
+        self.assertLessEqual(len(called), 3)
+
+        # Closing the consumer early stops the queued sentences too
+        called.clear()
+        audio = module.synthesize_incremental(convert, iter(sentences[2:]), workers=1)
+        self.assertEqual(next(audio), b"Sentence 2.")
+        audio.close()
+        time.sleep(0.05)
+        self.assertLessEqual(len(called), 3)
+
+    def test_narrate_stdin_websocket_transport(self):
+        module = _load_script("narrate")
+        out_path = _output_path("narrate-ws.mp3")
+        received = []
+
+        def fake_realtime(text, **kwargs):
+            for piece in text:
+                received.append(piece)
+                yield piece.strip().encode()
+
+        client = MagicMock()
+        client.text_to_speech.convert_realtime.side_effect = fake_realtime
+        # With the daemon running get_client() has no convert_realtime; the websocket goes direct
+        daemon_client = SimpleNamespace(text_to_speech=SimpleNamespace(convert=MagicMock()))
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(module, "get_client", return_value=daemon_client):
+            result = self.runner.invoke(
+                module.main,
+                ["-f", "-", "--transport", "websocket", "-o", str(out_path)],
+                input="One. Two.",
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(received, ["One. ", "Two. "])
+        self.assertEqual(out_path.read_bytes(), b"One.Two.")
+        client.text_to_speech.convert.assert_not_called()
+        daemon_client.text_to_speech.convert.assert_not_called()
+
+        # An SDK without the realtime interface is a usage error, not an AttributeError
+        with patch("_core.sdk_client", return_value=daemon_client):
+            result = self.runner.invoke(
+                module.main,
+                ["-f", "-", "--transport", "websocket", "-o", str(out_path)],
+                input="One. Two.",
+            )
+        self.assertEqual(result.exit_code, 2, result.output)
+        self.assertIn("--transport sentences", result.output)
+
+    def test_narrate_iter_sentences_waits_for_boundary(self):
+        module = _load_script("narrate")
+        pieces = iter(["Hel", "lo there. How", " are you?", " Fine"])
+        sentences = module.iter_sentences(pieces)
+        self.assertEqual(next(sentences), "Hello there.")
+        self.assertEqual(next(sentences), "How are you?")
+        self.assertEqual(list(sentences), ["Fine"])
+
+    def test_plan_segments_cuts_inside_silences(self):
+        import _audio
+
+        silences = [(100.0, 101.0), (280.0, 282.0), (590.0, 592.0), (700.0, 700.5)]
+        spans = _audio.plan_segments(1000.0, silences, max_seconds=600)
+        self.assertEqual(spans, [(0.0, 591.0), (591.0, 1000.0)])
+        spans = _audio.plan_segments(1000.0, [], max_seconds=300)
+        self.assertEqual(spans, [(0.0, 300.0), (300.0, 600.0), (600.0, 900.0), (900.0, 1000.0)])
+
+    def test_transcribe_long_mode_merges_segments(self):
+        module = _load_script("transcribe")
+        input_path = _output_path("meeting.mp3")
+        input_path.write_bytes(b"input")
+        out_path = _output_path("meeting.json")
+
+        def words(*items):
+            return [
+                SimpleNamespace(text=t, start=s, end=e, type=k, speaker_id=None, logprob=0.0, characters=None)
+                for t, s, e, k in items
+            ]
+
+        # Segment 0 owns [0, 10), audio [0, 11); segment 1 owns [10, 20), audio [9, 20)
+        segment_results = {
+            0.0: _FakeTranscript("", words(("hello", 1.0, 1.5, "word"), (" ", 1.5, 1.6, "spacing"),
+                                           ("there", 9.2, 9.8, "word"), (" ", 9.8, 10.1, "spacing"),
+                                           ("friend", 10.1, 10.6, "word"))),
+            9.0: _FakeTranscript("", words(("there", 0.2, 0.8, "word"), (" ", 0.8, 1.1, "spacing"),
+                                           ("friend", 1.1, 1.6, "word"), (" ", 1.6, 1.7, "spacing"),
+                                           ("bye", 5.0, 5.5, "word"))),
+        }
+        client = MagicMock()
+        client.speech_to_text.convert.side_effect = lambda file, **kw: segment_results[file]
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(module._audio, "require_ffmpeg"), \
+                patch.object(module._audio, "probe_duration", return_value=20.0), \
+                patch.object(module._audio, "detect_silences", return_value=[(9.9, 10.1)]), \
+                patch.object(module._audio, "extract_segment", side_effect=lambda path, start, end: start):
+            result = self.runner.invoke(
+                module.main,
+                [str(input_path), "--long", "--segment-seconds", "12", "--overlap", "1", "-o", str(out_path)],
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        payload = json.loads(out_path.read_text())
+        self.assertEqual(payload["text"], "hello there friend bye")
+        self.assertEqual([w["start"] for w in payload["words"] if w["type"] == "word"], [1.0, 9.2, 10.1, 14.0])
+        self.assertEqual(client.speech_to_text.convert.call_count, 2)
+        input_path.unlink()
+
+    def test_upload_scripts_stream_file_handles(self):
+        cases = [
+            ("transcribe", "speech_to_text", "file", _FakeTranscript("hi")),
+            ("voice-convert", "speech_to_speech", "audio", _FakeAudio()),
+            ("isolate-audio", "audio_isolation", "audio", _FakeAudio()),
+        ]
+        input_path = _output_path("upload.wav")
+        input_path.write_bytes(b"RIFF" + b"\0" * 1024)
+        for name, attr, arg, response in cases:
+            with self.subTest(script=name):
+                module = _load_script(name)
+                out_path = _output_path(f"upload-{name}.out")
+                uploads = []
+
+                def fake_convert(**kwargs):
+                    upload = kwargs[arg]
+                    uploads.append(upload)
+                    self.assertFalse(isinstance(upload, (bytes, bytearray)))
+                    self.assertEqual(upload.read(4), b"RIFF")
+                    return response
+
+                client = MagicMock()
+                getattr(client, attr).convert.side_effect = fake_convert
+                with patch("_core.sdk_client", return_value=client):
+                    result = self.runner.invoke(module.main, [str(input_path), "-o", str(out_path), "--report-memory"])
+                self.assertEqual(result.exit_code, 0, result.output)
+                self.assertIn("Peak memory:", result.output)
+                self.assertEqual(len(uploads), 1)
+                self.assertTrue(uploads[0].closed)
+        input_path.unlink()
+
+    def test_scripts_stream_large_payloads_in_bounded_memory(self):
+        size = PERF_MB * 1024 * 1024
+        workdir = Path(self._cache_dir.name)
+        input_path = workdir / "large.wav"
+        with open(input_path, "wb") as f:
+            f.write(b"RIFF")
+            f.truncate(size)  # sparse: cheap to create, real pages once read into memory
+        uploads = []
+
+        def upload(arg, response):
+            def convert(**kwargs):
+                uploads.append(_drain(kwargs[arg]))
+                return response()
+            return convert
+
+        audio = lambda: _LargeAudio(size)
+        cases = [
+            # (script, args, endpoints, bytes uploaded, bytes written, traced peak bound in MB)
+            ("narrate", ["Hello"], {"text_to_speech.convert": lambda **kw: audio()}, 0, size, 16),
+            ("sound-effect", ["Rain"], {"text_to_sound_effects.convert": lambda **kw: audio()}, 0, size, 16),
+            ("compose-music", ["Lofi"], {"music.compose": lambda **kw: audio()}, 0, size, 16),
+            ("voice-convert", [str(input_path)], {"speech_to_speech.convert": upload("audio", audio)}, size, size, 16),
+            ("isolate-audio", [str(input_path)], {"audio_isolation.convert": upload("audio", audio)}, size, size, 16),
+            ("transcribe", [str(input_path)], {"speech_to_text.convert": upload("file", lambda: _FakeTranscript("hi"))}, size, 0, 16),
+            # Two in-flight pipes, each with a bounded queue and an in-memory replay spool
+            ("pipeline", [str(input_path), "isolate | voice-convert"], {
+                "audio_isolation.convert": upload("audio", audio),
+                "speech_to_speech.convert": upload("audio", audio),
+            }, 2 * size, size, 64),
+        ]
+        for name, args, endpoints, uploaded, written, bound_mb in cases:
+            with self.subTest(script=name):
+                module = _load_script(name)
+                out_path = workdir / f"large-{name}.out"
+                client = MagicMock()
+                for endpoint, fake in endpoints.items():
+                    service, method = endpoint.split(".")
+                    getattr(getattr(client, service), method).side_effect = fake
+                uploads.clear()
+                with patch("_core.sdk_client", return_value=client), _MemoryProbe() as probe:
+                    result = self.runner.invoke(module.main, [*args, "-o", str(out_path)])
+                self.assertEqual(result.exit_code, 0, result.output)
+                self.assertEqual(sum(uploads), uploaded)
+                if written:
+                    self.assertEqual(out_path.stat().st_size, written)
+                # Buffering the whole input or output would cost at least `size` bytes
+                self.assertLess(probe.traced_peak, bound_mb * 1024 * 1024, f"traced peak {probe.traced_peak >> 20} MB")
+                self.assertLess(probe.rss_growth, bound_mb * 1024 * 1024 + size // 4, f"RSS grew {probe.rss_growth >> 20} MB")
+                moved = max(uploaded, written) / (1024 * 1024)
+                self.assertGreater(moved / probe.seconds, PERF_MIN_MBPS, f"{moved / probe.seconds:.0f} MB/s")
+                out_path.unlink(missing_ok=True)
+
+    def test_transcribe_srt_and_vtt_cues(self):
+        module = _load_script("transcribe")
+        input_path = _output_path("subs.mp3")
+        input_path.write_bytes(b"input")
+
+        def w(text, start, end, speaker="speaker_0", kind="word"):
+            return SimpleNamespace(text=text, start=start, end=end, type=kind, speaker_id=speaker)
+
+        words = [
+            w("Hello", 0.0, 0.4), w(" ", 0.4, 0.5, kind="spacing"), w("there.", 0.5, 0.9),
+            # pause longer than --max-gap starts a new cue
+            w("After", 3.0, 3.3), w("pause", 3.4, 3.8),
+            # speaker change starts a new cue
+            w("Reply", 3.9, 4.2, speaker="speaker_1"),
+        ]
+        client = MagicMock()
+        client.speech_to_text.convert.return_value = _FakeTranscript("", words)
+        for fmt, expected in [
+            ("srt", "1\n00:00:00,000 --> 00:00:00,900\n[speaker_0] Hello there.\n\n"
+                    "2\n00:00:03,000 --> 00:00:03,800\n[speaker_0] After pause\n\n"
+                    "3\n00:00:03,900 --> 00:00:04,200\n[speaker_1] Reply\n\n"),
+            ("vtt", "WEBVTT\n\n00:00:00.000 --> 00:00:00.900\n<v speaker_0>Hello there.\n\n"
+                    "00:00:03.000 --> 00:00:03.800\n<v speaker_0>After pause\n\n"
+                    "00:00:03.900 --> 00:00:04.200\n<v speaker_1>Reply\n\n"),
+        ]:
+            with self.subTest(format=fmt):
+                out_path = _output_path(f"subs.{fmt}")
+                with patch("_core.sdk_client", return_value=client):
+                    result = self.runner.invoke(module.main, [str(input_path), "--format", fmt, "-o", str(out_path)])
+                self.assertEqual(result.exit_code, 0, result.output)
+                self.assertEqual(out_path.read_text(), expected)
+        input_path.unlink()
+
+    def test_subtitle_segmenter_scales_linearly(self):
+        import io
+        import time
+
+        import _subtitles
+
+        def synthetic(n):
+            return [
+                {"text": f"word{i % 997}", "start": i * 0.3, "end": i * 0.3 + 0.25,
+                 "type": "word", "speaker_id": f"speaker_{(i // 5000) % 3}"}
+                for i in range(n)
+            ]
+
+        def bench(words):
+            out = io.StringIO()
+            started = time.perf_counter()
+            cues = _subtitles.write_srt(_subtitles.iter_cues(words), out)
+            return time.perf_counter() - started, cues
+
+        small, large = synthetic(30_000), synthetic(300_000)
+        bench(small)  # warm up
+        t_small, _ = bench(small)
+        t_large, cues = bench(large)
+        self.assertGreater(cues, 300_000 / 20)
+        self.assertLess(t_large, 5.0)
+        # 10x the words should cost roughly 10x the time, not 100x
+        self.assertLess(t_large / max(t_small, 1e-6), 25)
+
+    def test_columnar_round_trips_json_transcript(self):
+        from _columnar import load_columnar
+
+        module = _load_script("transcript-convert")
+        source = Path(__file__).resolve().parent.parent / "output" / "transcript.json"
+        cols_path = _output_path("transcript.cols")
+        json_path = _output_path("transcript-roundtrip.json")
+        result = self.runner.invoke(module.main, [str(source), "-o", str(cols_path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        transcript = load_columnar(cols_path)
+        original = json.loads(source.read_text())
+        self.assertEqual(len(transcript), len(original["words"]))
+        self.assertEqual(transcript.start.dtype.name, "float32")
+        self.assertEqual(int(transcript.mask("word").sum()), sum(w["type"] == "word" for w in original["words"]))
+
+        result = self.runner.invoke(module.main, [str(cols_path), "--to", "json", "-o", str(json_path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(json.loads(json_path.read_text()), original)
+
+    def test_transcribe_columnar_output(self):
+        from _columnar import load_columnar
+
+        module = _load_script("transcribe")
+        input_path = _output_path("cols.mp3")
+        input_path.write_bytes(b"input")
+        out_path = _output_path("cols-out.cols")
+        words = [
+            SimpleNamespace(text="Hi", start=0.1, end=0.3, type="word", speaker_id="speaker_0", logprob=-0.25, characters=None),
+            SimpleNamespace(text=" ", start=0.3, end=0.4, type="spacing", speaker_id="speaker_0", logprob=0.0, characters=None),
+            SimpleNamespace(text="ünïcode", start=0.4, end=0.9, type="word", speaker_id=None, logprob=None, characters=None),
+        ]
+        client = MagicMock()
+        client.speech_to_text.convert.return_value = _FakeTranscript("Hi ünïcode", words)
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, [str(input_path), "--format", "columnar", "-o", str(out_path)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        transcript = load_columnar(out_path)
+        self.assertEqual(transcript.text, "Hi ünïcode")
+        self.assertEqual(transcript.word(2)["text"], "ünïcode")
+        self.assertIsNone(transcript.word(2)["speaker_id"])
+        self.assertIsNone(transcript.word(2)["logprob"])
+        self.assertEqual(transcript.word(0)["logprob"], -0.25)
+        self.assertEqual(transcript.speakers, ["speaker_0"])
+        input_path.unlink()
+
+    def test_transcript_index_phrase_prefix_and_incremental(self):
+        module = _load_script("transcript-index")
+        archive = Path(self._cache_dir.name) / "archive"
+        archive.mkdir()
+        index_path = str(archive / "index.db")
+
+        def write_transcript(name, tokens):
+            words, t = [], 0.0
+            for token in tokens:
+                words.append({"text": token, "start": t, "end": t + 0.4, "type": "word"})
+                words.append({"text": " ", "start": t + 0.4, "end": t + 0.5, "type": "spacing"})
+                t += 0.5
+            (archive / f"{name}.json").write_text(json.dumps({"text": " ".join(tokens), "words": words}))
+
+        write_transcript("standup", ["Quarterly", "revenue", "grew,", "deploy", "Friday."])
+        write_transcript("retro", ["The", "deployment", "of", "quarterly", "revenue", "dashboards"])
+        (archive / "standup.mp3").write_bytes(b"audio")
+        # Sidecars written by transcribe --incremental, voice-convert and the pack modes are not transcripts
+        (archive / "standup.mp3.transcript-state.json").write_text((archive / "standup.json").read_text())
+        (archive / "manifest.json").write_text(json.dumps({"entries": {}}))
+        (archive / "notes.json").write_text(json.dumps({"text": "quarterly revenue", "words": ["quarterly", "revenue"]}))
+
+        result = self.runner.invoke(module.main, ["-i", index_path, "add", str(archive)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Indexed 2 transcript(s), 0 unchanged, 1 not transcripts", result.output)
+
+        from _transcript_index import TranscriptIndex
+
+        with TranscriptIndex(index_path) as index:
+            hits = index.search("quarterly revenue")
+            self.assertEqual(len(hits), 2)
+            by_name = {Path(h.transcript).stem: h for h in hits}
+            self.assertEqual(by_name["standup"].audio, str((archive / "standup.mp3").resolve()))
+            self.assertEqual((by_name["retro"].start, by_name["retro"].end), (1.5, 2.4))
+            self.assertEqual(len(index.search("deploy*")), 2)
+            self.assertEqual(len(index.search("deploy")), 1)
+            self.assertEqual(index.search("revenue grew")[0].snippet, "Quarterly revenue grew, deploy Friday.")
+
+        result = self.runner.invoke(module.main, ["-i", index_path, "add", str(archive)])
+        self.assertIn("Indexed 0 transcript(s), 2 unchanged", result.output)
+        result = self.runner.invoke(module.main, ["-i", index_path, "stats"])
+        self.assertIn("Transcripts: 2 ", result.output)
+        write_transcript("retro", ["nothing", "relevant"])
+        os.utime(archive / "retro.json", (1, 1))
+        result = self.runner.invoke(module.main, ["-i", index_path, "add", str(archive)])
+        self.assertIn("Indexed 1 transcript(s), 1 unchanged", result.output)
+        result = self.runner.invoke(module.main, ["-i", index_path, "search", "quarterly revenue"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("standup"), 1)
+        self.assertNotIn("retro", result.output)
+
+    def test_scripts_forward_calls_to_running_daemon(self):
+        import threading
+
+        from _daemon import DaemonError, DaemonServer
+
+        socket_path = Path(self._cache_dir.name) / "daemon.sock"
+        daemon_client = MagicMock()
+        uploads = []
+
+        def fake_transcribe(model_id, file, timestamps_granularity):
+            uploads.append(file.read())
+            word = SimpleNamespace(text="hi", start=0.0, end=0.2, type="word")
+            return SimpleNamespace(text="hi there", words=[word])
+
+        daemon_client.speech_to_text.convert.side_effect = fake_transcribe
+        daemon_client.text_to_sound_effects.convert.side_effect = lambda **kw: iter([b"sfx-", b"audio"])
+        daemon_client.audio_isolation.convert.side_effect = RuntimeError("quota exceeded")
+
+        server = DaemonServer(daemon_client, socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        input_path = _output_path("daemon-input.mp3")
+        input_path.write_bytes(b"recorded-audio")
+        local_factory = MagicMock(side_effect=AssertionError("should use the daemon"))
+        with patch.dict(os.environ, {"ELEVENLABS_DAEMON_SOCKET": str(socket_path)}):
+            module = _load_script("transcribe")
+            with patch("_core.sdk_client", local_factory):
+                result = self.runner.invoke(module.main, [str(input_path), "--format", "text"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("hi there", result.stdout)
+            self.assertEqual(uploads, [b"recorded-audio"])
+
+            module = _load_script("sound-effect")
+            out_path = _output_path("daemon-effect.mp3")
+            with patch("_core.sdk_client", local_factory):
+                result = self.runner.invoke(module.main, ["ding", "--no-cache", "-o", str(out_path)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(out_path.read_bytes(), b"sfx-audio")
+
+            module = _load_script("isolate-audio")
+            with patch("_core.sdk_client", local_factory):
+                result = self.runner.invoke(module.main, [str(input_path), "-o", str(out_path)])
+            self.assertIsInstance(result.exception, DaemonError)
+            self.assertIn("quota exceeded", str(result.exception))
+        input_path.unlink()
+
+    def test_batch_runs_manifest_with_retries_and_resume(self):
+        import threading
+
+        module = _load_script("batch")
+        workdir = Path(self._cache_dir.name)
+        (workdir / "talk.mp3").write_bytes(b"talk")
+        manifest = workdir / "jobs.jsonl"
+        manifest.write_text("\n".join(json.dumps(job) for job in [
+            {"op": "narrate", "text": "Hello", "voice": "rachel", "output": str(workdir / "out" / "hello.mp3")},
+            {"op": "sound-effect", "description": "ding", "loop": True, "output": str(workdir / "out" / "ding.mp3")},
+            {"op": "transcribe", "input": str(workdir / "talk.mp3"), "format": "text"},
+            {"op": "isolate", "input": str(workdir / "talk.mp3"), "output": str(workdir / "out" / "clean.mp3")},
+        ]) + "\n")
+
+        class RateLimited(Exception):
+            status_code = 429
+            headers = {"retry-after": "0"}
+
+        class BadRequest(Exception):
+            status_code = 400
+
+        calls = {"tts": 0, "sfx": 0, "isolate": 0}
+        in_flight = {"now": 0, "peak": 0}
+
+        async def audio(name, payload, fail_first=None, fail_always=None):
+            calls[name] += 1
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            if fail_always:
+                raise fail_always
+            if fail_first and calls[name] == 1:
+                raise fail_first
+            yield payload
+
+        async def transcribe(**kwargs):
+            return SimpleNamespace(text="transcribed", words=[])
+
+        client = MagicMock()
+        client.text_to_speech.convert.side_effect = lambda **kw: audio("tts", b"speech", fail_first=RateLimited())
+        client.text_to_sound_effects.convert.side_effect = lambda **kw: audio("sfx", b"ding")
+        client.audio_isolation.convert.side_effect = lambda **kw: audio("isolate", b"x", fail_always=BadRequest("bad"))
+        client.speech_to_text.convert.side_effect = transcribe
+
+        # Voice lookups may hit the network, so they must run off the event loop thread
+        resolved_on = []
+
+        def resolve_voice(name):
+            resolved_on.append(threading.current_thread())
+            return _core.resolve_voice(name)
+
+        with patch.object(module, "async_sdk_client", return_value=client), \
+                patch.object(module, "resolve_voice", side_effect=resolve_voice):
+            result = self.runner.invoke(module.main, [str(manifest), "-c", "2", "--base-delay", "0"])
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertTrue(resolved_on)
+        self.assertNotIn(threading.current_thread(), resolved_on)
+        self.assertIs(client.text_to_sound_effects.convert.call_args.kwargs["loop"], True)
+        self.assertEqual((workdir / "out" / "hello.mp3").read_bytes(), b"speech")
+        self.assertEqual((workdir / "out" / "ding.mp3").read_bytes(), b"ding")
+        self.assertEqual((workdir / "talk.txt").read_text(), "transcribed")
+        self.assertEqual(calls, {"tts": 2, "sfx": 1, "isolate": 1})
+        self.assertLessEqual(in_flight["peak"], 2)
+        self.assertIn("[failed]", result.output)
+        self.assertEqual(client.text_to_speech.convert.call_args.kwargs["voice_id"], "21m00Tcm4TlvDq8ikWAM")
+
+        # Resume: only the failed job runs again
+        client.audio_isolation.convert.side_effect = lambda **kw: audio("isolate", b"clean")
+        with patch.object(module, "async_sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, [str(manifest), "--base-delay", "0"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("[skip]"), 3)
+        self.assertEqual(calls, {"tts": 2, "sfx": 1, "isolate": 2})
+        self.assertEqual((workdir / "out" / "clean.mp3").read_bytes(), b"clean")
+
+    def test_cli_startup_stays_within_import_budget(self):
+        # Cold start to main() must not import the SDK, and total import time stays bounded
+        budget_ms = float(os.environ.get("ELEVENLABS_STARTUP_BUDGET_MS", "400"))
+        for name in ["narrate", "sound-effect", "compose-music", "design-voice",
+                     "voice-convert", "isolate-audio", "transcribe", "batch", "pipeline", "dub"]:
+            with self.subTest(script=name):
+                proc = subprocess.run(
+                    [sys.executable, "-X", "importtime", str(_SCRIPTS_DIR / f"{name}.py"), "--help"],
+                    capture_output=True, text=True,
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                modules = [line.split("|") for line in proc.stderr.splitlines() if line.startswith("import time:")]
+                imported = {m[2].strip() for m in modules[1:]}
+                self.assertFalse({m for m in imported if m.split(".")[0] == "elevenlabs"})
+                # Top-level entries carry the cumulative time of everything they pulled in
+                total_ms = sum(int(m[1]) for m in modules[1:] if not m[2].startswith("  ")) / 1000
+                self.assertLess(total_ms, budget_ms, f"{name} imports took {total_ms:.0f}ms")
+
+    def test_fake_server_streams_audio_and_injects_rate_limits(self):
+        import urllib.error
+        import urllib.request
+
+        from tests.fake_elevenlabs import FakeConfig, FakeElevenLabsServer
+
+        config = FakeConfig(latency_ms=0, chunk_size=1000, chunk_delay_ms=0, audio_bytes=2500, rate_limit_every=2)
+        with FakeElevenLabsServer(config) as server:
+            request = urllib.request.Request(
+                f"{server.base_url}/v1/text-to-speech/voice/stream", data=b'{"text": "hi"}', method="POST"
+            )
+            with urllib.request.urlopen(request) as response:
+                self.assertEqual(response.headers["Transfer-Encoding"], "chunked")
+                self.assertEqual(len(response.read()), 2500)
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(request)
+            self.assertEqual(ctx.exception.code, 429)
+            self.assertEqual(ctx.exception.headers["Retry-After"], "0.1")
+            with urllib.request.urlopen(
+                urllib.request.Request(f"{server.base_url}/v1/speech-to-text", data=b"x", method="POST")
+            ) as response:
+                self.assertEqual(len([w for w in json.load(response)["words"] if w["type"] == "word"]), 200)
+            records = server.reset()
+        self.assertEqual([r.status for r in records], [200, 429, 200])
+        self.assertEqual(records[0].bytes_out, 2500)
+
+    def test_metrics_flags_record_cache_events_prometheus_and_profile(self):
+        module = _load_script("sound-effect")
+        workdir = Path(self._cache_dir.name)
+        out_path, events, prom, profile = (workdir / n for n in ("sfx.mp3", "m.jsonl", "m.prom", "run.pstats"))
+        client = MagicMock()
+        client.text_to_sound_effects.convert.side_effect = lambda **kw: _FakeAudio()
+        args = ["ding", "-o", str(out_path), "--metrics", str(events), "--metrics-prom", str(prom)]
+        with patch("_core.sdk_client", return_value=client):
+            first = self.runner.invoke(module.main, args)
+            second = self.runner.invoke(module.main, [*args, "--profile", str(profile)])
+        self.assertEqual(first.exit_code, 0, first.output)
+        self.assertEqual(second.exit_code, 0, second.output)
+        records = [json.loads(line) for line in events.read_text().splitlines()]
+        self.assertEqual([(r["event"], r["result"]) for r in records], [("cache", "miss"), ("cache", "hit")])
+        self.assertIn('elevenlabs_cache_lookups_total{script=', prom.read_text())
+        self.assertIn('result="hit"} 1', prom.read_text())
+        self.assertGreater(profile.stat().st_size, 0)
+        self.assertIn("Profile saved to", second.output)
+
+    @skipUnless(importlib.util.find_spec("httpx"), "httpx not installed")
+    def test_instrumented_transport_times_request_phases(self):
+        import httpx
+
+        import _metrics
+        from tests.fake_elevenlabs import FakeConfig, FakeElevenLabsServer
+
+        config = FakeConfig(latency_ms=20, chunk_size=1000, chunk_delay_ms=1, audio_bytes=5000, rate_limit_every=2)
+        events = Path(self._cache_dir.name) / "m.jsonl"
+        with FakeElevenLabsServer(config) as server, _metrics.recording("test", str(events)):
+            with httpx.Client(transport=_metrics.http_transport(), base_url=server.base_url) as http:
+                for _ in range(3):
+                    with http.stream("POST", "/v1/text-to-speech/EXAVITQu4vr4xnSDxMaL", content=b"x" * 300) as response:
+                        response.read()
+        records = [json.loads(line) for line in events.read_text().splitlines()]
+        self.assertEqual([r["status"] for r in records], [200, 429, 200])
+        self.assertEqual([r["retry"] for r in records], [False, False, True])
+        first, _, retried = records
+        self.assertEqual(first["endpoint"], "/v1/text-to-speech/:id")
+        self.assertEqual((first["upload_bytes"], first["download_bytes"]), (300, 5000))
+        self.assertFalse(first["reused"])
+        self.assertTrue(retried["reused"])
+        self.assertGreaterEqual(first["wait_s"], 0.015)
+        self.assertLessEqual(first["ttfb_s"], first["total_s"])
+        self.assertGreater(first["transfer_s"], 0)
+
+        # Concurrent distinct requests to one endpoint: only a request's own repeat is a retry
+        from concurrent.futures import ThreadPoolExecutor
+
+        events.unlink()
+        config.rate_limit_every = 3
+        with FakeElevenLabsServer(config) as server, _metrics.recording("test", str(events)) as recorder:
+            with httpx.Client(transport=_metrics.http_transport(), base_url=server.base_url) as http:
+                def send(size):  # retry this exact body until it succeeds
+                    while http.post("/v1/text-to-speech/EXAVITQu4vr4xnSDxMaL", content=b"x" * size).status_code == 429:
+                        pass
+
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    list(pool.map(send, range(100, 112)))
+        records = [json.loads(line) for line in events.read_text().splitlines()]
+        by_body = {}
+        for record in records:
+            by_body.setdefault(record["upload_bytes"], []).append(record)
+        self.assertEqual(len(by_body), 12)
+        for attempts in by_body.values():
+            # First attempt never a retry, every later one is; only the last succeeded
+            self.assertEqual([r["retry"] for r in attempts], [False] + [True] * (len(attempts) - 1))
+            self.assertEqual([r["status"] for r in attempts], [429] * (len(attempts) - 1) + [200])
+        self.assertEqual(sum(recorder.retries.values()), sum(r["status"] == 429 for r in records))
+        self.assertNotIn("fingerprint", records[0])
+
+    def test_isolate_long_crossfades_windows_back_to_exact_length(self):
+        import numpy as np
+
+        import _audio
+        from _pcm import crossfade_curves, plan_windows
+
+        spans = plan_windows(1000, 300, 40)
+        self.assertEqual(spans[0], (0, 300))
+        self.assertEqual(spans[-1][1], 1000)
+        self.assertTrue(all(b[0] == a[1] - 40 for a, b in zip(spans, spans[1:])))
+        fade_in, fade_out = crossfade_curves(64)
+        np.testing.assert_allclose(fade_in ** 2 + fade_out ** 2, 1.0, rtol=1e-6)
+        fade_in, fade_out = crossfade_curves(64, equal_power=False)
+        np.testing.assert_allclose(fade_in + fade_out, 1.0, rtol=1e-6)
+
+        module = _load_script("isolate-audio")
+        workdir = Path(self._cache_dir.name)
+        input_path, out_path = workdir / "interview.wav", workdir / "clean.raw"
+        input_path.write_bytes(b"RIFF")
+        source = np.random.default_rng(0).uniform(-1, 1, (8000 * 25 + 123, 2)).astype(np.float32)
+
+        def isolate(audio):
+            # "Isolation" halves the signal; each window is a separate request
+            calls.append(len(audio))
+            if len(calls) == 2:
+                raise ConnectionError("reset")
+            return iter([(np.frombuffer(audio, dtype=np.float32) * 0.5).tobytes()])
+
+        calls = []
+        client = MagicMock()
+        client.audio_isolation.convert.side_effect = isolate
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "probe_audio", return_value=(8000, 2)), \
+                patch.object(_audio, "decode_to_file", lambda path, out, sr, ch: source.tofile(out)), \
+                patch.object(_audio, "encode_flac", lambda pcm, sr, ch: pcm), \
+                patch.object(_audio, "decode_pcm", lambda data, sr, ch: data), \
+                patch.object(_audio, "encode_file", lambda raw, out, sr, ch: Path(out).write_bytes(Path(raw).read_bytes())), \
+                patch.object(module.time, "sleep"):
+            result = self.runner.invoke(module.main, [
+                str(input_path), "--long", "--segment-seconds", "10", "--overlap", "1", "-w", "3", "-o", str(out_path),
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("into 3 windows", result.output)
+        self.assertEqual(len(calls), 4)  # one window retried on its own
+        mixed = np.fromfile(out_path, dtype=np.float32).reshape(-1, 2)
+        self.assertEqual(mixed.shape, source.shape)
+        np.testing.assert_allclose(mixed, source * 0.5, atol=1e-6)
+
+        # A window that runs out of retries stops the job without sending the queued windows
+        import threading
+
+        def unreachable(audio):
+            calls.append(len(audio))
+            if len(calls) > 2:
+                threading.Event().wait(0.2)  # a window already picked up is still in flight
+            raise ConnectionError("down")
+
+        calls.clear()
+        client.audio_isolation.convert.side_effect = unreachable
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "probe_audio", return_value=(8000, 2)), \
+                patch.object(_audio, "decode_to_file", lambda path, out, sr, ch: source.tofile(out)), \
+                patch.object(_audio, "encode_flac", lambda pcm, sr, ch: pcm), \
+                patch.object(module.time, "sleep"):
+            result = self.runner.invoke(module.main, [
+                str(input_path), "--long", "--segment-seconds", "10", "--overlap", "1", "-w", "1", "--retries", "1",
+                "-o", str(out_path),
+            ])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIsInstance(result.exception, ConnectionError)
+        # Window 1 and its retry, perhaps window 2 if it had already started; window 3 is never sent
+        self.assertLessEqual(len(calls), 4)
+
+    def test_voice_convert_directory_dedupes_and_resumes(self):
+        module = _load_script("voice-convert")
+        workdir = Path(self._cache_dir.name)
+        course, out_dir = workdir / "course", workdir / "course-rachel"
+        (course / "week1").mkdir(parents=True)
+        (course / "intro.wav").write_bytes(b"intro")
+        (course / "week1" / "lesson.mp3").write_bytes(b"lesson")
+        (course / "week1" / "intro-copy.wav").write_bytes(b"intro")
+        (course / "notes.txt").write_text("not audio")
+
+        def convert(voice_id, audio, remove_background_noise):
+            return iter([b"converted:" + audio.read()])
+
+        client = MagicMock()
+        client.speech_to_speech.convert.side_effect = convert
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, [str(course), "-v", "rachel", "-o", str(out_dir), "-w", "2"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("2 converted, 1 copied, 0 skipped, 0 failed", result.output)
+            self.assertEqual(client.speech_to_speech.convert.call_count, 2)
+            self.assertEqual((out_dir / "week1" / "lesson.mp3").read_bytes(), b"converted:lesson")
+            self.assertEqual((out_dir / "week1" / "intro-copy.mp3").read_bytes(), b"converted:intro")
+            entries = json.loads((out_dir / "manifest.json").read_text())["entries"]
+            self.assertEqual(sorted(entries), ["intro.wav", "week1/intro-copy.wav", "week1/lesson.mp3"])
+            self.assertEqual(entries["week1/intro-copy.wav"]["copied_from"], "intro.mp3")
+            self.assertEqual(entries["intro.wav"]["sha256"], entries["week1/intro-copy.wav"]["sha256"])
+
+            # A re-run only converts what is new
+            (course / "week1" / "outro.wav").write_bytes(b"outro")
+            result = self.runner.invoke(module.main, [f"{course}/**/*.wav", "-v", "rachel", "-o", str(out_dir)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("1 converted, 0 copied, 2 skipped, 0 failed", result.output)
+            self.assertEqual(client.speech_to_speech.convert.call_count, 3)
+
+            # Outputs inside the input tree (the default -o converted when run from it) are not inputs
+            inner = course / "converted"
+            self.addCleanup(os.chdir, os.getcwd())
+            os.chdir(course)
+            for _ in range(2):
+                result = self.runner.invoke(module.main, [".", "-v", "rachel"])
+                self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("0 converted, 0 copied, 4 skipped, 0 failed", result.output)
+            self.assertFalse((inner / "converted").exists())
+            self.assertEqual(len(json.loads((inner / "manifest.json").read_text())["entries"]), 4)
+
+    def test_design_voice_casting_saves_every_preview_with_index(self):
+        import threading
+
+        from _fileio import iter_base64
+
+        audio = os.urandom(10_000)
+        self.assertEqual(b"".join(iter_base64(base64.b64encode(audio).decode(), chunk_size=1000)), audio)
+
+        module = _load_script("design-voice")
+        workdir = Path(self._cache_dir.name)
+        (workdir / "casting.txt").write_text("# cast\nGravelly old sailor\n\nBright young scientist\n")
+        out_dir = workdir / "casting"
+        barrier = threading.Barrier(3, timeout=5)
+
+        def create_previews(voice_description, **params):
+            barrier.wait()  # all three requests are in flight at once
+            if voice_description == "Broken":
+                raise RuntimeError("bad description")
+            return SimpleNamespace(previews=[
+                SimpleNamespace(
+                    generated_voice_id=f"{voice_description[:3]}-{n}",
+                    audio_base_64=base64.b64encode(f"{voice_description}:{n}".encode()).decode(),
+                )
+                for n in (1, 2)
+            ])
+
+        client = MagicMock()
+        client.text_to_voice.create_previews.side_effect = create_previews
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, [
+                "Broken", "-f", str(workdir / "casting.txt"), "-d", str(out_dir), "-w", "3", "--no-cache",
+            ])
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertIn("Saved 4 previews", result.output)
+        index = json.loads((out_dir / "index.json").read_text())
+        self.assertEqual(
+            [(row["description"], row["generated_voice_id"], row["file"]) for row in index],
+            [
+                ("Broken", None, None),
+                ("Gravelly old sailor", "Gra-1", "02-gravelly-old-sailor-1.mp3"),
+                ("Gravelly old sailor", "Gra-2", "02-gravelly-old-sailor-2.mp3"),
+                ("Bright young scientist", "Bri-1", "03-bright-young-scientist-1.mp3"),
+                ("Bright young scientist", "Bri-2", "03-bright-young-scientist-2.mp3"),
+            ],
+        )
+        self.assertEqual(index[0]["error"], "bad description")
+        self.assertEqual((out_dir / "03-bright-young-scientist-2.mp3").read_bytes(), b"Bright young scientist:2")
+        self.assertGreaterEqual(index[1]["latency_s"], 0)
+
+    def test_compose_music_long_form_streams_crossfaded_sections(self):
+        import numpy as np
+
+        import _audio
+
+        module = _load_script("compose-music")
+        self.assertEqual(module.fit_to_bars(4.0, 120), 4.0)
+        self.assertEqual(module.fit_to_bars(5.1, 120), 6.0)
+        self.assertLessEqual(module.fit_to_bars(600, 70), 600)
+        prompts = module.section_prompts("ambient drone.", 3, bpm=70)
+        self.assertTrue(prompts[0].startswith("ambient drone. Part 1 of 3"))
+        self.assertIn("Middle section", prompts[1])
+        self.assertIn("fade out gently", prompts[2])
+        self.assertIn("70 BPM", prompts[2])
+
+        module.SAMPLE_RATE = 1000
+        written = []
+
+        class Encoder:
+            def __init__(self, output, sample_rate, channels):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+            def write(self, pcm):
+                written.append(np.frombuffer(pcm, dtype=np.float32).reshape(-1, 2))
+
+        def compose(prompt, music_length_ms, force_instrumental):
+            return iter([np.ones((music_length_ms, 2), dtype=np.float32).tobytes()])
+
+        client = MagicMock()
+        client.music.compose.side_effect = compose
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "decode_pcm", lambda data, sr, ch: data), \
+                patch.object(_audio, "StreamEncoder", Encoder):
+            result = self.runner.invoke(module.main, [
+                "ambient drone", "-d", "1500", "--section-seconds", "600", "--crossfade", "10", "-w", "2",
+                "--no-cache", "-o", str(Path(self._cache_dir.name) / "bed.mp3"),
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(client.music.compose.call_count, 3)
+        self.assertTrue(all(call.kwargs["music_length_ms"] <= 600_000 for call in client.music.compose.call_args_list))
+        mix = np.concatenate(written)
+        self.assertEqual(len(mix), 1500 * 1000)
+        np.testing.assert_allclose(mix[:590_000], 1.0)
+        # Equal-power fades: the squared gains of each seam sum to one
+        seam = mix[590_000:600_000, 0]
+        self.assertTrue(np.all(seam >= 1.0 - 1e-3) and np.all(seam <= 2 ** 0.5 + 1e-3))
+
+        # A failed section cancels the ones still queued instead of composing them for nothing
+        def failing_compose(prompt, music_length_ms, force_instrumental):
+            if prompt.startswith("ambient drone. Part 1 "):
+                raise RuntimeError("quota exceeded")
+            time.sleep(0.1)
+            return compose(prompt, music_length_ms, force_instrumental)
+
+        client.music.compose.reset_mock()
+        client.music.compose.side_effect = failing_compose
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "decode_pcm", lambda data, sr, ch: data), \
+                patch.object(_audio, "StreamEncoder", Encoder):
+            result = self.runner.invoke(module.main, [
+                "ambient drone", "-d", "1500", "--section-seconds", "60", "--crossfade", "1", "-w", "3",
+                "--no-cache", "-o", str(Path(self._cache_dir.name) / "bed.mp3"),
+            ])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertLessEqual(client.music.compose.call_count, 4)
+
+    def test_sound_effect_pack_regenerates_bad_loop_seams(self):
+        import numpy as np
+
+        import _audio
+        from _pcm import seam_score
+
+        t = np.arange(44100) / 44100
+        seamless = np.repeat(np.sin(2 * np.pi * 441 * t)[:, None], 2, axis=1).astype(np.float32)
+        clicky = np.repeat(np.sin(2 * np.pi * 440.3 * t)[:, None], 2, axis=1).astype(np.float32)
+        self.assertEqual(seam_score(seamless, 44100)["score"], 0.0)
+        self.assertEqual(seam_score(clicky, 44100)["jump"], 1.0)
+
+        module = _load_script("sound-effect")
+        workdir = Path(self._cache_dir.name)
+        pack, out_dir = workdir / "ui.jsonl", workdir / "ui"
+        pack.write_text(
+            '{"description": "Soft UI ding", "duration": 0.5}\n'
+            '# ambience\n'
+            '{"description": "light rain", "name": "rain-loop", "duration": 1, "loop": true}\n'
+        )
+        renders = {"Soft UI ding": [seamless * 0.5], "light rain": [clicky, seamless * 0.25]}
+
+        def convert(text, **params):
+            return iter([renders[text].pop(0).tobytes()])
+
+        client = MagicMock()
+        client.text_to_sound_effects.convert.side_effect = convert
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "decode_pcm", lambda data, sr, ch: data):
+            result = self.runner.invoke(module.main, ["--pack", str(pack), "-o", str(out_dir), "-w", "2"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(client.text_to_sound_effects.convert.call_count, 3)
+            self.assertTrue(client.text_to_sound_effects.convert.call_args.kwargs["loop"])
+            index = json.loads((out_dir / "index.json").read_text())
+            self.assertEqual([row["file"] for row in index], ["soft-ui-ding.mp3", "rain-loop.mp3"])
+            ding, rain = index
+            self.assertIsNone(ding["seam"])
+            self.assertAlmostEqual(ding["loudness_dbfs"], -9.03, places=1)
+            self.assertEqual((rain["attempts"], rain["seam_ok"], rain["seam"]["score"]), (2, True, 0.0))
+            self.assertEqual((out_dir / "rain-loop.mp3").read_bytes(), (seamless * 0.25).tobytes())
+            self.assertEqual(rain["duration_s"], 1.0)
+
+            # Every attempt is cached, so a rebuilt pack makes no requests
+            result = self.runner.invoke(module.main, ["--pack", str(pack), "-o", str(out_dir)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(client.text_to_sound_effects.convert.call_count, 3)
+
+    @skipUnless(importlib.util.find_spec("elevenlabs"), "elevenlabs SDK not installed")
+    def test_voice_registry_caches_list_and_revalidates_with_etag(self):
+        from _voice_registry import VoiceRegistry, match_voice
+        from tests.fake_elevenlabs import FakeConfig, FakeElevenLabsServer
+
+        voices = [{"name": "George - Warm Storyteller"}, {"name": "Georgia - Bright"}, {"name": "Daniel - Steady"}]
+        self.assertEqual(match_voice("GEORGE", voices)["name"], "George - Warm Storyteller")
+        self.assertEqual(match_voice("danny", voices), None)
+        self.assertEqual(match_voice("danial", voices)["name"], "Daniel - Steady")
+        with self.assertRaises(LookupError):
+            match_voice("geo", voices)
+
+        module = _load_script("narrate")
+        client = MagicMock()
+        client.text_to_speech.convert.side_effect = lambda **kw: _FakeAudio()
+        out_path = Path(self._cache_dir.name) / "out.mp3"
+        with FakeElevenLabsServer(FakeConfig(latency_ms=0)) as server, \
+                patch.dict(os.environ, {"ELEVENLABS_BASE_URL": server.base_url, "ELEVENLABS_API_KEY": "test"}):
+            # Scripts resolve names through the registry; the SDK talks to the fake server
+            with patch.object(module, "get_client", return_value=client):
+                result = self.runner.invoke(module.main, ["Hi", "-v", "george", "-o", str(out_path), "--no-cache"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(client.text_to_speech.convert.call_args.kwargs["voice_id"], "JBFqnCBsd6RMkjVDRZzb")
+            self.assertEqual(_core.resolve_voice("Podcast Narator"), "Cl0nedNarrat0r000001")
+            self.assertEqual(_core.resolve_voice("rachel"), "21m00Tcm4TlvDq8ikWAM")
+            self.assertEqual(_core.resolve_voice("AbCdEfGhIj0123456789"), "AbCdEfGhIj0123456789")
+            self.assertEqual([r.path for r in server.reset()], ["/v1/voices"])
+
+            # Within the TTL no request is made; afterwards an unchanged list costs a 304
+            self.assertEqual(VoiceRegistry().resolve("daniel"), "onwK4e9ZLuTAKqWW03F9")
+            self.assertEqual(server.reset(), [])
+            stale = VoiceRegistry(ttl=0)
+            self.assertEqual(stale.resolve("sarah - mature, reassuring"), "EXAVITQu4vr4xnSDxMaL")
+            self.assertEqual([r.status for r in server.reset()], [304])
+
+            # A voice added since the list was cached is picked up by one refetch
+            server.voices.append({"voice_id": "NewVoice000000000001", "name": "Brand New", "category": "cloned"})
+            self.assertEqual(VoiceRegistry().resolve("brand new"), "NewVoice000000000001")
+            with self.assertRaisesRegex(LookupError, "no voice named 'nobody'"):
+                VoiceRegistry().resolve("nobody")
+            self.assertEqual([r.status for r in server.reset()], [200, 304])
+
+    def test_transcribe_incremental_only_sends_new_audio(self):
+        module = _load_script("transcribe")
+        workdir = Path(self._cache_dir.name)
+        input_path, out_path = workdir / "live.wav", workdir / "live.json"
+        state_path = Path(f"{input_path}.transcript-state.json")
+        input_path.write_bytes(b"A" * 5000)
+
+        def words(*items):
+            spaced = []
+            for text, start, end in items:
+                if spaced:
+                    spaced.append(SimpleNamespace(text=" ", start=spaced[-1].end, end=start, type="spacing"))
+                spaced.append(SimpleNamespace(text=text, start=start, end=end, type="word"))
+            return spaced
+
+        # Keyed by where the extracted audio starts; word times are relative to it
+        results = {
+            0.0: _FakeTranscript("", words(("hello", 1.0, 1.5), ("world", 8.0, 8.6), ("aga", 9.5, 10.0))),
+            7.6: _FakeTranscript("", words(("world", 0.4, 1.0), ("again", 1.9, 2.5), ("bye", 10.0, 10.4))),
+        }
+        durations = [10.0, 20.0]
+        client = MagicMock()
+        client.speech_to_text.convert.side_effect = lambda file, **kw: results[file]
+        args = [str(input_path), "--incremental", "--overlap", "1", "-o", str(out_path)]
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(module._audio, "require_ffmpeg"), \
+                patch.object(module._audio, "probe_duration", side_effect=lambda path: durations[0]), \
+                patch.object(module._audio, "detect_silences", return_value=[]), \
+                patch.object(module._audio, "extract_segment", side_effect=lambda path, start, end: round(start, 3)):
+            result = self.runner.invoke(module.main, args)
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(json.loads(out_path.read_text())["text"], "hello world aga")
+            state = json.loads(state_path.read_text())
+            self.assertEqual(state["committed_until"], 8.6)  # "aga" may be cut off: provisional
+
+            # The recording grows: only the tail (from the last final word, minus the overlap) is sent
+            with open(input_path, "ab") as f:
+                f.write(b"B" * 3000)
+            durations[0] = 20.0
+            result = self.runner.invoke(module.main, args)
+            self.assertEqual(result.exit_code, 0, result.output)
+            payload = json.loads(out_path.read_text())
+            self.assertEqual(payload["text"], "hello world again bye")
+            self.assertEqual([w["start"] for w in payload["words"] if w["type"] == "word"], [1.0, 8.0, 9.5, 17.6])
+            self.assertEqual(module._audio.extract_segment.call_args.args[1:], (7.6, 20.0))
+            self.assertEqual(json.loads(state_path.read_text())["spans"], [[0.0, 10.0], [7.6, 20.0]])
+
+            # Nothing new: no request at all
+            result = self.runner.invoke(module.main, args)
+            self.assertIn("No new audio", result.output)
+            self.assertEqual(client.speech_to_text.convert.call_count, 2)
+
+            # An edited prefix invalidates the state
+            with open(input_path, "r+b") as f:
+                f.seek(4500)
+                f.write(b"C")
+            durations[0] = 10.0
+            result = self.runner.invoke(module.main, args)
+            self.assertIn("starting over", result.output)
+            self.assertEqual(module._audio.extract_segment.call_args.args[1], 0.0)
+
+    def test_pipeline_streams_stages_without_intermediate_files(self):
+        import threading
+
+        module = _load_script("pipeline")
+        with self.assertRaises(click.UsageError):
+            module.parse_stages(["transcribe | isolate"])
+        self.assertEqual(module.parse_stages(["isolate|voice-convert", "transcribe"]),
+                         ["isolate", "voice-convert", "transcribe"])
+
+        workdir = Path(self._cache_dir.name)
+        input_path, out_path = workdir / "take.wav", workdir / "take.json"
+        input_path.write_bytes(b"raw-take")
+        first_chunk_read = threading.Event()
+
+        def isolate(audio):
+            yield b"clean:" + audio.read()
+            # The next stage is already reading before this response is complete
+            self.assertTrue(first_chunk_read.wait(5))
+            yield b"|tail"
+
+        def convert(voice_id, audio, remove_background_noise):
+            self.assertIsInstance(audio, _fileio.ChunkPipe)
+            first = audio.read(6)
+            first_chunk_read.set()
+            yield voice_id.encode() + b":" + first + audio.read()
+
+        def transcribe(file, **kwargs):
+            self.assertEqual(file.read(), b"21m00Tcm4TlvDq8ikWAM:clean:raw-take|tail")
+            return _FakeTranscript("hello there", [SimpleNamespace(text="hello", start=0.0, end=0.4, type="word")])
+
+        client = MagicMock()
+        client.audio_isolation.convert.side_effect = isolate
+        client.speech_to_speech.convert.side_effect = convert
+        client.speech_to_text.convert.side_effect = transcribe
+        with patch("_core.sdk_client", return_value=client):
+            result = self.runner.invoke(module.main, [
+                str(input_path), "isolate | voice-convert | transcribe", "-v", "rachel", "-o", str(out_path),
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(json.loads(out_path.read_text())["text"], "hello there")
+        self.assertEqual(sorted(p.name for p in workdir.iterdir() if p.is_file()), ["take.json", "take.wav"])
+        lines = result.output.splitlines()
+        self.assertTrue(any(line.startswith("isolate ") for line in lines))
+        self.assertTrue(any(line.startswith("voice-convert ") for line in lines))
+        self.assertIn("Pipeline finished in", result.output)
+
+    def test_dub_places_concurrent_phrases_at_original_times(self):
+        import threading
+
+        import numpy as np
+
+        import _audio
+        from _pcm import time_stretch
+
+        sample_rate = 24000
+        t = np.arange(sample_rate) / sample_rate
+        tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)[:, None]
+        faster = time_stretch(tone, 1.25)
+        self.assertEqual(len(faster), sample_rate * 4 // 5)
+        peak = np.fft.rfftfreq(len(faster), 1 / sample_rate)[np.argmax(np.abs(np.fft.rfft(faster[:, 0])))]
+        self.assertAlmostEqual(peak, 440, delta=5)  # shorter, same pitch
+
+        module = _load_script("dub")
+        workdir = Path(self._cache_dir.name)
+        input_path, out_path = workdir / "talk.wav", workdir / "talk-dub.mp3"
+        input_path.write_bytes(b"RIFF")
+
+        def w(text, start, end, speaker="speaker_0"):
+            return SimpleNamespace(text=text, start=start, end=end, type="word", speaker_id=speaker)
+
+        words = [
+            w("Hello", 0.0, 0.4), w("there.", 0.5, 0.9),
+            w("Second", 2.0, 2.3), w("phrase", 2.4, 2.9),
+            w("Reply", 3.0, 3.5, speaker="speaker_1"),
+        ]
+        # Each phrase comes back as constant-level PCM of a known length
+        clips = {"Hello there.": (0.8, 0.5), "Second phrase": (1.2, 0.25), "Reply": (1.5, 0.125)}
+        barrier = threading.Barrier(3, timeout=5)
+
+        def tts(text, voice_id, output_format, **kwargs):
+            barrier.wait()  # every phrase is in flight at once
+            self.assertEqual(output_format, "pcm_24000")
+            seconds, level = clips[text]
+            yield np.full(round(seconds * sample_rate), round(level * 32768), dtype="<i2").tobytes()
+
+        rendered = {}
+
+        def encode_file(raw_path, output, rate, channels):
+            rendered["pcm"] = np.fromfile(raw_path, dtype=np.float32)
+
+        client = MagicMock()
+        client.speech_to_text.convert.return_value = _FakeTranscript("", words)
+        client.text_to_speech.convert.side_effect = tts
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "probe_duration", return_value=4.0), \
+                patch.object(_audio, "encode_file", encode_file):
+            result = self.runner.invoke(module.main, [
+                str(input_path), "--speaker-voice", "speaker_1=rachel", "-w", "3", "--no-cache", "-o", str(out_path),
+            ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(client.speech_to_text.convert.call_args.kwargs["diarize"])
+        voices = {c.kwargs["text"]: c.kwargs["voice_id"] for c in client.text_to_speech.convert.call_args_list}
+        self.assertEqual(voices, {"Hello there.": "EXAVITQu4vr4xnSDxMaL", "Second phrase": "EXAVITQu4vr4xnSDxMaL",
+                                  "Reply": "21m00Tcm4TlvDq8ikWAM"})
+        self.assertIn("3 phrases, 2 sped up, 1 overran their slot", result.output)
+
+        pcm = rendered["pcm"]
+        at = lambda seconds: round(seconds * sample_rate)
+        # The last phrase may only be sped up 1.25x, so it runs 0.2s past the input
+        self.assertEqual(len(pcm), at(4.2))
+        np.testing.assert_allclose(pcm[:at(0.8)], 0.5, atol=1e-3)
+        np.testing.assert_allclose(pcm[at(0.8):at(2.0)], 0.0)
+        # 1.2s of audio sped up 1.2x fills exactly the second until the reply
+        np.testing.assert_allclose(pcm[at(2.0):at(2.95)], 0.25, atol=1e-3)
+        np.testing.assert_allclose(pcm[at(3.0):at(4.15)], 0.125, atol=1e-3)
+
+        # A failed phrase stops the run before the queued phrases are sent
+        sent = []
+
+        def failing_tts(text, **kwargs):
+            sent.append(text)
+            if len(sent) > 1:
+                threading.Event().wait(0.2)  # a phrase already picked up is still in flight
+            raise ConnectionError("down")
+
+        client.text_to_speech.convert.side_effect = failing_tts
+        with patch("_core.sdk_client", return_value=client), \
+                patch.object(_audio, "require_ffmpeg"), \
+                patch.object(_audio, "probe_duration", return_value=4.0):
+            result = self.runner.invoke(module.main, [str(input_path), "-w", "1", "--no-cache", "-o", str(out_path)])
+        self.assertIsInstance(result.exception, ConnectionError)
+        self.assertLessEqual(len(sent), 2)  # the third phrase is never sent